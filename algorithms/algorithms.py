@@ -1,12 +1,70 @@
-from math import ceil
+import mmap
 
+from array import array as typed_array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from math import ceil, log, sqrt
+from multiprocessing import shared_memory
+from os import cpu_count
+from os.path import getsize
+from random import Random, randint
 
-def median_up_to_5(array, start, end):
+try:
+    import algorithms_numpy
+except ImportError:  # NumPy is optional: only the pure-Python path is used
+    algorithms_numpy = None
+
+
+# ranges with at most this number of items are finished with insertion sort
+INSERTION_SORT_THRESHOLD = 16
+
+# ranges with at most this number of items are not sampled by floyd_rivest
+FLOYD_RIVEST_THRESHOLD = 600
+
+# ranges with at least this number of items get a ninther pivot by auto_pivot
+NINTHER_THRESHOLD = 128
+
+# number of items sampled by auto_pivot to estimate the shape of a range
+AUTO_PIVOT_SAMPLE_SIZE = 15
+
+# ranges of memory-mapped files up to this number of bytes are sorted in RAM
+OUT_OF_CORE_MEMORY_BUDGET = 2 ** 28
+
+# items sampled from each shard at every round of distributed_quickselect
+DISTRIBUTED_SAMPLE_SIZE = 256
+
+# random number generator of random_pivot, seeded for reproducibility
+_pivot_random = Random(42)
+
+
+def _as_ndarray(array):
+    """Return an ndarray view of the array if the vectorized NumPy backend 
+    (see algorithms_numpy) can process it in place. Otherwise, return None.
+    """
+    
+    if algorithms_numpy is None or isinstance(array, list):
+        return None
+    return algorithms_numpy.as_ndarray(array)
+
+
+def _vectorized_pivot_fn(pivot_fn):
+    """Return the NumPy backend counterpart of a pivot function, if any."""
+    
+    if pivot_fn is median_of_medians_pivot:
+        return algorithms_numpy.median_of_medians_pivot
+    return pivot_fn
+
+
+def median_up_to_5(array, start, end, items=None):
     """In-place sort an array of at most 5 items in the range [start, end] via 
     quicksort and return the index of the median.
     If there is an odd number of items return the central index. Otherwise, 
     round upward.
     
+    If items is given, it is a satellite array whose items are moved along 
+    with the ones of the array (see quicksort() key option).
+    
     Time complexity analysis:
     Best: O(c), with c a generally negligible constant
     Average: O(c), with c a generally negligible constant
@@ -21,12 +79,13 @@ def median_up_to_5(array, start, end):
     assert 0 <= start <= end < len(array)
     assert start <= end <= start + 4
     
-    quicksort(array, start, end)
+    _quicksort(array, start, end, average_pivot, False, items)
     return ceil((end + start) / 2)
 
 
-def average_pivot(array, start, end):
+def average_pivot(array, start, end, items=None):
     """Return a pivot index for the array in the range [start, end].
+    No item is moved, so the satellite items array is ignored.
     
     Time complexity analysis:
     Best: O(1)
@@ -44,13 +103,172 @@ def average_pivot(array, start, end):
     return (end + start) // 2
 
 
-def partition(array, start, end, pivot_index):
+def median_of_3(array, i, j, k):
+    """Return the index of the median value among the items in positions i, j 
+    and k of the array, without moving them.
+    
+    Time complexity analysis:
+    Best: O(1)
+    Average: O(1)
+    Worst: O(1)
+    
+    Space complexity analysis:
+    Best: O(1)
+    Average: O(1)
+    Worst: O(1)
+    """
+    
+    if array[i] < array[j]:
+        if array[j] < array[k]:
+            return j
+        return k if array[i] < array[k] else i
+    if array[i] < array[k]:
+        return i
+    return k if array[j] < array[k] else j
+
+
+def median_of_3_pivot(array, start, end, items=None):
+    """Return the index of the median of the first, central and last items of 
+    the array in the range [start, end] as pivot index. No item is moved.
+    
+    It avoids the worst case of the first/last item pivots on sorted inputs, 
+    but it can still be fooled by some patterns (e.g. organ pipes).
+    
+    Time/space complexity analysis: see median_of_3().
+    """
+    
+    assert 0 <= start <= end < len(array)
+    
+    return median_of_3(array, start, (start + end) // 2, end)
+
+
+def ninther_pivot(array, start, end, items=None):
+    """Tukey's ninther.
+    Ref: https://www.johndcook.com/blog/2009/06/23/tukey-median-ninther/
+    
+    Return the index of the median of the medians of three groups of three 
+    evenly spaced items of the array in the range [start, end] as pivot index. 
+    No item is moved.
+    
+    It is a better estimate of the median than the median of 3 and is hard to 
+    fool with regular patterns, at the cost of 12 comparisons at most.
+    
+    Time/space complexity analysis: see median_of_3().
+    """
+    
+    assert 0 <= start <= end < len(array)
+    
+    if end - start < 8:  # not enough items for three groups
+        return median_of_3_pivot(array, start, end)
+    
+    step = (end - start) // 8
+    medians = [median_of_3(array, i, i + step, i + 2 * step) 
+               for i in (start, start + 3 * step, start + 6 * step)]
+    return median_of_3(array, *medians)
+
+
+def random_pivot(array, start, end, items=None):
+    """Return a random index of the array in the range [start, end] as pivot 
+    index. No item is moved.
+    
+    Random pivots make the worst case extremely unlikely on any input. The 
+    generator is seeded (see seed_random_pivot()), so runs are reproducible.
+    
+    Time/space complexity analysis: see average_pivot().
+    """
+    
+    assert 0 <= start <= end < len(array)
+    
+    return _pivot_random.randint(start, end)
+
+
+def seed_random_pivot(seed):
+    """Seed the random number generator of random_pivot."""
+    
+    _pivot_random.seed(seed)
+
+
+def auto_pivot(array, start, end, items=None):
+    """Adaptive pivot strategy.
+    
+    Sample AUTO_PIVOT_SAMPLE_SIZE evenly spaced items of the array in the 
+    range [start, end] to estimate its sortedness and duplicate ratio, then 
+    pick the pivot strategy that best suits the range. As it is called once 
+    per partitioning, the strategy can change at every recursion level:
+    - many duplicates: the sampled value with the closest to half number of 
+    smaller sampled items. As the two-way partition would put all the items 
+    equal to it on one side, quicksort and quickselect also switch to the 
+    three-way partition for the range (see _partition_band()), which keeps 
+    them away from the quadratic time;
+    - ascending/descending ranges: central item (see average_pivot()), which 
+    is the exact median of a sorted range;
+    - otherwise: Tukey's ninther (see ninther_pivot()).
+    Small ranges (less than NINTHER_THRESHOLD items) are not sampled and just 
+    get the median of 3 (see median_of_3_pivot()).
+    No item is moved.
+    
+    Time complexity analysis:
+    Best: O(s)
+    Average: O(s)
+    Worst: O(s * log s)
+    
+    Space complexity analysis:
+    Best: O(s)
+    Average: O(s)
+    Worst: O(s)
+    
+    where s = AUTO_PIVOT_SAMPLE_SIZE
+    """
+    
+    return _auto_pivot(array, start, end)[0]
+
+
+def _auto_pivot(array, start, end):
+    """Helper function for auto_pivot strategy.
+    
+    Return the index of the pivot and whether the range has many duplicates, 
+    in which case it should be partitioned with the three-way scheme.
+    """
+    
+    assert 0 <= start <= end < len(array)
+    
+    n = end - start + 1
+    if n < NINTHER_THRESHOLD:
+        # sampling is not worth it on small ranges
+        return median_of_3_pivot(array, start, end), False
+    
+    sample_size = min(n, AUTO_PIVOT_SAMPLE_SIZE)
+    positions = [start + i * (n - 1) // (sample_size - 1) 
+                 for i in range(sample_size)]
+    sample = [array[i] for i in positions]
+    
+    # fractions of ascending and descending pairs of consecutive samples
+    pairs = list(zip(sample, sample[1:]))
+    ascending = sum(a <= b for a, b in pairs) / len(pairs)
+    descending = sum(b <= a for a, b in pairs) / len(pairs)
+    duplicates = 1 - len(set(sample)) / sample_size
+    
+    if duplicates >= 0.5:
+        # the value with the closest to half number of smaller items
+        sorted_sample = sorted(sample)
+        best = min(range(sample_size), key=lambda i: abs(
+            bisect_left(sorted_sample, sample[i]) - sample_size // 2))
+        return positions[best], True
+    if ascending == 1 or descending == 1:
+        return average_pivot(array, start, end), False
+    return ninther_pivot(array, start, end), False
+
+
+def partition(array, start, end, pivot_index, items=None):
     """Hoare partition scheme.
     Ref: https://en.wikipedia.org/wiki/Quicksort#Hoare_partition_scheme
     
     In-place partition array items in the range [start, end] into two groups 
     according to a pivot value (< pivot, >= pivot).
     
+    If items is given, it is a satellite array whose items are moved along 
+    with the ones of the array, e.g. to partition records by their keys.
+    
     Return the final pivot value position.
     
     Time complexity analysis:
@@ -68,7 +286,7 @@ def partition(array, start, end, pivot_index):
     
     pivot_value = array[pivot_index]
     # move pivot value to the end
-    array[end], array[pivot_index] = array[pivot_index], array[end]
+    _swap(array, items, end, pivot_index)
     
     i, j = start, end
     while i < j:
@@ -81,20 +299,127 @@ def partition(array, start, end, pivot_index):
         if i < j: 
             # swap a left incorrect item with a right incorrect item
             array[i], array[j] = array[j], array[i]
+            if items is not None:
+                items[i], items[j] = items[j], items[i]
             i += 1
     
     # place pivot between left and right items
-    array[j], array[end] = array[end], array[j]
+    _swap(array, items, j, end)
     return j
 
 
-def quicksort(array, start=None, end=None, pivot_fn=average_pivot):
+def partition3(array, start, end, pivot_index, items=None):
+    """Three-way partition scheme (Dijkstra's Dutch national flag).
+    Ref: https://en.wikipedia.org/wiki/Dutch_national_flag_problem
+    
+    In-place partition array items in the range [start, end] into three groups 
+    according to a pivot value (< pivot, == pivot, > pivot).
+    
+    See partition() for the satellite items array.
+    
+    Return the first and last positions of the band of items equal to the 
+    pivot value.
+    
+    Time complexity analysis:
+    Best: O(n)
+    Average: O(n)
+    Worst: O(n)
+    
+    Space complexity analysis:
+    Best: O(n)
+    Average: O(n)
+    Worst: O(n)
+    """
+    
+    assert 0 <= start <= pivot_index <= end < len(array)
+    
+    pivot_value = array[pivot_index]
+    
+    # invariant: [start, lt) < pivot, [lt, i) == pivot, (gt, end] > pivot
+    lt, i, gt = start, start, end
+    while i <= gt:
+        if array[i] < pivot_value:
+            array[lt], array[i] = array[i], array[lt]
+            if items is not None:
+                items[lt], items[i] = items[i], items[lt]
+            lt += 1
+            i += 1
+        elif pivot_value < array[i]:
+            array[i], array[gt] = array[gt], array[i]
+            if items is not None:
+                items[i], items[gt] = items[gt], items[i]
+            gt -= 1
+        else:
+            i += 1
+    
+    return lt, gt
+
+
+def _swap(array, items, i, j):
+    """Swap the items in positions i and j of the array and, if given, of the 
+    satellite items array.
+    """
+    
+    array[i], array[j] = array[j], array[i]
+    if items is not None:
+        items[i], items[j] = items[j], items[i]
+
+
+def _partition_band(array, start, end, pivot_fn, three_way, items=None):
+    """Helper function for quicksort and quickselect algorithms.
+    
+    Partition array items in the range [start, end] around the pivot chosen by 
+    pivot_fn, with either the two-way or the three-way partition scheme.
+    The pivot functions that move items around (see _ITEM_MOVING_PIVOTS) are 
+    also given the satellite items array, if any, while the other ones are 
+    called with (array, start, end) only.
+    Ranges where auto_pivot() detects many duplicates are always partitioned 
+    with the three-way scheme.
+    
+    Return the first and last positions of the items that are already in 
+    their final sorted position (only the pivot in the two-way scheme).
+    """
+    
+    if pivot_fn is auto_pivot:
+        pivot_index, duplicates = _auto_pivot(array, start, end)
+        three_way = three_way or duplicates
+    elif items is not None and pivot_fn in _ITEM_MOVING_PIVOTS:
+        pivot_index = pivot_fn(array, start, end, items)
+    else:
+        pivot_index = pivot_fn(array, start, end)
+    if three_way:
+        return partition3(array, start, end, pivot_index, items)
+    pivot_index = partition(array, start, end, pivot_index, items)
+    return pivot_index, pivot_index
+
+
+def quicksort(array, start=None, end=None, pivot_fn=average_pivot, 
+              introsort=False, three_way=False, key=None, reverse=False):
     """Quicksort algorithm.
     Ref: https://en.wikipedia.org/wiki/Quicksort
     
     In-place sort the items of the array in the range [start, end] by 
     recursively partitioning and sorting them in two subgroups.
     
+    If introsort is True, the sort is delegated to the introsort engine (see 
+    _introsort()), which guarantees O(n * log n) time in the worst case 
+    regardless of the pivot function.
+    
+    If three_way is True, items are partitioned into three subgroups (see 
+    partition3()) and the items equal to the pivot are never touched again. 
+    This makes the sort close to linear on inputs with few distinct values.
+    
+    pivot_fn can also be the name of a registered pivot strategy (see 
+    PIVOT_STRATEGIES), such as "ninther" or "auto".
+    
+    If key is given, items are sorted according to key(item). Keys are 
+    computed once per item into a parallel array, which is partitioned along 
+    with the items (see partition()). Pivot functions are then called with the 
+    keys array, and the built-in ones that move items around (e.g. 
+    median_of_medians_pivot()) also with the items one, to move both 
+    consistently.
+    If reverse is True, items are sorted in descending order.
+    
     Time complexity analysis:
     Best: O(n * log n) if optimal pivot function is chosen
     Average: O(n * log n) if optimal pivot function is chosen
@@ -106,32 +431,652 @@ def quicksort(array, start=None, end=None, pivot_fn=average_pivot):
     Worst: O(log n)
     
     *The worst-case time complexity can be improved to O(n log n) by using an 
-    appropriate pivot (see median_of_medians_pivot()).
+    appropriate pivot (see median_of_medians_pivot()) or the introsort mode.
+    
+    NumPy ndarrays and writable buffers (e.g. array.array) are sorted in place 
+    by the vectorized backend (see algorithms_numpy.quicksort()), which always 
+    uses the three-way partition and the introsort depth budget.
+    """
+    
+    start = 0 if start is None else start
+    end = len(array) - 1 if end is None else end
+    pivot_fn = _resolve_pivot_fn(pivot_fn)
+    
+    vector = _as_ndarray(array) if key is None else None
+    if vector is not None:
+        algorithms_numpy.quicksort(
+            vector, start, end, _vectorized_pivot_fn(pivot_fn))
+        if reverse:
+            vector[start:end + 1] = vector[start:end + 1][::-1].copy()
+        return
+    
+    keys, items = array, None
+    if key is not None:
+        # the items become a satellite array of the keys one
+        keys, items = len(array) * [None], array
+        for i in range(start, end + 1):
+            keys[i] = key(array[i])
+    
+    if introsort:
+        _introsort(keys, start, end, pivot_fn, three_way, items)
+    else:
+        _quicksort(keys, start, end, pivot_fn, three_way, items)
+    
+    if reverse:
+        _reverse(array, start, end)
+
+
+def _quicksort(array, start, end, pivot_fn, three_way=False, items=None):
+    """Helper function for quicksort algorithm.
+    
+    In-place sort the items of the array (and of the satellite items array, if 
+    given) in the range [start, end].
+    
+    Time/space complexity analysis: see quicksort().
+    """
+    
+    while start < end:
+        low, high = _partition_band(
+            array, start, end, pivot_fn, three_way, items)
+        
+        # Sedgewick optimization to make sure at most O(log n) space is used: 
+        # recurse into the smaller part and loop over the larger one
+        if low - start <= end - high:  # left part smaller
+            _quicksort(array, start, low - 1, pivot_fn, three_way, items)
+            start = high + 1  # tail call
+        else:  # right part smaller
+            _quicksort(array, high + 1, end, pivot_fn, three_way, items)
+            end = low - 1  # tail call
+
+
+def _reverse(array, start, end):
+    """In-place reverse the items of the array in the range [start, end]."""
+    
+    while start < end:
+        array[start], array[end] = array[end], array[start]
+        start += 1
+        end -= 1
+
+
+def insertion_sort(array, start=None, end=None, items=None):
+    """Insertion sort algorithm.
+    Ref: https://en.wikipedia.org/wiki/Insertion_sort
+    
+    In-place sort the items of the array in the range [start, end] by growing 
+    a sorted prefix one item at a time.
+    
+    See partition() for the satellite items array.
+    
+    Time complexity analysis:
+    Best: O(n)
+    Average: O(n^2)
+    Worst: O(n^2)
+    
+    Space complexity analysis:
+    Best: O(1)
+    Average: O(1)
+    Worst: O(1)
+    """
+    
+    start = 0 if start is None else start
+    end = len(array) - 1 if end is None else end
+    
+    for i in range(start + 1, end + 1):
+        item = array[i]
+        satellite = items[i] if items is not None else None
+        j = i - 1
+        # shift right the items of the sorted prefix greater than the new one
+        while j >= start and item < array[j]:
+            array[j + 1] = array[j]
+            if items is not None:
+                items[j + 1] = items[j]
+            j -= 1
+        array[j + 1] = item
+        if items is not None:
+            items[j + 1] = satellite
+
+
+def heapsort(array, start=None, end=None, items=None):
+    """Heapsort algorithm.
+    Ref: https://en.wikipedia.org/wiki/Heapsort
+    
+    In-place sort the items of the array in the range [start, end] by 
+    building a max-heap and repeatedly moving its root after the heap.
+    
+    See partition() for the satellite items array.
+    
+    Time complexity analysis:
+    Best: O(n * log n)
+    Average: O(n * log n)
+    Worst: O(n * log n)
+    
+    Space complexity analysis:
+    Best: O(1)
+    Average: O(1)
+    Worst: O(1)
     """
     
     start = 0 if start is None else start
     end = len(array) - 1 if end is None else end
     
+    n = end - start + 1
+    # heapify: sift down every internal node, from the last one to the root
+    for root in reversed(range(n // 2)):
+        _sift_down(array, start, root, n, items)
+    
+    # move the current maximum after the heap and restore the heap property
+    for size in reversed(range(1, n)):
+        _swap(array, items, start, start + size)
+        _sift_down(array, start, 0, size, items)
+
+
+def _sift_down(array, offset, root, size, items=None):
+    """Helper function for heapsort algorithm.
+    
+    Move down the item at heap position root until the max-heap property holds 
+    for the heap of the given size stored from index offset onwards.
+    """
+    
+    item = array[offset + root]
+    satellite = items[offset + root] if items is not None else None
+    child = 2 * root + 1
+    while child < size:
+        # pick the greater child
+        if child + 1 < size and array[offset + child] < \
+                array[offset + child + 1]:
+            child += 1
+        if not item < array[offset + child]:
+            break
+        array[offset + root] = array[offset + child]
+        if items is not None:
+            items[offset + root] = items[offset + child]
+        root = child
+        child = 2 * root + 1
+    array[offset + root] = item
+    if items is not None:
+        items[offset + root] = satellite
+
+
+def _introsort(array, start, end, pivot_fn, three_way=False, items=None):
+    """Introsort algorithm.
+    Ref: https://en.wikipedia.org/wiki/Introsort
+    
+    In-place sort the items of the array in the range [start, end] with 
+    quicksort driven by an explicit stack rather than recursion. Ranges that 
+    exceed a depth budget of 2 * log2(n) partitioning levels are sorted with 
+    heapsort, while ranges with at most INSERTION_SORT_THRESHOLD items are 
+    finished with insertion sort.
+    
+    See quicksort() for the three_way partitioning option and partition() for 
+    the satellite items array.
+    
+    Time complexity analysis:
+    Best: O(n * log n)
+    Average: O(n * log n)
+    Worst: O(n * log n)
+    
+    Space complexity analysis:
+    Best: O(log n)
+    Average: O(log n)
+    Worst: O(log n)
+    """
+    
     if end <= start:
         return
     
-    pivot_index = pivot_fn(array, start, end)
-    pivot_index = partition(array, start, end, pivot_index)
+    max_depth = 2 * ((end - start + 1).bit_length() - 1)
+    stack = [(start, end, max_depth)]
+    while stack:
+        start, end, depth = stack.pop()
+        while end - start + 1 > INSERTION_SORT_THRESHOLD:
+            if depth == 0:
+                # too many bad pivots: fall back to the O(n log n) heapsort
+                heapsort(array, start, end, items)
+                break
+            depth -= 1
+            
+            low, high = _partition_band(
+                array, start, end, pivot_fn, three_way, items)
+            
+            # defer the larger part and keep on partitioning the smaller one, 
+            # so that the stack holds at most O(log n) ranges
+            if low - start <= end - high:
+                stack.append((high + 1, end, depth))
+                end = low - 1
+            else:
+                stack.append((start, low - 1, depth))
+                start = high + 1
+        else:
+            insertion_sort(array, start, end, items)
+
+
+def parallel_quicksort(array, typecode="q", pivot_fn=average_pivot, 
+                       workers=None):
+    """Parallel quicksort algorithm over shared memory.
+    
+    In-place sort the items of the array by partitioning the top levels 
+    serially and sorting the resulting independent ranges in a pool of worker 
+    processes. Items are copied once in a shared memory block of fixed-width 
+    values (described by the typecode of the array module, e.g. "q" for 64-bit 
+    integers and "d" for doubles), that workers sort in place, so that no item 
+    is ever pickled.
+    If the array supports the buffer protocol (e.g. array.array or ndarray), 
+    its own item format is used instead of typecode.
+    
+    pivot_fn must be picklable (e.g. a module level function) to be sent to 
+    the workers.
+    
+    Time complexity analysis:
+    Best: O(n * log n / p + n) if optimal pivot function is chosen
+    Average: O(n * log n / p + n) if optimal pivot function is chosen
+    Worst: O(n^2) if inappropriate pivot function is chosen
+    
+    Space complexity analysis:
+    Best: O(n)
+    Average: O(n)
+    Worst: O(n)
+    
+    where p = number of workers
+    """
     
-    # Sedgewick optimization to make sure at most O(log n) space is used
-    if pivot_index - 1 - start <= end - pivot_index + 1:  # left part smaller
-        quicksort(array, start, pivot_index - 1, pivot_fn)
-        quicksort(array, pivot_index + 1, end, pivot_fn)  # tail call
-    # right part smaller
-    quicksort(array, pivot_index + 1, end, pivot_fn)
-    quicksort(array, start, pivot_index - 1, pivot_fn)  # tail call
+    workers = workers or cpu_count() or 1
+    pivot_fn = _resolve_pivot_fn(pivot_fn)
+    if len(array) < 2:
+        return
+    
+    try:
+        source = memoryview(array)
+        is_buffer = True
+    except TypeError:  # e.g. list
+        source = memoryview(typed_array(typecode, array))
+        is_buffer = False
+    assert not source.readonly and source.c_contiguous, \
+        "Only writable contiguous buffers can be sorted in place"
+    
+    shared_block = shared_memory.SharedMemory(create=True, size=source.nbytes)
+    shared = shared_block.buf[:source.nbytes].cast(source.format)
+    try:
+        shared.cast("B")[:] = source.cast("B")
+        
+        ranges = _split_ranges(shared, pivot_fn, 4 * workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # submit the largest ranges first to balance the workers load
+            ranges.sort(key=lambda r: r[0] - r[1])
+            futures = [
+                executor.submit(
+                    _sort_shared_range, shared_block.name, source.format, 
+                    len(source), start, end, pivot_fn) 
+                for start, end in ranges]
+            for future in futures:
+                future.result()  # propagate workers errors, if any
+        
+        if is_buffer:
+            source.cast("B")[:] = shared.cast("B")
+        else:
+            array[:] = shared.tolist()
+    finally:
+        try:
+            shared.release()
+            shared_block.close()
+        except BufferError:
+            # views of the block are still referenced (e.g. by the traceback 
+            # of an error): the mapping is closed once they are collected
+            pass
+        finally:
+            shared_block.unlink()
+
+
+def _split_ranges(array, pivot_fn, ranges_number):
+    """Helper function for parallel_quicksort algorithm.
+    
+    Three-way partition the largest range of the array until there are at 
+    least ranges_number ranges or they all are small enough to be sorted by 
+    insertion sort.
+    
+    Return the disjoint [start, end] ranges still to be sorted.
+    """
+    
+    vector = _as_ndarray(array)
+    if vector is not None:
+        array, pivot_fn = vector, _vectorized_pivot_fn(pivot_fn)
+        partition_fn = algorithms_numpy.partition3
+    else:
+        partition_fn = partition3
+    
+    ranges = [(0, len(array) - 1)]
+    while len(ranges) < ranges_number:
+        start, end = max(ranges, key=lambda r: r[1] - r[0])
+        if end - start + 1 <= INSERTION_SORT_THRESHOLD:
+            break
+        ranges.remove((start, end))
+        
+        low, high = partition_fn(
+            array, start, end, pivot_fn(array, start, end))
+        ranges.extend(r for r in [(start, low - 1), (high + 1, end)] 
+                      if r[0] < r[1])
+        if not ranges:
+            break
+    return ranges
 
 
-def quickselect(array, k, pivot_fn=average_pivot):
+def _sort_shared_range(block_name, item_format, length, start, end, 
+                       pivot_fn):
+    """Helper function for parallel_quicksort algorithm.
+    
+    In-place sort the items in the range [start, end] of the array of the 
+    given length and item format stored in the named shared memory block.
+    """
+    
+    shared_block = shared_memory.SharedMemory(name=block_name)
+    try:
+        shared = shared_block.buf.cast("B").cast(item_format)[:length]
+        quicksort(shared, start, end, pivot_fn, introsort=True)
+        shared.release()
+    finally:
+        shared_block.close()
+
+
+def distributed_quickselect(shards, k, typecode="q", workers=None, 
+                            sample_size=DISTRIBUTED_SAMPLE_SIZE):
+    """Distributed quickselect algorithm over shared memory.
+    
+    Return the k-th smallest element of the items of several arrays (shards), 
+    the same that quickselect() returns for their concatenation, without 
+    gathering them. Each shard is copied once in its own shared memory block 
+    (see parallel_quicksort() for typecode), standing for the memory of a 
+    remote worker: a pool of worker processes scans the shards, but only 
+    exchanges scalars with the coordinating process.
+    
+    The search narrows an interval (lower, upper) of values containing the 
+    k-th smallest element, in rounds:
+    1. each shard reports how many of its items fall in the interval and a 
+    random sample of at most sample_size of them;
+    2. the coordinator picks up to two pivot values tightly bracketing the 
+    expected rank of the k-th smallest element in the merged samples, where 
+    each sampled item weighs as many items as it stands for in its shard (see 
+    weighted_quickselect() and floyd_rivest());
+    3. each shard reports how many of its items in the interval are less than 
+    and equal to each pivot. Either the k-th smallest element falls in a band 
+    of items equal to a pivot, which is returned, or the interval shrinks to 
+    the one between consecutive pivots that contains it.
+    Once the interval holds at most sample_size items per shard, they are 
+    gathered and the search ends with quickselect. Hence, only O(p * s) 
+    scalars are moved at each round.
+    
+    Time complexity analysis:
+    Best: O(n / p + p * s)
+    Average: O((n / p + p * s) * r)
+    Worst: O((n / p + p * s) * n)*
+    
+    Space complexity analysis:
+    Best: O(n)
+    Average: O(n)
+    Worst: O(n)
+    
+    where p = number of shards, s = sample_size and r = O(log n / log s) is 
+    the number of rounds.
+    
+    *Each round excludes at least one pivot value from the interval.
+    """
+    
+    assert sample_size >= 1
+    
+    blocks, descriptors = [], []
+    try:
+        for shard in shards:
+            if len(shard) == 0:
+                continue
+            try:
+                source = memoryview(shard)
+            except TypeError:  # e.g. list
+                source = memoryview(typed_array(typecode, shard))
+            block = shared_memory.SharedMemory(create=True, size=source.nbytes)
+            blocks.append(block)
+            block.buf[:source.nbytes] = source.cast("B")
+            descriptors.append((block.name, source.format, len(source)))
+        
+        assert 1 <= k <= sum(length for _, _, length in descriptors)
+        
+        lower, upper = None, None
+        seeds = Random(42)  # seeded for reproducibility
+        workers = workers or min(len(descriptors), cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                futures = [
+                    executor.submit(
+                        _sample_shard, *descriptor, lower, upper, sample_size, 
+                        seeds.getrandbits(32)) 
+                    for descriptor in descriptors]
+                samples = [future.result() for future in futures]
+                
+                active = sum(count for count, _ in samples)
+                if active <= sample_size * len(descriptors):
+                    futures = [
+                        executor.submit(
+                            _shard_items, *descriptor, lower, upper) 
+                        for descriptor in descriptors]
+                    items = [item for future in futures 
+                             for item in future.result()]
+                    return quickselect(items, k, three_way=True)
+                
+                pivots = _bracketing_pivots(samples, k, active)
+                futures = [
+                    executor.submit(
+                        _count_shard, *descriptor, lower, upper, pivots) 
+                    for descriptor in descriptors]
+                counts = [future.result() for future in futures]
+                
+                # counts are relative to the interval, pivots are ascending
+                next_k = k
+                for i, pivot in enumerate(pivots):
+                    less = sum(shard_counts[i][0] for shard_counts in counts)
+                    equal = sum(shard_counts[i][1] for shard_counts in counts)
+                    if k <= less:
+                        upper = pivot
+                        break
+                    if k <= less + equal:
+                        return pivot
+                    lower, next_k = pivot, k - less - equal
+                k = next_k
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _bracketing_pivots(samples, k, active):
+    """Helper function for distributed_quickselect algorithm.
+    
+    Return the ascending, distinct values of the weighted samples that 
+    bracket the expected rank k among the active items, at a distance of 
+    about sqrt(log n / s) times the active items (see _floyd_rivest()).
+    """
+    
+    pairs = [(item, count / len(sample)) 
+             for count, sample in samples if sample for item in sample]
+    total = sum(weight for _, weight in pairs)
+    gap = active * sqrt(log(active) / len(pairs))
+    
+    targets = [target for target in [k - gap, k + gap] if 0 < target < total]
+    if not targets:
+        targets = [min(k, total)]
+    return sorted(set(weighted_quickselect(pairs, target) 
+                      for target in targets))
+
+
+def _shard_items(block_name, item_format, length, lower, upper):
+    """Helper function for distributed_quickselect algorithm.
+    
+    Return a list of the items of the array of the given length and item 
+    format stored in the named shared memory block that are strictly between 
+    lower and upper (None for an unbounded side).
+    """
+    
+    shared_block = shared_memory.SharedMemory(name=block_name)
+    try:
+        shared = shared_block.buf.cast("B").cast(item_format)[:length]
+        vector = _as_ndarray(shared)
+        if vector is not None:
+            selected = vector
+            if lower is not None:
+                selected = selected[selected > lower]
+            if upper is not None:
+                selected = selected[selected < upper]
+            items = selected.tolist()
+            del vector, selected  # release the views of the shared memory
+        else:
+            items = [item for item in shared 
+                     if (lower is None or lower < item) and 
+                     (upper is None or item < upper)]
+        shared.release()
+    finally:
+        shared_block.close()
+    return items
+
+
+def _sample_shard(block_name, item_format, length, lower, upper, 
+                  sample_size, seed):
+    """Helper function for distributed_quickselect algorithm.
+    
+    Return the number of items of a shard (see _shard_items()) in the 
+    interval (lower, upper) and a random sample of at most sample_size of 
+    them.
+    """
+    
+    items = _shard_items(block_name, item_format, length, lower, upper)
+    sample = Random(seed).sample(items, min(sample_size, len(items)))
+    return len(items), sample
+
+
+def _count_shard(block_name, item_format, length, lower, upper, pivots):
+    """Helper function for distributed_quickselect algorithm.
+    
+    Return, for each pivot, the number of items of a shard (see 
+    _shard_items()) in the interval (lower, upper) that are less than and 
+    equal to the pivot.
+    """
+    
+    items = _shard_items(block_name, item_format, length, lower, upper)
+    return [(sum(1 for item in items if item < pivot), 
+             sum(1 for item in items if item == pivot)) 
+            for pivot in pivots]
+
+
+@contextmanager
+def mapped_array(path, typecode="q"):
+    """Context manager to map a binary file of fixed-width items (described by 
+    the typecode of the array module, e.g. "q" for 64-bit integers and "d" for 
+    doubles) into memory.
+    
+    Yield a writable memoryview of the items, backed by the file pages: 
+    in-place changes are written to the file, and items are only read from 
+    disk when accessed, so the file can be larger than RAM.
+    """
+    
+    if getsize(path) == 0:  # empty files cannot be mapped
+        yield memoryview(typed_array(typecode))
+        return
+    
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as mapped:
+        if hasattr(mapped, "madvise"):
+            # partitioning scans the pages sequentially from both ends
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        view = memoryview(mapped).cast(typecode)
+        try:
+            yield view
+        finally:
+            view.release()
+
+
+def quicksort_file(path, typecode="q", pivot_fn=average_pivot, 
+                   memory_budget=OUT_OF_CORE_MEMORY_BUDGET):
+    """Out-of-core quicksort algorithm.
+    
+    In-place sort the fixed-width items of a binary file (see mapped_array()) 
+    without loading it into memory.
+    Ranges larger than memory_budget bytes are three-way partitioned in place 
+    on the mapped pages, which are scanned sequentially from both ends. 
+    Smaller ranges fit in the page cache and are sorted by quicksort (in 
+    introsort mode, and vectorized if NumPy is available). As in introsort, 
+    ranges that exceed a depth budget of 2 * log2(n) are sorted with heapsort.
+    
+    Time/space complexity analysis: see _introsort().
+    """
+    
+    pivot_fn = _resolve_pivot_fn(pivot_fn)
+    with mapped_array(path, typecode) as array:
+        max_items = max(1, memory_budget // array.itemsize)
+        max_depth = 2 * max(0, len(array).bit_length() - 1)
+        stack = [(0, len(array) - 1, max_depth)]
+        while stack:
+            start, end, depth = stack.pop()
+            if end - start + 1 <= max_items:
+                quicksort(array, start, end, pivot_fn, introsort=True)
+            elif depth == 0:
+                heapsort(array, start, end)
+            else:
+                low, high = _partition_band(array, start, end, pivot_fn, True)
+                stack.append((start, low - 1, depth - 1))
+                stack.append((high + 1, end, depth - 1))
+
+
+def quickselect_file(path, k, typecode="q", pivot_fn=average_pivot, 
+                     memory_budget=OUT_OF_CORE_MEMORY_BUDGET):
+    """Out-of-core quickselect algorithm.
+    
+    Return the k-th smallest item of a binary file of fixed-width items (see 
+    mapped_array()) without loading it into memory. As quickselect does with 
+    arrays, the items of the file are partitioned in place.
+    Ranges larger than memory_budget bytes are three-way partitioned in place 
+    on the mapped pages, then the search continues with quickselect (which is 
+    vectorized if NumPy is available).
+    
+    Time/space complexity analysis: see quickselect().
+    """
+    
+    pivot_fn = _resolve_pivot_fn(pivot_fn)
+    with mapped_array(path, typecode) as array:
+        assert 1 <= k <= len(array)
+        
+        max_items = max(1, memory_budget // array.itemsize)
+        start, end = 0, len(array) - 1
+        while end - start + 1 > max_items:
+            low, high = _partition_band(array, start, end, pivot_fn, True)
+            if low + 1 <= k <= high + 1:
+                # the k-th smallest element is (equal to) the pivot
+                return array[k - 1]
+            elif k < low + 1:
+                end = low - 1
+            else:
+                start = high + 1
+        
+        # the remaining range fits in memory
+        vector = _as_ndarray(array)
+        if vector is None:
+            return array[_quickselect(array, k, pivot_fn, start, end, True)]
+        value = algorithms_numpy.quickselect(
+            vector[start:end + 1], k - start, _vectorized_pivot_fn(pivot_fn))
+        del vector  # the mapped pages cannot be released while exported
+        return value
+
+
+def quickselect(array, k, pivot_fn=average_pivot, three_way=False, key=None,
+                reverse=False):
     """Quickselect algorithm, aka Hoare's selection algorithm.
     Ref: https://en.wikipedia.org/wiki/Quickselect
     
     Return the k-th smallest element in the array.
+    
+    If three_way is True, items are partitioned into three subgroups (see 
+    partition3()) and the search stops as soon as k falls in the band of items 
+    equal to the pivot.
+    
+    pivot_fn can also be the name of a registered pivot strategy (see 
+    PIVOT_STRATEGIES).
+    
+    If key is given, items are compared according to key(item), which is 
+    computed once per item (see quicksort()). If reverse is True, return the 
+    k-th largest element instead.
         
     Time complexity analysis:
     Best: O(n) if optimal pivot function is chosen
@@ -147,38 +1092,220 @@ def quickselect(array, k, pivot_fn=average_pivot):
     accordingly, recurse). However, instead of recursing into both sides, as in 
     quicksort, quickselect only recurses into one side (the one with the 
     element it is searching for).
+    
+    NumPy ndarrays and writable buffers (e.g. array.array) are processed in 
+    place by the vectorized backend (see algorithms_numpy.quickselect()).
     """
 
     assert 1 <= k <= len(array)
     
-    return array[_quickselect(array, k, pivot_fn, 0, len(array) - 1)]
+    if reverse:
+        # the k-th largest element is the (n - k + 1)-th smallest one
+        k = len(array) - k + 1
+    pivot_fn = _resolve_pivot_fn(pivot_fn)
+    
+    vector = _as_ndarray(array) if key is None else None
+    if vector is not None:
+        return algorithms_numpy.quickselect(
+            vector, k, _vectorized_pivot_fn(pivot_fn))
+    
+    keys, items = array, None
+    if key is not None:
+        # the items become a satellite array of the keys one
+        keys, items = [key(i) for i in array], array
+    
+    return array[_quickselect(
+        keys, k, pivot_fn, 0, len(array) - 1, three_way, items)]
 
 
-def _quickselect(array, k, pivot_fn, start, end):
+def _quickselect(array, k, pivot_fn, start, end, three_way=False, 
+                 items=None):
     """Helper function for quickselect algorithm.
     
     Return the index of the k-th smallest element of the array in the range 
-    [start, end].
+    [start, end]. See partition() for the satellite items array.
     
     Time/space complexity analysis: see quickselect().
     """
     
-    if start == end:
-        return start
+    while start < end:
+        low, high = _partition_band(
+            array, start, end, pivot_fn, three_way, items)
+        
+        if low + 1 <= k <= high + 1:
+            # the k-th smallest element is (equal to) the pivot
+            return k - 1
+        elif k < low + 1:
+            end = low - 1  # search in the left part (tail call)
+        else:
+            start = high + 1  # search in the right part (tail call)
+    return start
+
+
+def quickselect_many(array, ks, pivot_fn=average_pivot, three_way=False):
+    """Multiple selection algorithm built on quickselect.
+    Ref: https://en.wikipedia.org/wiki/Selection_algorithm
+    
+    Return the k-th smallest elements in the array, for each k in ks (in the 
+    same order of ks).
+    
+    The array is partitioned once per recursion level and each requested rank 
+    is only routed into the part containing it, so that the partitioning work 
+    done for a rank is reused for all the others.
+    
+    Time complexity analysis:
+    Best: O(n) if optimal pivot function is chosen
+    Average: O(n * log r)* if optimal pivot function is chosen
+    Worst: O(r * n^2) if inappropriate pivot function is chosen
+    
+    Space complexity analysis:
+    Best: O(log n + r)
+    Average: O(log n + r)
+    Worst: O(log n + r)
+    
+    where r = number of distinct ranks in ks
+    
+    *Each recursion level scans at most n items and, once the ranks have been 
+    split in r different parts, every part behaves as a single quickselect.
+    """
+    
+    assert all(1 <= k <= len(array) for k in ks)
+    
+    pivot_fn = _resolve_pivot_fn(pivot_fn)
+    found = {}  # rank -> index of the k-th smallest element
+    _quickselect_many(
+        array, sorted(set(ks)), pivot_fn, 0, len(array) - 1, three_way, found)
+    return [array[found[k]] for k in ks]
+
+
+def _quickselect_many(array, ks, pivot_fn, start, end, three_way, found):
+    """Helper function for quickselect_many algorithm.
     
-    pivot_index = pivot_fn(array, start, end)
-    pivot_index = partition(array, start, end, pivot_index)
+    Store in found the index of the k-th smallest element of the array in the 
+    range [start, end], for each k in the sorted list of ranks ks.
+    The ranges still to be partitioned are kept in an explicit stack rather 
+    than recursion, along with their ranks: as ranges with no rank are never 
+    pushed, the stack holds at most one range per rank.
+    
+    Time/space complexity analysis: see quickselect_many().
+    """
     
-    if k == pivot_index + 1:
-        return pivot_index
-    elif k < pivot_index + 1:
-        # search in the left half
-        return _quickselect(array, k, pivot_fn, start, pivot_index - 1)
-    # search in the right half
-    return _quickselect(array, k, pivot_fn, pivot_index + 1, end)
+    stack = [(start, end, ks)] if ks else []
+    while stack:
+        start, end, ks = stack.pop()
+        if start == end:
+            found[ks[0]] = start
+            continue
+        
+        low, high = _partition_band(array, start, end, pivot_fn, three_way)
+        
+        # split the ranks among the left part, the pivot band and the right 
+        # part
+        left = bisect_left(ks, low + 1)
+        right = bisect_right(ks, high + 1)
+        for k in ks[left:right]:
+            # the k-th smallest element is (equal to) the pivot
+            found[k] = k - 1
+        
+        if left > 0:
+            stack.append((start, low - 1, ks[:left]))
+        if right < len(ks):
+            stack.append((high + 1, end, ks[right:]))
 
 
-def median_of_medians_pivot(array, start, end):
+def partial_sort(array, k, pivot_fn=average_pivot, key=None, reverse=False):
+    """Partial sort algorithm.
+    Ref: https://en.wikipedia.org/wiki/Partial_sorting
+    
+    In-place rearrange the array so that its first k items are the k smallest 
+    ones, in sorted order. The order of the remaining items is unspecified.
+    
+    The k smallest items are isolated in the first k positions by quickselect 
+    (see _quickselect()), which partitions the array around the k-th smallest 
+    one, then only those k items are sorted by introsort.
+    
+    See quickselect() for the pivot_fn, key and reverse options (with reverse 
+    the first k items are the k largest ones, in descending order).
+    
+    Time complexity analysis:
+    Best: O(n + k * log k)
+    Average: O(n + k * log k)
+    Worst: O(n^2) if inappropriate pivot function is chosen
+    
+    Space complexity analysis:
+    Best: O(log n)
+    Average: O(log n)
+    Worst: O(log n)
+    """
+    
+    assert 0 <= k <= len(array)
+    
+    if k == 0:
+        return
+    
+    n = len(array)
+    pivot_fn = _resolve_pivot_fn(pivot_fn)
+    
+    vector = _as_ndarray(array) if key is None else None
+    if vector is not None:
+        pivot_fn = _vectorized_pivot_fn(pivot_fn)
+        if reverse:
+            algorithms_numpy.quickselect(vector, n - k + 1, pivot_fn)
+            algorithms_numpy.quicksort(vector, n - k, n - 1, pivot_fn)
+            vector[:] = vector[::-1].copy()
+        else:
+            algorithms_numpy.quickselect(vector, k, pivot_fn)
+            algorithms_numpy.quicksort(vector, 0, k - 1, pivot_fn)
+        return
+    
+    keys, items = array, None
+    if key is not None:
+        # the items become a satellite array of the keys one
+        keys, items = [key(i) for i in array], array
+    
+    if reverse:
+        # sort the k largest items at the end, then reverse the array
+        _quickselect(keys, n - k + 1, pivot_fn, 0, n - 1, True, items)
+        _introsort(keys, n - k, n - 1, pivot_fn, True, items)
+        _reverse(array, 0, n - 1)
+    else:
+        _quickselect(keys, k, pivot_fn, 0, n - 1, True, items)
+        _introsort(keys, 0, k - 1, pivot_fn, True, items)
+
+
+def nsmallest(array, k, key=None):
+    """Return a new list with the k smallest items of the array, in ascending 
+    order. Unlike heapq.nsmallest(), ties are not returned in a stable order.
+    Items of ndarrays are returned as Python scalars (see ndarray.tolist()).
+    
+    Time/space complexity analysis: see partial_sort(), plus O(n) space for the 
+    copy of the array.
+    """
+    
+    vector = _as_ndarray(array)
+    items = vector.copy() if vector is not None else list(array)
+    k = max(0, min(k, len(items)))
+    partial_sort(items, k, key=key)
+    return items[:k].tolist() if vector is not None else items[:k]
+
+
+def nlargest(array, k, key=None):
+    """Return a new list with the k largest items of the array, in descending 
+    order. Unlike heapq.nlargest(), ties are not returned in a stable order.
+    Items of ndarrays are returned as Python scalars (see ndarray.tolist()).
+    
+    Time/space complexity analysis: see partial_sort(), plus O(n) space for the 
+    copy of the array.
+    """
+    
+    vector = _as_ndarray(array)
+    items = vector.copy() if vector is not None else list(array)
+    k = max(0, min(k, len(items)))
+    partial_sort(items, k, key=key, reverse=True)
+    return items[:k].tolist() if vector is not None else items[:k]
+
+
+def median_of_medians_pivot(array, start, end, items=None):
     """Median of medians algorithm.
     Ref: https://en.wikipedia.org/wiki/Median_of_medians
     
@@ -187,12 +1314,14 @@ def median_of_medians_pivot(array, start, end):
     approximate median is guaranteed to be between the 30th and 70th 
     percentiles and can be used a good pivot for quicksort and quickselect.
     
+    See partition() for the satellite items array.
+    
     Time/space complexity analysis: see median_of_medians().
     """
     
     # for <= 5 elements just get the index of the median without recursion
     if end - start < 5:
-        return median_up_to_5(array, start, end)
+        return median_up_to_5(array, start, end, items)
     
     # split items in N groups of at most 5 elements, compute the median of each 
     # group and place these values in the first N slots of the array
@@ -201,11 +1330,11 @@ def median_of_medians_pivot(array, start, end):
         sub_right = min(i + 4, end)
     
         # get the index of the median of the n-th subgroup
-        median = median_up_to_5(array, i, sub_right)
+        median = median_up_to_5(array, i, sub_right, items)
         
         # place the median in the right position at the beginning of the array
         new_pos = start + int((i - start) / 5)
-        array[median], array[new_pos] = array[new_pos], array[median]
+        _swap(array, items, median, new_pos)
     
     medians_number = ceil((end - start + 1) / 5)  # one for each group
     last_median_pos = start + medians_number - 1
@@ -214,15 +1343,54 @@ def median_of_medians_pivot(array, start, end):
     median_of_medians_pos = ceil((start + last_median_pos) / 2)
     return _quickselect(
         array, median_of_medians_pos, median_of_medians_pivot, start, 
-        last_median_pos)
+        last_median_pos, True, items)
      
      
-def median_of_medians(array, k):
+# built-in pivot functions that move items around, so they are given the 
+# satellite items array, if any (see _partition_band())
+_ITEM_MOVING_PIVOTS = (median_up_to_5, median_of_medians_pivot)
+
+# pivot strategies that can be passed by name as pivot_fn
+PIVOT_STRATEGIES = {
+    "average": average_pivot,
+    "median_of_3": median_of_3_pivot,
+    "ninther": ninther_pivot,
+    "random": random_pivot,
+    "median_of_medians": median_of_medians_pivot,
+    "auto": auto_pivot,
+}
+
+
+def register_pivot_strategy(name, pivot_fn):
+    """Register a pivot function, to be passed by name as pivot_fn.
+    
+    The function receives the array and the range [start, end] and must 
+    return the index of the pivot in the range, without moving any item.
+    """
+    
+    PIVOT_STRATEGIES[name] = pivot_fn
+
+
+def _resolve_pivot_fn(pivot_fn):
+    """Return the pivot function registered with the given name, if pivot_fn 
+    is a string. Otherwise, return pivot_fn itself.
+    """
+    
+    if isinstance(pivot_fn, str):
+        assert pivot_fn in PIVOT_STRATEGIES, \
+            "Unknown pivot strategy: {}".format(pivot_fn)
+        return PIVOT_STRATEGIES[pivot_fn]
+    return pivot_fn
+
+
+def median_of_medians(array, k, three_way=False, key=None, reverse=False):
     """Quickselect algorithm using the approximate median of medians pivot 
     strategy.
     
     Return the k-th smallest element in the array.
     
+    See quickselect() for the three_way, key and reverse options.
+    
     Time complexity analysis:
     Best: O(n)
     Average: O(n)
@@ -246,4 +1414,231 @@ def median_of_medians(array, k):
     
     assert 1 <= k <= len(array)
     
-    return quickselect(array, k, median_of_medians_pivot)
+    return quickselect(
+        array, k, median_of_medians_pivot, three_way, key, reverse)
+
+
+def weighted_quickselect(pairs, k, pivot_fn=average_pivot):
+    """Weighted quickselect algorithm.
+    
+    Return the weighted k-th smallest value of an iterable of (value, weight) 
+    pairs: the smallest value such that the total weight of the pairs with 
+    values less than or equal to it is at least k. With integer weights, it is 
+    the k-th smallest item of the array where each value is repeated weight 
+    times, which is never built.
+    Weights must be non-negative and k must be in (0, total weight].
+    
+    The values are three-way partitioned (see partition3()) with any pivot 
+    function, while the weights follow them as satellite items (see 
+    partition()). The weights of the part on the left of the pivot band and of 
+    the band itself tell in which part the search continues.
+    
+    Time complexity analysis:
+    Best: O(n) if optimal pivot function is chosen
+    Average: O(n) if optimal pivot function is chosen
+    Worst: O(n^2) if inappropriate pivot function is chosen
+    
+    Space complexity analysis:
+    Best: O(n)
+    Average: O(n)
+    Worst: O(n)
+    
+    where n is the number of pairs, whatever their total weight.
+    """
+    
+    values, weights = _unzip_pairs(pairs)
+    assert 0 < k <= sum(weights)
+    
+    return _weighted_quickselect(
+        values, weights, k, _resolve_pivot_fn(pivot_fn), True)
+
+
+def weighted_median(pairs, pivot_fn=average_pivot):
+    """Return the weighted median of an iterable of (value, weight) pairs: the 
+    smallest value such that the total weight of the pairs with values less 
+    than or equal to it is more than half of the total weight. With integer 
+    weights, it is the upper median of the array where each value is repeated 
+    weight times, as picked by median_of_medians_pivot().
+    
+    Time/space complexity analysis: see weighted_quickselect().
+    """
+    
+    values, weights = _unzip_pairs(pairs)
+    total = sum(weights)
+    assert total > 0
+    
+    return _weighted_quickselect(
+        values, weights, total / 2, _resolve_pivot_fn(pivot_fn), False)
+
+
+def _unzip_pairs(pairs):
+    """Helper function for weighted selection algorithms.
+    
+    Return the lists of the values and of the (non-negative) weights of an 
+    iterable of (value, weight) pairs.
+    """
+    
+    values, weights = [], []
+    for value, weight in pairs:
+        assert weight >= 0, "Negative weight {} of {}".format(weight, value)
+        values.append(value)
+        weights.append(weight)
+    return values, weights
+
+
+def _weighted_quickselect(values, weights, target, pivot_fn, inclusive):
+    """Helper function for weighted selection algorithms.
+    
+    Return the smallest value whose cumulative weight is at least the target 
+    (if inclusive is True) or more than the target (otherwise).
+    """
+    
+    start, end = 0, len(values) - 1
+    while True:
+        low, high = _partition_band(
+            values, start, end, pivot_fn, True, weights)
+        left = sum(weights[start:low])
+        band = sum(weights[low:high + 1])
+        
+        if target < left or (inclusive and target == left):
+            end = low - 1  # search in the left part
+        elif target < left + band or (inclusive and target == left + band):
+            return values[low]  # the weighted k-th value is the pivot
+        else:
+            target -= left + band  # search in the right part
+            start = high + 1
+
+
+def floyd_rivest(array, k):
+    """Floyd-Rivest selection algorithm.
+    Ref: https://en.wikipedia.org/wiki/Floyd%E2%80%93Rivest_algorithm
+    
+    Return the k-th smallest element in the array.
+    
+    A random sample of the items is recursively searched for two values that 
+    tightly bracket the k-th smallest element. Then, a single pass partitions 
+    the items in three groups (< lower, between the two values, > upper), and 
+    the search continues in the middle group only, which is expected to be a 
+    small fraction of the items. 
+    If the sampling goes badly (k falls out of the middle group or the group 
+    is too large), the search falls back to the median of medians strategy.
+    
+    Time complexity analysis:
+    Best: O(n)
+    Average: O(n)*
+    Worst: O(n)
+    
+    Space complexity analysis:
+    Best: O(log n)
+    Average: O(log n)
+    Worst: O(log n)
+    
+    *The expected number of comparisons is n + min(k, n - k) + o(n), compared 
+    to the (at least) 2n comparisons of quickselect. Items are always 
+    compared first with the bracketing value farther from k, which most of 
+    them fall beyond, so that they only take one comparison. Near the ends of 
+    the array, the bracket has a single bound, and the items are partitioned 
+    on one side only.
+    """
+    
+    assert 1 <= k <= len(array)
+    
+    return array[_floyd_rivest(array, k - 1, 0, len(array) - 1)]
+
+
+def _floyd_rivest(array, k, start, end):
+    """Helper function for floyd_rivest algorithm.
+    
+    Return the index of the (k + 1)-th smallest element of the array in the 
+    range [start, end] (k is 0-based here), moving it in position k.
+    
+    Time/space complexity analysis: see floyd_rivest().
+    """
+    
+    while end - start + 1 > FLOYD_RIVEST_THRESHOLD:
+        n = end - start + 1
+        i = k - start  # rank to find inside the range
+        
+        # move a random sample of size ~ n^(2/3) at the beginning of the range
+        sample_size = int(n ** (2 / 3))
+        for j in range(start, start + sample_size):
+            _swap(array, None, j, randint(j, end))
+        
+        # select two sample items tightly bracketing the expected rank of k, 
+        # with the gap of the original algorithm: a bound whose rank falls 
+        # out of the sample is dropped (None), as the extreme sample item 
+        # would almost never bracket k
+        gap = 0.5 * sqrt(log(n) * sample_size * (n - sample_size) / n)
+        sample_rank = i * sample_size / n
+        sample_start, sample_end = start, start + sample_size - 1
+        low_value = high_value = None
+        if sample_rank - gap >= 0:
+            low_rank = start + int(sample_rank - gap)
+            low_value = array[
+                _floyd_rivest(array, low_rank, sample_start, sample_end)]
+            sample_start = low_rank
+        if sample_rank + gap <= sample_size - 1:
+            high_rank = start + int(sample_rank + gap)
+            high_value = array[
+                _floyd_rivest(array, high_rank, sample_start, sample_end)]
+        
+        # most items fall beyond the bound farther from k
+        low, high = _partition_between(
+            array, start, end, low_value, high_value, i >= n // 2)
+        
+        # the middle group is expected to hold the fraction of the items 
+        # between the two bounds in the sample: a bad sample leaves k out of 
+        # it, or makes it much larger (or too large to make progress)
+        expected = (min(sample_size - 1, sample_rank + gap) - 
+                    max(0, sample_rank - gap) + 1) * n / sample_size
+        if not low <= k <= high or \
+                high - low + 1 > min(2 * expected, 3 * n // 4):
+            # bad sample: search with the worst-case linear strategy
+            return _quickselect(
+                array, k + 1, median_of_medians_pivot, start, end, True)
+        if low_value is not None and low_value == high_value:
+            # all the items between low and high are equal
+            return k
+        start, end = low, high
+    
+    return _quickselect(array, k + 1, average_pivot, start, end, True)
+
+
+def _partition_between(array, start, end, low_value, high_value, low_first):
+    """Helper function for floyd_rivest algorithm.
+    
+    In-place partition array items in the range [start, end] into three 
+    groups (< low_value, between low_value and high_value, > high_value), 
+    with low_value <= high_value. A bound that is None is unbounded, and its 
+    outer group is empty.
+    If low_first is True, items are compared with low_value first. Otherwise, 
+    they are compared with high_value first.
+    
+    Return the first and last positions of the middle group.
+    
+    Time/space complexity analysis: see partition3().
+    """
+    
+    # invariant: [start, lt) < low, [lt, i) in the middle, (gt, end] > high
+    lt, i, gt = start, start, end
+    while i <= gt:
+        item = array[i]
+        if low_first:
+            is_low = low_value is not None and item < low_value
+            is_high = not is_low and high_value is not None and \
+                high_value < item
+        else:
+            is_high = high_value is not None and high_value < item
+            is_low = not is_high and low_value is not None and \
+                item < low_value
+        if is_low:
+            array[lt], array[i] = array[i], array[lt]
+            lt += 1
+            i += 1
+        elif is_high:
+            array[i], array[gt] = array[gt], array[i]
+            gt -= 1
+        else:
+            i += 1
+    
+    return lt, gt
@@ -0,0 +1,204 @@
+import heapq
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: ndarray inputs are not benchmarked
+    np = None
+
+from timeit import repeat
+from algorithms import nlargest, nsmallest, quicksort
+from sorting import SORT_THRESHOLDS, _sample_statistics, \
+    binary_insertion_sort, counting_sort, k_way_merge, merge_sort, \
+    radix_sort, sample_sort
+
+
+def benchmark(label, fn, make_input, repetitions=5):
+    """Print the best running time of fn over several repetitions, each one
+    on a fresh input built by make_input (not timed).
+    """
+    
+    print("{:<45} {:>10.4f} s".format(
+        label, measure(fn, make_input, repetitions)))
+
+
+def measure(fn, make_input, repetitions=5):
+    """Return the best running time of fn over several repetitions, each one
+    on a fresh input built by make_input (not timed).
+    """
+    
+    inputs = [make_input() for _ in range(repetitions)]
+    return min(repeat(lambda: fn(inputs.pop()), number=1, repeat=repetitions))
+
+
+def benchmark_top_k():
+    """Compare nsmallest/nlargest with their heapq counterparts."""
+    
+    random.seed(42)
+    for n in [10 ** 4, 10 ** 5, 10 ** 6]:
+        for k in [10, 100, 10000]:
+            if k > n:
+                continue
+            make_input = lambda: [random.random() for _ in range(n)]
+            print("n = {}, k = {}".format(n, k))
+            benchmark(
+                "  algorithms.nsmallest",
+                lambda array: nsmallest(array, k), make_input)
+            benchmark(
+                "  heapq.nsmallest",
+                lambda array: heapq.nsmallest(k, array), make_input)
+            benchmark(
+                "  algorithms.nlargest",
+                lambda array: nlargest(array, k), make_input)
+            benchmark(
+                "  heapq.nlargest",
+                lambda array: heapq.nlargest(k, array), make_input)
+            
+            if np is None:
+                continue
+            make_input = lambda: np.random.random(n)
+            benchmark(
+                "  algorithms.nsmallest (ndarray)",
+                lambda array: nsmallest(array, k), make_input)
+            benchmark(
+                "  heapq.nsmallest (ndarray)",
+                lambda array: heapq.nsmallest(k, array), make_input)
+
+
+class Key:
+    """Key wrapper whose comparisons run Python code, as the ones of records 
+    usually do.
+    """
+    
+    __slots__ = ("value",)
+    
+    def __init__(self, value):
+        self.value = value
+    
+    def __lt__(self, other):
+        return self.value < other.value
+
+
+def benchmark_k_way_merge():
+    """Compare k_way_merge (heap and loser tree) with heapq.merge, on floats 
+    and on keys with a (slower) Python-level comparison.
+    """
+    
+    random.seed(42)
+    n = 10 ** 6
+    for k in [4, 64, 1024]:
+        make_input = lambda: [
+            sorted(random.random() for _ in range(n // k)) for _ in range(k)]
+        for key in [None, Key]:
+            print("n = {}, k = {}, key = {}".format(
+                n, k, key and key.__name__))
+            benchmark(
+                "  sorting.k_way_merge",
+                lambda runs: list(k_way_merge(*runs, key=key)), make_input)
+            benchmark(
+                "  sorting.k_way_merge (loser tree)",
+                lambda runs: list(
+                    k_way_merge(*runs, key=key, loser_tree=True)),
+                make_input)
+            benchmark(
+                "  heapq.merge",
+                lambda runs: list(heapq.merge(*runs, key=key)), make_input)
+
+
+def tune_sort_thresholds(repetitions=5):
+    """Measure the crossovers between the engines of sorting.sort() on this 
+    machine, and return the thresholds to update sorting.SORT_THRESHOLDS with.
+    Each threshold is the last one, in a sequence of inputs increasingly 
+    suited to an engine, from which the engine beats sample sort.
+    """
+    
+    random.seed(42)
+    sample_size = SORT_THRESHOLDS["sample_size"]
+    n = 10 ** 5
+    
+    def beats(sort_fn, make_input):
+        return measure(sort_fn, make_input, repetitions) < \
+            measure(sample_sort, make_input, repetitions)
+    
+    def estimate(statistic, array):
+        # mean over several samples, as sort() only sees one
+        return sum(_sample_statistics(array, None, sample_size)[statistic] 
+                   for _ in range(10)) / 10
+    
+    thresholds = {"sample_size": sample_size}
+    
+    # short lists, sorted many at a time
+    thresholds["insertion_max_length"] = 0
+    for length in [8, 16, 32, 48, 64, 96, 128, 192, 256]:
+        make_input = lambda: [[random.random() for _ in range(length)] 
+                              for _ in range(1000)]
+        insertion_fn = lambda arrays: [
+            binary_insertion_sort(array) for array in arrays]
+        sample_fn = lambda arrays: [sample_sort(array) for array in arrays]
+        if measure(insertion_fn, make_input, repetitions) >= \
+                measure(sample_fn, make_input, repetitions):
+            break
+        thresholds["insertion_max_length"] = length
+    
+    # sorted lists with a fraction of items moved to random positions
+    def nearly_sorted(noise):
+        array = sorted(random.random() for _ in range(n))
+        for _ in range(int(noise * n)):
+            array[random.randrange(n)] = random.random()
+        return array
+    
+    thresholds["presorted_max_inversions"] = 0
+    for noise in [0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05]:
+        make_input = lambda: nearly_sorted(noise)
+        if not beats(lambda array: merge_sort(array, adaptive=True), 
+                     make_input):
+            break
+        thresholds["presorted_max_inversions"] = \
+            estimate("inversions", make_input())
+    
+    # numbers with decreasing numbers of distinct values
+    thresholds["duplicates_min_ratio"] = 1
+    for distinct in [2, 4, 8, 16, 32, 64, 256, 1024]:
+        make_input = lambda: [float(random.randrange(distinct)) 
+                              for _ in range(n)]
+        if not beats(lambda array: quicksort(
+                array, introsort=True, three_way=True), make_input):
+            break
+        thresholds["duplicates_min_ratio"] = \
+            estimate("duplicates", make_input())
+    
+    # integers in ranges of increasing length
+    thresholds["counting_min_length"] = float("inf")
+    for length in [2 ** 16, 2 ** 17, 2 ** 18, 2 ** 19, 2 ** 20]:
+        make_input = lambda: [random.randrange(length // 256) 
+                              for _ in range(length)]
+        if beats(counting_sort, make_input):
+            thresholds["counting_min_length"] = length
+            break
+    
+    # the advantage of counting sort grows with the number of items
+    thresholds["counting_max_range_ratio"] = 0
+    length = 2 ** 20
+    for ratio in [1 / 256, 1 / 64, 1 / 16, 1 / 4, 1]:
+        make_input = lambda: [random.randrange(max(1, int(length * ratio))) 
+                              for _ in range(length)]
+        if not beats(counting_sort, make_input):
+            break
+        thresholds["counting_max_range_ratio"] = ratio
+    
+    # 64-bit integers, too spread out for counting sort
+    thresholds["radix_min_length"] = float("inf")
+    for length in [2 ** 16, 2 ** 17, 2 ** 18, 2 ** 19, 2 ** 20]:
+        make_input = lambda: [random.randrange(-2 ** 63, 2 ** 63) 
+                              for _ in range(length)]
+        if beats(radix_sort, make_input):
+            thresholds["radix_min_length"] = length
+            break
+    
+    return thresholds
+
+
+if __name__ == "__main__":
+    benchmark_top_k()
+    benchmark_k_way_merge()
+    print("sorting.sort() thresholds:", tune_sort_thresholds())
@@ -0,0 +1,216 @@
+import numpy as np
+
+from math import ceil
+
+
+# ranges with at most this number of items are finished with ndarray.sort, as
+# the overhead of a vectorized partition is not worth it
+SORT_THRESHOLD = 1024
+
+
+def as_ndarray(array):
+    """Return a one-dimensional ndarray sharing memory with the array, if it
+    is an ndarray or a writable object supporting the buffer protocol (e.g.
+    array.array, memoryview, bytearray). Otherwise, return None.
+    
+    No item is copied, so in-place operations on the returned ndarray are
+    reflected in the original array.
+    """
+    
+    if isinstance(array, np.ndarray):
+        return array if array.ndim == 1 else None
+    
+    try:
+        view = memoryview(array)
+    except TypeError:  # e.g. list
+        return None
+    if view.readonly or view.ndim != 1:
+        return None
+    return np.asarray(view)
+
+
+def partition3(array, start, end, pivot_index):
+    """Vectorized three-way partition scheme.
+    
+    In-place partition array items in the range [start, end] into three groups
+    according to a pivot value (< pivot, == pivot, > pivot) with boolean masks.
+    
+    Return the first and last positions of the band of items equal to the
+    pivot value.
+    
+    Time/space complexity analysis: see algorithms.partition3().
+    """
+    
+    assert 0 <= start <= pivot_index <= end < len(array)
+    
+    segment = array[start:end + 1]
+    pivot_value = segment[pivot_index - start]
+    less, greater = segment < pivot_value, segment > pivot_value
+    left, right = segment[less], segment[greater]
+    equal = segment[~(less | greater)]
+    
+    segment[:len(left)] = left
+    segment[len(left):len(left) + len(equal)] = equal
+    segment[len(left) + len(equal):] = right
+    return start + len(left), end - len(right)
+
+
+def medians_of_5(array, start, end):
+    """In-place sort the groups of (at most) 5 consecutive items of the array
+    in the range [start, end] and return a new ndarray with their medians.
+    If a group has an even number of items pick the upper median, as in
+    algorithms.median_up_to_5().
+    
+    Time complexity analysis:
+    Best: O(n)
+    Average: O(n)
+    Worst: O(n)
+    
+    Space complexity analysis:
+    Best: O(n)
+    Average: O(n)
+    Worst: O(n)
+    """
+    
+    assert 0 <= start <= end < len(array)
+    
+    segment = array[start:end + 1]
+    full = len(segment) // 5 * 5
+    
+    # sort all the complete groups at once through a (n/5, 5) view
+    groups = segment[:full].reshape(-1, 5)
+    groups.sort(axis=1)
+    medians = groups[:, 2]
+    
+    if full < len(segment):  # last group with less than 5 items
+        last = segment[full:]
+        last.sort()
+        medians = np.append(medians, last[len(last) // 2])
+    return medians.copy()
+
+
+def median_of_medians_pivot(array, start, end):
+    """Vectorized median of medians algorithm.
+    
+    Return the index of an approximate median of the array in the range
+    [start, end], guaranteed to be between the 30th and 70th percentiles.
+    
+    Time/space complexity analysis: see algorithms.median_of_medians().
+    """
+    
+    medians = medians_of_5(array, start, end)
+    if len(medians) == 1:
+        # the range has been sorted by medians_of_5
+        return ceil((start + end) / 2)
+    
+    median = quickselect(
+        medians, len(medians) // 2 + 1, median_of_medians_pivot)
+    return start + int(np.flatnonzero(array[start:end + 1] == median)[0])
+
+
+def quicksort(array, start, end, pivot_fn):
+    """Vectorized quicksort algorithm.
+    
+    In-place sort the items of the array in the range [start, end] by
+    iteratively three-way partitioning them with boolean masks. As in
+    algorithms._introsort(), ranges that exceed a depth budget of 2 * log2(n)
+    partitioning levels are sorted with heapsort, while ranges with at most
+    SORT_THRESHOLD items are finished by ndarray.sort.
+    
+    Time/space complexity analysis: see algorithms._introsort().
+    """
+    
+    if end <= start:
+        return
+    
+    max_depth = 2 * ((end - start + 1).bit_length() - 1)
+    stack = [(start, end, max_depth)]
+    while stack:
+        start, end, depth = stack.pop()
+        while end - start + 1 > SORT_THRESHOLD:
+            if depth == 0:
+                array[start:end + 1].sort(kind="heapsort")
+                break
+            depth -= 1
+            
+            pivot_index = pivot_fn(array, start, end)
+            low, high = partition3(array, start, end, pivot_index)
+            
+            # defer the larger part and keep on partitioning the smaller one
+            if low - start <= end - high:
+                stack.append((high + 1, end, depth))
+                end = low - 1
+            else:
+                stack.append((start, low - 1, depth))
+                start = high + 1
+        else:
+            if start < end:
+                array[start:end + 1].sort()
+
+
+def quickselect(array, k, pivot_fn):
+    """Vectorized quickselect algorithm.
+    
+    Return the k-th smallest element in the array by iteratively three-way
+    partitioning it with boolean masks.
+    
+    Time/space complexity analysis: see algorithms.quickselect().
+    """
+    
+    assert 1 <= k <= len(array)
+    
+    start, end = 0, len(array) - 1
+    while start < end:
+        pivot_index = pivot_fn(array, start, end)
+        low, high = partition3(array, start, end, pivot_index)
+        
+        if low + 1 <= k <= high + 1:
+            # the k-th smallest element is (equal to) the pivot
+            break
+        elif k < low + 1:
+            end = low - 1  # search in the left part
+        else:
+            start = high + 1  # search in the right part
+    return array[k - 1]
+
+
+def counting_sort(array, key_fn=None, output=None):
+    """Vectorized counting sort algorithm.
+    
+    Return a copy of the ndarray sorted in a stable way according to the 
+    integer keys returned by key_fn, which is called once on the whole ndarray 
+    and must return an ndarray of keys (arithmetic key functions, e.g. 
+    lambda x: x % 3, already do). If key_fn is None, items are their own keys. 
+    Note that sorting.counting_sort() calls its key_fn once per item instead, 
+    and only delegates to this function when key_fn is None.
+    If output is given, the sorted items are written into it instead.
+    
+    The histogram of the keys is computed by np.bincount over the range from 
+    the minimum to the maximum key. If items are their own keys, each value is 
+    just repeated as many times as it is counted. Otherwise, items are 
+    gathered in the order of a stable sort of the key offsets, stored in the 
+    smallest unsigned type that fits them (NumPy uses radix sort for types of 
+    up to 16 bits).
+    
+    Time/space complexity analysis: see sorting.counting_sort().
+    """
+    
+    keys = array if key_fn is None else np.asarray(key_fn(array))
+    assert keys.shape == array.shape and \
+        np.issubdtype(keys.dtype, np.integer), "Keys must be integer ndarrays"
+    
+    sorted_array = np.empty_like(array) if output is None else output
+    if len(array) == 0:
+        return sorted_array
+    
+    # offsets are computed in 64 bits, as they overflow narrow key types
+    low, high = int(keys.min()), int(keys.max())
+    offsets = keys.astype(np.int64) - low
+    if key_fn is None:
+        counts = np.bincount(offsets, minlength=high - low + 1)
+        values = np.arange(low, high + 1, dtype=array.dtype)
+        sorted_array[:] = np.repeat(values, counts)
+    else:
+        offsets = offsets.astype(np.min_scalar_type(high - low))
+        sorted_array[:] = array[np.argsort(offsets, kind="stable")]
+    return sorted_array
@@ -0,0 +1,186 @@
+import random
+import unittest
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: there is no backend to test
+    raise unittest.SkipTest("NumPy not available")
+
+from array import array as typed_array
+from algorithms import median_of_medians, median_of_medians_pivot, \
+    nlargest, nsmallest, quickselect, quicksort
+from algorithms_numpy import as_ndarray, counting_sort, medians_of_5, \
+    partition3
+
+
+class TestAsNdarray(unittest.TestCase):
+
+    def test_as_ndarray(self):
+        self.assertIsNone(as_ndarray([1, 2]), "Lists must not be converted")
+        self.assertIsNone(as_ndarray(b"ab"), "Read-only buffers are invalid")
+        self.assertIsNone(
+            as_ndarray(np.zeros((2, 2))), "Only 1-d arrays are valid")
+        
+        # no item must be copied
+        array = typed_array("q", [3, 1, 2])
+        as_ndarray(array)[0] = 4
+        self.assertEqual(array[0], 4, "Buffer items have been copied")
+
+
+class TestPartition(unittest.TestCase):
+
+    def test_partition(self):
+        random.seed(42)
+        max_length = 10
+        repetitions_per_length = 100
+        int_range = (0, 5)
+        
+        # generate random arrays of integers of variable length
+        for length in range(1, max_length + 1):
+            for _ in range(length * repetitions_per_length):
+                array = np.array(
+                    [random.randint(*int_range) for _ in range(length)])
+                array_rep = str(array)
+                pivot_index = random.randint(0, length - 1)
+                pivot_value = array[pivot_index]
+                
+                # same band of the pure-Python three-way partition
+                low, high = partition3(array, 0, length - 1, pivot_index)
+                self.assertEqual(
+                    (low, high), 
+                    (sum(i < pivot_value for i in array), 
+                     length - 1 - sum(i > pivot_value for i in array)),
+                    "Wrong partition band in {}".format(array_rep))
+                self.assertTrue(
+                    all(array[:low] < pivot_value) and
+                    all(array[low:high + 1] == pivot_value) and
+                    all(array[high + 1:] > pivot_value),
+                    "Wrong partitioning of {} by {}: {}".format(
+                        array_rep, pivot_value, array))
+    
+    def test_medians_of_5(self):
+        array = np.array([5, 1, 4, 2, 3, 9, 7, 8])
+        medians = medians_of_5(array, 0, 7)
+        self.assertEqual(list(medians), [3, 8], "Wrong medians of groups")
+        self.assertEqual(
+            list(array), [1, 2, 3, 4, 5, 7, 8, 9], "Groups must be sorted")
+
+
+class TestVectorizedBackend(unittest.TestCase):
+
+    def test_quicksort(self):
+        random.seed(42)
+        lengths = [0, 1, 2, 5, 10, 100, 1025, 5000]
+        int_ranges = [(0, 3), (-10 ** 6, 10 ** 6)]
+        
+        for length in lengths:
+            for int_range in int_ranges:
+                for pivot_fn in [None, median_of_medians_pivot]:
+                    items = [random.randint(*int_range) for _ in range(length)]
+                    array = np.array(items)
+                    if pivot_fn is None:
+                        quicksort(array)
+                    else:
+                        quicksort(array, pivot_fn=pivot_fn)
+                    quicksort(items)
+                    self.assertEqual(
+                        list(array), items,
+                        "Error while sorting {} items".format(length))
+        
+        # typed arrays are sorted in place as well
+        items = [random.random() for _ in range(5000)]
+        array = typed_array("d", items)
+        quicksort(array)
+        self.assertEqual(list(array), sorted(items), "Error while sorting")
+        
+        # first item pivot on sorted input must hit the depth budget
+        array = np.arange(100000)
+        quicksort(array, pivot_fn=lambda array, start, end: start)
+        self.assertTrue(
+            np.array_equal(array, np.arange(100000)), "Error while sorting")
+    
+    def test_selection(self):
+        random.seed(42)
+        lengths = [1, 2, 5, 10, 100, 5000]
+        int_ranges = [(0, 3), (-10 ** 6, 10 ** 6)]
+        
+        for length in lengths:
+            for int_range in int_ranges:
+                items = [random.randint(*int_range) for _ in range(length)]
+                sorted_items = sorted(items)
+                for j in {1, length // 3 + 1, (length + 1) // 2, length}:
+                    for select_fn in [quickselect, median_of_medians]:
+                        array = np.array(items)
+                        if length <= 100:
+                            self.assertEqual(
+                                select_fn(array, j), 
+                                select_fn(items.copy(), j),
+                                "Error while picking {}-th minimum".format(j))
+                        self.assertEqual(
+                            select_fn(array, j), sorted_items[j - 1],
+                            "Error while picking {}-th minimum".format(j))
+    
+    def test_top_k(self):
+        random.seed(42)
+        items = [random.randint(-10 ** 6, 10 ** 6) for _ in range(5000)]
+        array = np.array(items)
+        for k in [0, 1, 10, 5000]:
+            self.assertEqual(
+                nsmallest(array, k), sorted(items)[:k],
+                "Error while picking {} smallest items".format(k))
+            self.assertEqual(
+                nlargest(array, k), sorted(items, reverse=True)[:k],
+                "Error while picking {} largest items".format(k))
+        self.assertIs(
+            type(nsmallest(array, 1)[0]), int, "Items must be Python scalars")
+        self.assertEqual(list(array), items, "The input must not change")
+    
+    def test_counting_sort(self):
+        random.seed(42)
+        lengths = [0, 1, 2, 10, 1000]
+        int_ranges = [(0, 3), (-100, 100), (10 ** 12, 10 ** 12 + 50)]
+        
+        with self.assertRaises(AssertionError):
+            counting_sort(np.array([0.5, 1.5]))  # test non-integer keys
+        
+        for length in lengths:
+            for int_range in int_ranges:
+                items = [random.randint(*int_range) for _ in range(length)]
+                array = np.array(items, dtype=np.int64)
+                self.assertEqual(
+                    list(counting_sort(array)), sorted(items),
+                    "Error while sorting {}".format(items))
+                
+                # items with the same key keep their order
+                for key_fn in [lambda x: x % 3, lambda x: -x]:
+                    self.assertEqual(
+                        list(counting_sort(array, key_fn)), 
+                        sorted(items, key=key_fn),
+                        "Error while sorting {}".format(items))
+                self.assertEqual(
+                    list(array), items, "The input must not change")
+        
+        # narrow types, whose range does not fit the type itself
+        for dtype, int_range in [(np.int8, (-128, 127)), 
+                                 (np.int16, (-30000, 30000))]:
+            items = [random.randint(*int_range) for _ in range(1000)]
+            items[:2] = int_range
+            array = np.array(items, dtype=dtype)
+            self.assertEqual(list(counting_sort(array)), sorted(items))
+            self.assertEqual(
+                list(counting_sort(array, lambda x: x)), sorted(items))
+        self.assertEqual(
+            list(counting_sort(np.array([-100, 100, 5, -3], dtype=np.int8))), 
+            [-100, -3, 5, 100])
+        
+        # floats sorted by integer keys
+        array = np.array([random.random() for _ in range(1000)])
+        output = np.empty_like(array)
+        counting_sort(array, lambda x: (x * 10).astype(int), output)
+        self.assertEqual(
+            list(output), sorted(array, key=lambda x: int(x * 10)),
+            "Error while sorting floats")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
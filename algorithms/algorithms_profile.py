@@ -0,0 +1,204 @@
+import algorithms
+
+from time import perf_counter
+
+
+class Profile:
+    """Report of an instrumented call to a sorting or selection routine of the
+    algorithms module (see profile()).
+    
+    - comparisons: number of comparisons between items (or keys);
+    - writes: number of item writes into the input array (a swap is 2 writes);
+    - partitions: one (start, end, low, high) tuple per partitioning, meaning
+    that the range [start, end] has been split into [start, low - 1], the band
+    [low, high] of the items equal to the pivot (or between the two pivots of
+    floyd_rivest) and [high + 1, end];
+    - depths: the depth of each partitioning in the recursion tree, whether
+    the routine actually recurses or keeps an explicit stack of ranges;
+    - elapsed: wall-clock time of the call, in seconds.
+    """
+    
+    def __init__(self):
+        self.comparisons = 0
+        self.writes = 0
+        self.partitions = []
+        self.depths = []
+        self.elapsed = 0.0
+        self._ranges = {}  # id(array) -> (array, stack of enclosing ranges)
+    
+    @property
+    def max_depth(self):
+        return max(self.depths, default=0)
+    
+    @property
+    def imbalances(self):
+        """Return the imbalance ratio of each partitioning: the size of the
+        larger part over the size of both parts (pivot band excluded), from
+        0.5 (perfectly balanced) to 1 (all the items on one side).
+        Partitionings leaving no item outside the pivot band are skipped.
+        """
+        
+        ratios = []
+        for start, end, low, high in self.partitions:
+            left, right = low - start, end - high
+            if left + right > 0:
+                ratios.append(max(left, right) / (left + right))
+        return ratios
+    
+    @property
+    def mean_imbalance(self):
+        """Return the imbalance ratio of all the partitionings together,
+        weighted by the size of their ranges: unlike the worst ratio, it is
+        not dominated by the tiny ranges at the bottom of the recursion tree.
+        """
+        
+        larger, total = 0, 0
+        for start, end, low, high in self.partitions:
+            left, right = low - start, end - high
+            larger += max(left, right)
+            total += left + right
+        return larger / total if total else 0.5
+    
+    def _record(self, array, start, end, low, high):
+        """Add a partitioning of the array in the range [start, end].
+        
+        Ranges are partitioned in depth-first order, so the ones enclosing the
+        current range are the stack of the previous ranges that contain it.
+        """
+        
+        # keep a reference to the array, so that its id is not reused
+        _, stack = self._ranges.setdefault(id(array), (array, []))
+        while stack and not (stack[-1][0] <= start and end <= stack[-1][1]):
+            stack.pop()
+        stack.append((start, end))
+        self.depths.append(len(stack))
+        self.partitions.append((start, end, low, high))
+    
+    def __str__(self):
+        return "comparisons: {}, writes: {}, partitions: {}, max depth: {}, " \
+            "mean imbalance: {:.2f}, elapsed: {:.6f} s".format(
+                self.comparisons, self.writes, len(self.partitions),
+                self.max_depth, self.mean_imbalance, self.elapsed)
+    
+    def __repr__(self):
+        return "Profile - {}".format(self)
+
+
+class _Counted:
+    """Wrapper of an item that counts its comparisons into a Profile."""
+    
+    __slots__ = ("value", "profile")
+    
+    def __init__(self, value, profile):
+        self.value = value
+        self.profile = profile
+    
+    def __lt__(self, other):
+        self.profile.comparisons += 1
+        return self.value < _unwrap(other)
+    
+    def __le__(self, other):
+        self.profile.comparisons += 1
+        return self.value <= _unwrap(other)
+    
+    def __gt__(self, other):
+        self.profile.comparisons += 1
+        return self.value > _unwrap(other)
+    
+    def __ge__(self, other):
+        self.profile.comparisons += 1
+        return self.value >= _unwrap(other)
+    
+    def __eq__(self, other):
+        self.profile.comparisons += 1
+        return self.value == _unwrap(other)
+    
+    def __ne__(self, other):
+        self.profile.comparisons += 1
+        return self.value != _unwrap(other)
+    
+    def __hash__(self):
+        return hash(self.value)
+
+
+class _CountingList(list):
+    """List that counts the writes of its items into a Profile."""
+    
+    def __init__(self, items, profile):
+        super().__init__(items)
+        self.profile = profile
+    
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            self.profile.writes += len(value)
+        else:
+            self.profile.writes += 1
+        super().__setitem__(index, value)
+
+
+def _unwrap(item):
+    """Return the original item (or list of items) of a _Counted wrapper."""
+    
+    if isinstance(item, _Counted):
+        return item.value
+    if isinstance(item, list):
+        return [_unwrap(i) for i in item]
+    return item
+
+
+def _recording(partition_fn, report):
+    """Return a wrapper of a partition helper (returning the band (low, high)
+    of the partitioned range) that records its calls into the report.
+    """
+    
+    def wrapper(array, start, end, *args, **kwargs):
+        low, high = partition_fn(array, start, end, *args, **kwargs)
+        report._record(array, start, end, low, high)
+        return low, high
+    
+    return wrapper
+
+
+# helpers of the algorithms module through which every partitioning goes
+_PARTITION_HELPERS = ["_partition_band", "_partition_between"]
+
+
+def profile(fn, array, *args, **kwargs):
+    """Call fn(array, *args, **kwargs), where fn is a sorting or selection
+    routine of the algorithms module (e.g. quicksort, median_of_medians), and
+    return a tuple with its result and a Profile report of the call.
+    
+    Items are wrapped into objects counting their comparisons, while the
+    partition helpers of the algorithms module are temporarily replaced by
+    recording ones. Hence, the routines themselves carry no instrumentation
+    and cost nothing more when they are not profiled. The array is processed
+    as a list (the pure-Python path), then the resulting order of its items
+    is copied back. A key function, if given, is wrapped too.
+    
+    As the algorithms module is patched during the call, routines must not be
+    run concurrently from other threads while profiling.
+    """
+    
+    report = Profile()
+    items = _CountingList((_Counted(item, report) for item in array), report)
+    key = kwargs.get("key")
+    if key is not None:
+        kwargs["key"] = lambda item: _Counted(key(item.value), report)
+    
+    originals = {
+        name: getattr(algorithms, name) for name in _PARTITION_HELPERS}
+    try:
+        for name, partition_fn in originals.items():
+            setattr(algorithms, name, _recording(partition_fn, report))
+        start = perf_counter()
+        result = fn(items, *args, **kwargs)
+        report.elapsed = perf_counter() - start
+    finally:
+        for name, partition_fn in originals.items():
+            setattr(algorithms, name, partition_fn)
+        report._ranges.clear()
+    
+    for i, item in enumerate(items):
+        array[i] = item.value
+    return _unwrap(result), report
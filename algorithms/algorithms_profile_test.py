@@ -0,0 +1,116 @@
+import random
+import unittest
+
+import algorithms
+
+from array import array as typed_array
+from algorithms import average_pivot, floyd_rivest, median_of_medians, \
+    quickselect, quicksort
+from algorithms_profile import profile
+
+
+class TestProfile(unittest.TestCase):
+
+    def test_profile_results(self):
+        random.seed(42)
+        max_length = 50
+        repetitions_per_length = 10
+        int_range = (-50, 50)
+        
+        # profiled routines must behave as the plain ones
+        for length in range(1, max_length + 1):
+            for _ in range(repetitions_per_length):
+                array = [random.randint(*int_range) for _ in range(length)]
+                array_rep = str(array)
+                array_copy = sorted(array)
+                k = random.randint(1, length)
+                
+                for select_fn in [quickselect, median_of_medians, floyd_rivest]:
+                    item, _ = profile(select_fn, array.copy(), k)
+                    self.assertEqual(
+                        item, array_copy[k - 1],
+                        "Error while selecting in {}".format(array_rep))
+                
+                result, report = profile(quicksort, array, introsort=True)
+                self.assertIsNone(result)
+                self.assertEqual(
+                    array, array_copy,
+                    "Error while sorting {}".format(array_rep))
+                
+                array = typed_array("q", array)
+                profile(quicksort, array, key=lambda item: -item)
+                self.assertEqual(
+                    list(array), array_copy[::-1],
+                    "Error while sorting {}".format(array_rep))
+        
+        # the original partition helpers are restored
+        self.assertIs(
+            algorithms._partition_band.__module__, algorithms.__name__)
+    
+    def test_profile_report(self):
+        array = []
+        _, report = profile(quicksort, array)
+        self.assertEqual(report.comparisons, 0)
+        self.assertEqual(report.writes, 0)
+        self.assertEqual(report.max_depth, 0)
+        self.assertEqual(report.mean_imbalance, 0.5)
+        
+        # the first item is the worst pivot for a sorted array
+        length = 100
+        first_pivot = lambda array, start, end: start
+        array = list(range(length))
+        _, report = profile(quicksort, array, pivot_fn=first_pivot)
+        self.assertEqual(array, list(range(length)))
+        self.assertEqual(len(report.partitions), length - 1)
+        self.assertEqual(report.max_depth, length - 1)
+        self.assertEqual(report.imbalances, [1.0] * (length - 1))
+        self.assertGreaterEqual(report.comparisons, length * (length - 1) / 2)
+        
+        # the central item is the best pivot for a sorted array
+        _, report = profile(quicksort, array, pivot_fn=average_pivot)
+        self.assertLessEqual(report.max_depth, length.bit_length())
+        self.assertLess(report.mean_imbalance, 0.55)
+        
+        # depths grow by one level at a time
+        random.seed(42)
+        array = [random.random() for _ in range(10000)]
+        _, report = profile(quicksort, array)
+        self.assertEqual(report.depths[0], 1)
+        for previous, depth in zip(report.depths, report.depths[1:]):
+            self.assertLessEqual(depth, previous + 1)
+        self.assertGreater(report.writes, 0)
+        self.assertGreater(report.elapsed, 0)
+
+    
+    def test_auto_pivot_duplicates(self):
+        # few distinct values switch to the three-way partition
+        random.seed(42)
+        length = 20000
+        array = [random.randint(0, 1) for _ in range(length)]
+        array_copy = sorted(array)
+        _, report = profile(quicksort, array, pivot_fn="auto")
+        self.assertEqual(array, array_copy)
+        self.assertLessEqual(report.max_depth, 4)
+        self.assertLess(report.comparisons, 4 * length)
+    
+    def test_floyd_rivest_comparisons(self):
+        # about n + min(k, n - k) comparisons, plus the sampling ones, which 
+        # weigh more on small arrays (falling back to the median of medians 
+        # strategy would take 5n to 16n)
+        random.seed(42)
+        for length, slack in [(1000, 2.5), (10 ** 5, 0.5)]:
+            for k in [1, 100, length // 2, length - 100, length]:
+                for _ in range(3):
+                    array = [random.random() for _ in range(length)]
+                    array_copy = sorted(array)
+                    item, report = profile(floyd_rivest, array, k)
+                    self.assertEqual(item, array_copy[k - 1])
+                    self.assertLess(
+                        report.comparisons, 
+                        (1 + min(k, length - k) / length + slack) * length, 
+                        "Too many comparisons for k = {} of {}".format(
+                            k, length))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
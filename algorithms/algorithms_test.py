@@ -1,7 +1,22 @@
+import heapq
 import random
 import unittest
 
-from algorithms import median_of_medians, partition, quickselect, quicksort
+from array import array as typed_array
+from collections import Counter
+from multiprocessing import shared_memory
+from multiprocessing.shared_memory import SharedMemory
+from os import path
+from pickle import PicklingError
+from tempfile import TemporaryDirectory
+from unittest import mock
+from algorithms import PIVOT_STRATEGIES, auto_pivot, average_pivot, \
+    distributed_quickselect, floyd_rivest, heapsort, insertion_sort, \
+    mapped_array, median_of_3, median_of_medians, median_of_medians_pivot, \
+    nlargest, nsmallest, parallel_quicksort, partial_sort, partition, \
+    partition3, quickselect, quickselect_file, quickselect_many, quicksort, \
+    quicksort_file, register_pivot_strategy, seed_random_pivot, \
+    weighted_median, weighted_quickselect
 
 
 class TestPartition(unittest.TestCase):
@@ -162,6 +177,54 @@ class TestPartition(unittest.TestCase):
             "Wrong partitioning: {} vs {}".format(array, partitioning))
 
 
+class TestPartition3(unittest.TestCase):
+    
+    def test_partition3(self):
+        array = []
+        with self.assertRaises(AssertionError):
+            partition3(array, 0, 0, 0)
+        
+        array = [2, 1, 2, 3, 2]
+        partitioning = [1, 2, 2, 2, 3]
+        band = partition3(array, 0, 4, 0)  # partition by 2 all the array
+        self.assertEqual(
+            band, (1, 3), 
+            "Wrong equal band {} in {}".format(band, array))
+        self.assertEqual(
+            array, partitioning, 
+            "Wrong partitioning: {} vs {}".format(array, partitioning))
+        
+        array = [3, 1, 1, 1, 0]
+        partitioning = [3, 0, 1, 1, 1]
+        band = partition3(array, 1, 4, 1)  # partition by 1 the last items
+        self.assertEqual(
+            band, (2, 4), 
+            "Wrong equal band {} in {}".format(band, array))
+        self.assertEqual(
+            array, partitioning, 
+            "Wrong partitioning: {} vs {}".format(array, partitioning))
+        
+        random.seed(42)
+        max_length = 10
+        repetitions_per_length = 100
+        int_range = (0, 3)
+        
+        # generate random lists of integers of variable length
+        for length in range(1, max_length + 1):
+            for _ in range(length * repetitions_per_length):
+                array = [random.randint(*int_range) for _ in range(length)]
+                array_rep = str(array)
+                pivot_index = random.randint(0, length - 1)
+                pivot_value = array[pivot_index]
+                low, high = partition3(array, 0, length - 1, pivot_index)
+                self.assertTrue(
+                    all(i < pivot_value for i in array[:low]) and
+                    all(i == pivot_value for i in array[low:high + 1]) and
+                    all(i > pivot_value for i in array[high + 1:]),
+                    "Wrong partitioning of {} by {}: {}".format(
+                        array_rep, pivot_value, array))
+
+
 class TestQuicksort(unittest.TestCase):
     
     def test_quicksort(self):
@@ -181,6 +244,314 @@ class TestQuicksort(unittest.TestCase):
                 self.assertEqual(
                     array, array_copy, 
                     "Error while sorting {}".format(array_rep))
+    
+    def test_quicksort_deep(self):
+        # a sorted array with the average pivot must not hit the recursion 
+        # limit, as only the smaller part is sorted recursively
+        array = list(range(100000))
+        quicksort(array)
+        self.assertEqual(array, list(range(100000)), "Error while sorting")
+    
+    def test_introsort(self):
+        random.seed(42)
+        max_length = 40
+        repetitions_per_length = 100
+        int_range = (-50, 50)
+        first_pivot = lambda array, start, end: start
+        
+        # generate random lists of integers of variable length
+        for length in range(max_length + 1):
+            for pivot_fn in [first_pivot, median_of_medians_pivot]:
+                for _ in range(length * repetitions_per_length):
+                    array = [random.randint(*int_range) for _ in range(length)]
+                    array_rep = str(array)
+                    array_copy = array.copy()
+                    quicksort(array, pivot_fn=pivot_fn, introsort=True)
+                    array_copy.sort()
+                    self.assertEqual(
+                        array, array_copy, 
+                        "Error while sorting {}".format(array_rep))
+        
+        # the first item pivot is quadratic on sorted input: the depth budget 
+        # must hand the ranges over to heapsort
+        array = list(range(100000))
+        quicksort(array, pivot_fn=first_pivot, introsort=True)
+        self.assertEqual(array, list(range(100000)), "Error while sorting")
+        
+        # sort a range only
+        array = [5, 4, 3, 2, 1]
+        quicksort(array, 1, 3, introsort=True)
+        self.assertEqual(array, [5, 2, 3, 4, 1], "Error while sorting range")
+    
+    def test_quicksort_three_way(self):
+        random.seed(42)
+        max_length = 40
+        repetitions_per_length = 100
+        int_range = (0, 3)  # duplicate-heavy data
+        
+        # generate random lists of integers of variable length
+        for length in range(max_length + 1):
+            for introsort in [False, True]:
+                for _ in range(length * repetitions_per_length // 10):
+                    array = [random.randint(*int_range) for _ in range(length)]
+                    array_rep = str(array)
+                    array_copy = array.copy()
+                    quicksort(array, introsort=introsort, three_way=True)
+                    array_copy.sort()
+                    self.assertEqual(
+                        array, array_copy, 
+                        "Error while sorting {}".format(array_rep))
+        
+        # a single partition is enough for an array of equal items
+        array = 100000 * [1]
+        quicksort(array, three_way=True)
+        self.assertEqual(array, 100000 * [1], "Error while sorting")
+
+
+class TestKeyedQuicksort(unittest.TestCase):
+    
+    def test_quicksort_key(self):
+        random.seed(42)
+        max_length = 40
+        repetitions_per_length = 10
+        int_range = (-5, 5)
+        calls = Counter()
+        
+        def key_fn(record):
+            calls[record[0]] += 1
+            return record[1]
+        
+        # generate random lists of (id, value) records of variable length
+        for length in range(max_length + 1):
+            for _ in range(length * repetitions_per_length):
+                for pivot_fn in [average_pivot, median_of_medians_pivot]:
+                    for introsort in [False, True]:
+                        for three_way in [False, True]:
+                            reverse = random.random() < 0.5
+                            records = [(i, random.randint(*int_range)) 
+                                       for i in range(length)]
+                            records_rep = str(records)
+                            expected = sorted(
+                                records, key=lambda r: r[1], reverse=reverse)
+                            calls.clear()
+                            quicksort(
+                                records, pivot_fn=pivot_fn, 
+                                introsort=introsort, three_way=three_way, 
+                                key=key_fn, reverse=reverse)
+                            self.assertEqual(
+                                [r[1] for r in records], 
+                                [r[1] for r in expected],
+                                "Error while sorting {}".format(records_rep))
+                            self.assertEqual(
+                                sorted(records), sorted(expected),
+                                "Records lost while sorting {}".format(
+                                    records_rep))
+                            self.assertTrue(
+                                all(c == 1 for c in calls.values()),
+                                "Key computed more than once per item")
+        
+        # sort a range only
+        array = [5, 4, 3, 2, 1]
+        quicksort(array, 1, 3, key=lambda x: -x, reverse=True)
+        self.assertEqual(array, [5, 2, 3, 4, 1], "Error while sorting range")
+
+
+class TestParallelQuicksort(unittest.TestCase):
+    
+    def test_parallel_quicksort(self):
+        random.seed(42)
+        lengths = [0, 1, 2, 10, 100, 10000]
+        int_ranges = [(0, 3), (-2 ** 63, 2 ** 63 - 1)]
+        
+        for length in lengths:
+            for int_range in int_ranges:
+                for pivot_fn in [average_pivot, median_of_medians_pivot]:
+                    array = [random.randint(*int_range) for _ in range(length)]
+                    array_copy = sorted(array)
+                    parallel_quicksort(array, pivot_fn=pivot_fn, workers=2)
+                    self.assertEqual(
+                        array, array_copy, 
+                        "Error while sorting {} items".format(length))
+        
+        # buffers are sorted with their own item format
+        array = typed_array("d", [random.random() for _ in range(10000)])
+        array_copy = sorted(array)
+        parallel_quicksort(array, workers=2)
+        self.assertEqual(list(array), array_copy, "Error while sorting")
+    
+    def test_parallel_quicksort_errors(self):
+        random.seed(42)
+        blocks = []
+        
+        def create_block(*args, **kwargs):
+            blocks.append(SharedMemory(*args, **kwargs))
+            return blocks[-1]
+        
+        with mock.patch.object(
+                shared_memory, "SharedMemory", side_effect=create_block):
+            with self.assertRaises(AssertionError):
+                parallel_quicksort(b"read-only", workers=2)
+            with self.assertRaises(AssertionError):
+                strided = typed_array("q", range(100))
+                parallel_quicksort(memoryview(strided)[::2], workers=2)
+            
+            # lambdas cannot be sent to the workers
+            array = [random.random() for _ in range(10000)]
+            with self.assertRaises((AttributeError, PicklingError)):
+                parallel_quicksort(
+                    array, "d", pivot_fn=lambda a, s, e: s, workers=2)
+        
+        self.assertEqual(len(blocks), 1, "Invalid buffers must be rejected")
+        for block in blocks:
+            with self.assertRaises(FileNotFoundError):
+                SharedMemory(name=block.name)  # the block has been unlinked
+
+
+class TestDistributedQuickselect(unittest.TestCase):
+
+    def test_distributed_quickselect(self):
+        random.seed(42)
+        lengths = [1, 10, 100, 10000]
+        int_ranges = [(0, 3), (-2 ** 63, 2 ** 63 - 1)]
+        shards_number = 4
+        
+        with self.assertRaises(AssertionError):
+            distributed_quickselect([[], []], 1)  # test empty shards
+        
+        for length in lengths:
+            for int_range in int_ranges:
+                # shards of different lengths, possibly empty
+                shards = [[random.randint(*int_range) 
+                           for _ in range(random.randint(0, length))] 
+                          for _ in range(shards_number)]
+                array = [item for shard in shards for item in shard]
+                if not array:
+                    continue
+                for k in [1, len(array), random.randint(1, len(array))]:
+                    # a small sample forces several rounds
+                    item = distributed_quickselect(
+                        shards, k, workers=2, sample_size=8)
+                    self.assertEqual(
+                        item, quickselect(array.copy(), k, three_way=True), 
+                        "Error while selecting in {} items".format(
+                            len(array)))
+        
+        # buffers are scanned with their own item format
+        shards = [typed_array("d", [random.random() for _ in range(1000)]) 
+                  for _ in range(shards_number)]
+        array = [item for shard in shards for item in shard]
+        self.assertEqual(
+            distributed_quickselect(shards, 2000, workers=2), 
+            quickselect(array, 2000), 
+            "Error while selecting")
+
+
+class TestOutOfCore(unittest.TestCase):
+
+    @staticmethod
+    def write(file_path, array):
+        with open(file_path, "wb") as f:
+            array.tofile(f)
+    
+    @staticmethod
+    def read(file_path, typecode):
+        array = typed_array(typecode)
+        with open(file_path, "rb") as f:
+            array.frombytes(f.read())
+        return array
+    
+    def test_mapped_array(self):
+        with TemporaryDirectory() as directory:
+            file_path = path.join(directory, "items")
+            self.write(file_path, typed_array("q", [3, 1, 2]))
+            with mapped_array(file_path, "q") as array:
+                self.assertEqual(list(array), [3, 1, 2])
+                array[0] = 0
+            self.assertEqual(list(self.read(file_path, "q")), [0, 1, 2])
+            
+            self.write(file_path, typed_array("q"))
+            with mapped_array(file_path, "q") as array:
+                self.assertEqual(len(array), 0)
+    
+    def test_quicksort_file(self):
+        random.seed(42)
+        lengths = [0, 1, 2, 10, 100, 10000]
+        generators = {
+            "q": lambda: random.randint(-2 ** 63, 2 ** 63 - 1),
+            "i": lambda: random.randint(0, 3),
+            "d": random.random,
+        }
+        
+        with TemporaryDirectory() as directory:
+            file_path = path.join(directory, "items")
+            for length in lengths:
+                for typecode, generator in generators.items():
+                    # a tiny budget partitions the mapped pages in place
+                    for memory_budget in [64, 2 ** 20]:
+                        array = typed_array(
+                            typecode, [generator() for _ in range(length)])
+                        self.write(file_path, array)
+                        quicksort_file(
+                            file_path, typecode, memory_budget=memory_budget)
+                        self.assertEqual(
+                            list(self.read(file_path, typecode)), 
+                            sorted(array), 
+                            "Error while sorting {} items".format(length))
+    
+    def test_quickselect_file(self):
+        random.seed(42)
+        lengths = [1, 2, 10, 100, 10000]
+        int_ranges = [(0, 3), (-2 ** 63, 2 ** 63 - 1)]
+        
+        with TemporaryDirectory() as directory:
+            file_path = path.join(directory, "items")
+            for length in lengths:
+                for int_range in int_ranges:
+                    for memory_budget in [64, 2 ** 20]:
+                        array = typed_array(
+                            "q", 
+                            [random.randint(*int_range) 
+                             for _ in range(length)])
+                        array_copy = sorted(array)
+                        self.write(file_path, array)
+                        k = random.randint(1, length)
+                        item = quickselect_file(
+                            file_path, k, memory_budget=memory_budget)
+                        self.assertEqual(
+                            item, array_copy[k - 1], 
+                            "Error while selecting in {} items".format(length))
+                        # items are partitioned in place, not lost
+                        self.assertEqual(
+                            sorted(self.read(file_path, "q")), array_copy)
+
+
+class TestHeapsort(unittest.TestCase):
+    
+    def test_heapsort(self):
+        random.seed(42)
+        max_length = 10
+        repetitions_per_length = 100
+        int_range = (-50, 50)
+        
+        # generate random lists of integers of variable length
+        for length in range(max_length + 1):
+            for _ in range(length * repetitions_per_length):
+                for sort_fn in [heapsort, insertion_sort]:
+                    array = [random.randint(*int_range) for _ in range(length)]
+                    array_rep = str(array)
+                    array_copy = array.copy()
+                    sort_fn(array)
+                    array_copy.sort()
+                    self.assertEqual(
+                        array, array_copy, 
+                        "Error while sorting {}".format(array_rep))
+        
+        # sort a range only
+        for sort_fn in [heapsort, insertion_sort]:
+            array = [5, 4, 3, 2, 1]
+            sort_fn(array, 1, 3)
+            self.assertEqual(
+                array, [5, 2, 3, 4, 1], "Error while sorting range")
 
 
 class TestQuickselect(unittest.TestCase):
@@ -209,6 +580,164 @@ class TestQuickselect(unittest.TestCase):
                         quickselect(array, j), array_copy[j - 1],
                         "Error while picking {}-th minimum from {}".format(
                             j, array_rep))
+    
+    def test_quickselect_three_way(self):
+        random.seed(42)
+        max_length = 10
+        repetitions_per_length = 100
+        int_range = (0, 3)  # duplicate-heavy data
+        
+        # generate random lists of integers of variable length
+        for length in range(max_length + 1):
+            for _ in range(length * repetitions_per_length):
+                for j in range(1, length + 1):  # test every position
+                    array = [random.randint(*int_range) for _ in range(length)]
+                    array_rep = str(array)
+                    array_copy = sorted(array)
+                    self.assertEqual(
+                        quickselect(array, j, three_way=True), 
+                        array_copy[j - 1],
+                        "Error while picking {}-th minimum from {}".format(
+                            j, array_rep))
+                    array = array_copy.copy()
+                    random.shuffle(array)
+                    self.assertEqual(
+                        median_of_medians(array, j, three_way=True), 
+                        array_copy[j - 1],
+                        "Error while picking {}-th minimum from {}".format(
+                            j, array_rep))
+
+
+class TestKeyedQuickselect(unittest.TestCase):
+    
+    def test_quickselect_key(self):
+        random.seed(42)
+        max_length = 10
+        repetitions_per_length = 10
+        int_range = (-50, 50)
+        key_fn = lambda x: abs(x)
+        
+        # generate random lists of integers of variable length
+        for length in range(1, max_length + 1):
+            for _ in range(length * repetitions_per_length):
+                for j in range(1, length + 1):  # test every position
+                    for select_fn in [quickselect, median_of_medians]:
+                        for reverse in [False, True]:
+                            array = [random.randint(*int_range) 
+                                     for _ in range(length)]
+                            array_rep = str(array)
+                            expected = sorted(
+                                array, key=key_fn, reverse=reverse)[j - 1]
+                            selected = select_fn(
+                                array, j, key=key_fn, reverse=reverse)
+                            self.assertEqual(
+                                key_fn(selected), key_fn(expected),
+                                "Error while picking {}-th item from {}".format(
+                                    j, array_rep))
+                            self.assertIn(
+                                selected, array, "Unknown item selected")
+
+
+class TestQuickselectMany(unittest.TestCase):
+    
+    def test_quickselect_many(self):
+        random.seed(42)
+        max_length = 10
+        repetitions_per_length = 100
+        int_range = (-50, 50)
+        
+        with self.assertRaises(AssertionError):
+            quickselect_many([1], [1, 0])  # test 0 position
+            
+        with self.assertRaises(AssertionError):
+            quickselect_many([1], [2])  # test exceeding position
+        
+        self.assertEqual(quickselect_many([1], []), [], "Error with no ranks")
+        
+        # generate random lists of integers of variable length
+        for length in range(1, max_length + 1):
+            for _ in range(length * repetitions_per_length):
+                for three_way in [False, True]:
+                    array = [random.randint(*int_range) for _ in range(length)]
+                    array_rep = str(array)
+                    array_copy = sorted(array)
+                    # pick random ranks, possibly repeated and unordered
+                    ks = [random.randint(1, length) 
+                          for _ in range(random.randint(1, length))]
+                    self.assertEqual(
+                        quickselect_many(array, ks, three_way=three_way), 
+                        [array_copy[k - 1] for k in ks],
+                        "Error while picking {}-th minimums from {}".format(
+                            ks, array_rep))
+        
+        # percentiles of a large array
+        array = [random.random() for _ in range(10000)]
+        array_copy = sorted(array)
+        ks = [5000, 9000, 9500, 9900, 9990]
+        self.assertEqual(
+            quickselect_many(array, ks), [array_copy[k - 1] for k in ks],
+            "Error while picking percentiles")
+        
+        # the worst pivot on a sorted array needs no recursion
+        array = list(range(5000))
+        first_pivot = lambda array, start, end: start
+        self.assertEqual(
+            quickselect_many(array, [2500, 10], pivot_fn=first_pivot), 
+            [2499, 9], "Error with deep partitioning")
+
+
+class TestPartialSort(unittest.TestCase):
+    
+    def test_partial_sort(self):
+        random.seed(42)
+        max_length = 10
+        repetitions_per_length = 100
+        int_range = (-50, 50)
+        
+        with self.assertRaises(AssertionError):
+            partial_sort([1], 2)  # test exceeding length
+        
+        # generate random lists of integers of variable length
+        for length in range(max_length + 1):
+            for _ in range(length * repetitions_per_length):
+                for k in range(length + 1):  # test every prefix length
+                    for reverse in [False, True]:
+                        array = [random.randint(*int_range) 
+                                 for _ in range(length)]
+                        array_rep = str(array)
+                        expected = sorted(array, reverse=reverse)
+                        partial_sort(array, k, reverse=reverse)
+                        self.assertEqual(
+                            array[:k], expected[:k],
+                            "Error while sorting {} items of {}".format(
+                                k, array_rep))
+                        self.assertEqual(
+                            sorted(array), sorted(expected), 
+                            "Items lost while sorting {}".format(array_rep))
+    
+    def test_nsmallest_nlargest(self):
+        random.seed(42)
+        lengths = [0, 1, 10, 1000]
+        key_fn = lambda x: abs(x)
+        
+        for length in lengths:
+            array = [random.randint(-10 ** 6, 10 ** 6) for _ in range(length)]
+            for k in [-1, 0, 1, 10, 100, 2000]:
+                self.assertEqual(
+                    nsmallest(array, k), heapq.nsmallest(k, array),
+                    "Error while picking {} smallest items".format(k))
+                self.assertEqual(
+                    nlargest(array, k), heapq.nlargest(k, array),
+                    "Error while picking {} largest items".format(k))
+                # ties (x and -x) may be returned in a different order
+                self.assertEqual(
+                    list(map(key_fn, nsmallest(array, k, key_fn))), 
+                    list(map(key_fn, heapq.nsmallest(k, array, key_fn))),
+                    "Error while picking {} smallest items".format(k))
+                self.assertEqual(
+                    list(map(key_fn, nlargest(array, k, key_fn))), 
+                    list(map(key_fn, heapq.nlargest(k, array, key_fn))),
+                    "Error while picking {} largest items".format(k))
 
 
 class TestMedianOfMedians(unittest.TestCase):
@@ -239,5 +768,199 @@ class TestMedianOfMedians(unittest.TestCase):
                             j, array_rep))
 
 
+class TestWeightedQuickselect(unittest.TestCase):
+
+    def test_weighted_quickselect(self):
+        random.seed(42)
+        max_length = 20
+        repetitions_per_length = 50
+        int_range = (-10, 10)
+        weight_range = (0, 5)
+        
+        with self.assertRaises(AssertionError):
+            weighted_median([])  # test empty pairs
+        with self.assertRaises(AssertionError):
+            weighted_quickselect([(1, 1)], 2)  # test k above total weight
+        with self.assertRaises(AssertionError):
+            weighted_quickselect([(1, -1), (2, 3)], 1)  # test negative weight
+        
+        # compare with quickselect on the expanded arrays
+        for length in range(1, max_length + 1):
+            for _ in range(length * repetitions_per_length):
+                pairs = [(random.randint(*int_range), 
+                          random.randint(*weight_range)) 
+                         for _ in range(length)]
+                array = [value for value, weight in pairs 
+                         for _ in range(weight)]
+                if not array:
+                    continue
+                k = random.randint(1, len(array))
+                
+                for pivot_fn in PIVOT_STRATEGIES:
+                    self.assertEqual(
+                        weighted_quickselect(pairs, k, pivot_fn), 
+                        quickselect(array.copy(), k), 
+                        "Error while selecting {} in {}".format(k, pairs))
+                    self.assertEqual(
+                        weighted_median(pairs, pivot_fn), 
+                        median_of_medians(array.copy(), len(array) // 2 + 1), 
+                        "Error while selecting median in {}".format(pairs))
+    
+    def test_weighted_median_fractional(self):
+        pairs = [(1, 0.25), (2, 0.25), (3, 0.5)]
+        self.assertEqual(weighted_median(pairs), 3)
+        self.assertEqual(weighted_quickselect(pairs, 0.5), 2)
+        self.assertEqual(weighted_quickselect(pairs, 0.1), 1)
+        
+        # few distinct pairs stand for a huge number of items
+        pairs = [(value, 10 ** 9) for value in range(1000)]
+        self.assertEqual(weighted_median(pairs), 500)
+        self.assertEqual(weighted_quickselect(pairs, 10 ** 9 + 1), 1)
+
+
+class TestFloydRivest(unittest.TestCase):
+    
+    def test_floyd_rivest(self):
+        random.seed(42)
+        max_length = 10
+        repetitions_per_length = 100
+        int_range = (-50, 50)
+        
+        with self.assertRaises(AssertionError):
+            floyd_rivest([1], 0)  # test 0 position
+            
+        with self.assertRaises(AssertionError):
+            floyd_rivest([1], 2)  # test exceeding position
+        
+        # generate random lists of integers of variable length
+        for length in range(max_length + 1):
+            for _ in range(length * repetitions_per_length):
+                for j in range(1, length + 1):  # test every position
+                    array = [random.randint(*int_range) for _ in range(length)]
+                    array_rep = str(array)
+                    array_copy = sorted(array)
+                    self.assertEqual(
+                        floyd_rivest(array, j), array_copy[j - 1],
+                        "Error while picking {}-th minimum from {}".format(
+                            j, array_rep))
+    
+    def test_floyd_rivest_sampling(self):
+        random.seed(42)
+        lengths = [601, 5000, 50000]
+        # few distinct values make sampling fail and fall back to the median 
+        # of medians strategy
+        int_ranges = [(0, 0), (0, 3), (-10 ** 6, 10 ** 6)]
+        
+        for length in lengths:
+            for int_range in int_ranges:
+                array = [random.randint(*int_range) for _ in range(length)]
+                array_copy = sorted(array)
+                for j in [1, length // 10, length // 2, length]:
+                    self.assertEqual(
+                        floyd_rivest(array, j), array_copy[j - 1],
+                        "Error while picking {}-th minimum".format(j))
+        
+        # sorted input
+        array = list(range(50000))
+        self.assertEqual(floyd_rivest(array, 12345), 12344, "Wrong minimum")
+
+
+class TestPivotStrategies(unittest.TestCase):
+    
+    def test_median_of_3(self):
+        for array in [[1, 2, 3], [1, 3, 2], [2, 1, 3], [2, 3, 1], [3, 1, 2], 
+                      [3, 2, 1], [1, 1, 2], [2, 1, 1], [1, 1, 1]]:
+            median = median_of_3(array, 0, 1, 2)
+            self.assertEqual(
+                array[median], sorted(array)[1], 
+                "Wrong median of {}".format(array))
+    
+    def test_pivot_strategies(self):
+        random.seed(42)
+        seed_random_pivot(42)
+        max_length = 20
+        repetitions_per_length = 10
+        int_range = (-50, 50)
+        
+        # generate random lists of integers of variable length
+        for length in range(1, max_length + 1):
+            for _ in range(length * repetitions_per_length):
+                for name, pivot_fn in PIVOT_STRATEGIES.items():
+                    array = [random.randint(*int_range) for _ in range(length)]
+                    array_rep = str(array)
+                    array_copy = array.copy()
+                    pivot_index = pivot_fn(array, 0, length - 1)
+                    self.assertTrue(
+                        0 <= pivot_index < length,
+                        "Invalid {} pivot {} for {}".format(
+                            name, pivot_index, array_rep))
+                    
+                    # strategies can be passed by name
+                    quicksort(array, pivot_fn=name)
+                    array_copy.sort()
+                    self.assertEqual(
+                        array, array_copy, 
+                        "Error while sorting {} with {} pivot".format(
+                            array_rep, name))
+                    j = random.randint(1, length)
+                    self.assertEqual(
+                        quickselect(array, j, pivot_fn=name), 
+                        array_copy[j - 1],
+                        "Error while picking {}-th minimum with {} pivot".format(
+                            j, name))
+        
+        with self.assertRaises(AssertionError):
+            quicksort([2, 1], pivot_fn="unknown")
+        
+        register_pivot_strategy("last", lambda array, start, end: end)
+        array = [3, 1, 2]
+        quicksort(array, pivot_fn="last")
+        self.assertEqual(array, [1, 2, 3], "Error with registered strategy")
+        
+        # pivot functions picking an index are never given the items array
+        words = ["pear", "fig", "banana", "kiwi", "apple", "plum"] * 5
+        lengths = sorted(len(word) for word in words)
+        for pivot_fn in ["last", lambda array, start, end: start]:
+            array = words.copy()
+            quicksort(array, pivot_fn=pivot_fn, key=len)
+            self.assertEqual(
+                [len(word) for word in array], lengths, 
+                "Error while sorting with key")
+            self.assertEqual(
+                len(quickselect(words.copy(), 7, pivot_fn=pivot_fn, key=len)),
+                lengths[6], "Error while selecting with key")
+            array = words.copy()
+            partial_sort(array, 7, pivot_fn=pivot_fn, key=len)
+            self.assertEqual(
+                [len(word) for word in array[:7]], lengths[:7], 
+                "Error while partially sorting with key")
+        del PIVOT_STRATEGIES["last"]
+    
+    def test_auto_pivot(self):
+        random.seed(42)
+        length = 20000
+        inputs = {
+            "random": [random.random() for _ in range(length)],
+            "sorted": list(range(length)),
+            "reversed": list(reversed(range(length))),
+            "organ pipe": list(range(length // 2)) + 
+                list(reversed(range(length // 2))),
+            "nearly sorted": [i + random.randint(0, 50) for i in range(length)],
+            "few distinct": [random.randint(0, 3) for _ in range(length)],
+        }
+        
+        # the pivot of sorted ranges is the central item
+        self.assertEqual(
+            auto_pivot(inputs["sorted"], 0, length - 1), (length - 1) // 2,
+            "Wrong pivot for sorted input")
+        
+        for name, array in inputs.items():
+            array_copy = sorted(array)
+            # no quadratic behaviour (nor recursion errors) on these shapes
+            quicksort(array, pivot_fn="auto", three_way=True)
+            self.assertEqual(
+                array, array_copy, "Error while sorting {} input".format(name))
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,254 @@
+from math import ceil
+from random import Random
+
+
+class OrderStatisticTree:
+    """Order statistic tree.
+    ref: https://en.wikipedia.org/wiki/Order_statistic_tree
+    
+    A dynamic multiset of comparable items supporting insertions, removals
+    and order statistic queries (k-th smallest item, rank of an item) in
+    logarithmic time. It generalizes the two-heap running median, which only
+    tracks the median, to any rank: where quickselect answers a single query
+    on a static array in O(n), the tree answers each query in O(log n) while
+    the items change.
+    
+    The tree is a treap (ref: https://en.wikipedia.org/wiki/Treap): a binary
+    search tree on the items that is also a heap on random priorities, hence
+    its expected height is O(log n) whatever the order of the updates.
+    Each node stores an item, its number of copies and the number of items of
+    its subtree, from which ranks are computed along a root-to-leaf path.
+    """
+    
+    def __init__(self, items=()):
+        self.root = None
+        self._random = Random(42)  # seeded for reproducibility
+        for item in items:
+            self.insert(item)
+    
+    def __len__(self):
+        return _size(self.root)
+    
+    def __contains__(self, item):
+        return self._find(item) is not None
+    
+    def __iter__(self):
+        """Yield the items in ascending order (with repetitions)."""
+        
+        stack, node = [], self.root
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                for _ in range(node.count):
+                    yield node.value
+                node = node.right
+    
+    def insert(self, item):
+        """Add an item to the tree.
+        
+        Time complexity analysis:
+        Best: O(1)
+        Average: O(log n)
+        Worst: O(n) with negligible probability
+        
+        Space complexity analysis:
+        Best: O(1)
+        Average: O(log n)
+        Worst: O(n) with negligible probability
+        """
+        
+        self.root = self._insert(self.root, item)
+    
+    def _insert(self, node, item):
+        """Helper function for insert. Return the new root of the subtree."""
+        
+        if node is None:
+            return _Node(item, self._random.random())
+        
+        if item < node.value:
+            node.left = self._insert(node.left, item)
+            if node.left.priority > node.priority:
+                node = _rotate_right(node)
+        elif node.value < item:
+            node.right = self._insert(node.right, item)
+            if node.right.priority > node.priority:
+                node = _rotate_left(node)
+        else:
+            node.count += 1
+        _update(node)
+        return node
+    
+    def remove(self, item):
+        """Remove a copy of an item from the tree. The item must be in it.
+        
+        Time/space complexity analysis: see insert().
+        """
+        
+        assert item in self, "Item {} not in the tree".format(item)
+        
+        self.root = self._remove(self.root, item)
+    
+    def _remove(self, node, item):
+        """Helper function for remove. Return the new root of the subtree."""
+        
+        if item < node.value:
+            node.left = self._remove(node.left, item)
+        elif node.value < item:
+            node.right = self._remove(node.right, item)
+        elif node.count > 1:
+            node.count -= 1
+        else:
+            return _merge(node.left, node.right)
+        _update(node)
+        return node
+    
+    def select(self, k):
+        """Return the k-th smallest item of the tree, as quickselect() does
+        with an array.
+        
+        Time complexity analysis:
+        Best: O(1)
+        Average: O(log n)
+        Worst: O(n) with negligible probability
+        
+        Space complexity analysis:
+        Best: O(1)
+        Average: O(1)
+        Worst: O(1)
+        """
+        
+        assert 1 <= k <= len(self)
+        
+        node = self.root
+        while True:
+            left_size = _size(node.left)
+            if k <= left_size:
+                node = node.left
+            elif k <= left_size + node.count:
+                return node.value
+            else:
+                k -= left_size + node.count
+                node = node.right
+    
+    def rank(self, item):
+        """Return the rank that the item has (or would have) in the tree: the
+        number of smaller items plus one. Hence, select(rank(item)) == item
+        for each item of the tree.
+        
+        Time/space complexity analysis: see select().
+        """
+        
+        rank, node = 1, self.root
+        while node is not None:
+            if item < node.value:
+                node = node.left
+            elif node.value < item:
+                rank += _size(node.left) + node.count
+                node = node.right
+            else:
+                return rank + _size(node.left)
+        return rank
+    
+    def median(self):
+        """Return the median of the tree. If it has an even number of items
+        pick the upper median, as median_of_medians_pivot() does.
+        
+        Time/space complexity analysis: see select().
+        """
+        
+        return self.select(len(self) // 2 + 1)
+    
+    def quantile(self, q):
+        """Return the q-quantile of the tree: the item of rank ceil(q * n), as
+        QuantileSketch.quantile() approximates it.
+        
+        Time/space complexity analysis: see select().
+        """
+        
+        assert 0 <= q <= 1
+        
+        return self.select(max(1, ceil(q * len(self))))
+    
+    def _find(self, item):
+        """Return the node of the item, if any. Otherwise, return None."""
+        
+        node = self.root
+        while node is not None:
+            if item < node.value:
+                node = node.left
+            elif node.value < item:
+                node = node.right
+            else:
+                return node
+        return None
+    
+    def __str__(self):
+        return "[{}]".format(", ".join(str(item) for item in self))
+    
+    def __repr__(self):
+        return "OrderStatisticTree - n: {}".format(len(self))
+
+
+class _Node:
+    """Node of an OrderStatisticTree."""
+    
+    __slots__ = ("value", "count", "size", "priority", "left", "right")
+    
+    def __init__(self, value, priority):
+        self.value = value
+        self.count = 1  # copies of value
+        self.size = 1  # items in the subtree
+        self.priority = priority
+        self.left = None
+        self.right = None
+
+
+def _size(node):
+    return node.size if node is not None else 0
+
+
+def _update(node):
+    """Recompute the subtree size of a node from the ones of its children."""
+    
+    node.size = node.count + _size(node.left) + _size(node.right)
+
+
+def _rotate_right(node):
+    """Make the left child of the node the root of its subtree."""
+    
+    root = node.left
+    node.left, root.right = root.right, node
+    _update(node)
+    _update(root)
+    return root
+
+
+def _rotate_left(node):
+    """Make the right child of the node the root of its subtree."""
+    
+    root = node.right
+    node.right, root.left = root.left, node
+    _update(node)
+    _update(root)
+    return root
+
+
+def _merge(left, right):
+    """Merge two subtrees, all the items of left being smaller than the ones
+    of right. Return the new root.
+    """
+    
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
@@ -0,0 +1,93 @@
+import random
+import unittest
+
+from algorithms import quickselect
+from order_statistic_tree import OrderStatisticTree
+
+
+class TestOrderStatisticTree(unittest.TestCase):
+
+    def test_order_statistic_tree(self):
+        random.seed(42)
+        max_length = 50
+        repetitions_per_length = 20
+        int_range = (-10, 10)
+        
+        tree = OrderStatisticTree()
+        self.assertEqual(len(tree), 0)
+        with self.assertRaises(AssertionError):
+            tree.select(1)  # test empty tree
+        with self.assertRaises(AssertionError):
+            tree.remove(0)
+        
+        # generate random lists of integers of variable length
+        for length in range(1, max_length + 1):
+            for _ in range(repetitions_per_length):
+                array = [random.randint(*int_range) for _ in range(length)]
+                array_rep = str(array)
+                tree = OrderStatisticTree(array)
+                self.assertEqual(
+                    list(tree), sorted(array),
+                    "Error while inserting {}".format(array_rep))
+                
+                for k in range(1, length + 1):
+                    self.assertEqual(
+                        tree.select(k), quickselect(array.copy(), k),
+                        "Error while selecting in {}".format(array_rep))
+                    item = tree.select(k)
+                    self.assertEqual(
+                        tree.rank(item), sorted(array).index(item) + 1,
+                        "Error while ranking in {}".format(array_rep))
+                self.assertEqual(tree.rank(int_range[0] - 1), 1)
+                self.assertEqual(tree.rank(int_range[1] + 1), length + 1)
+                
+                item = random.choice(array)
+                array.remove(item)
+                tree.remove(item)
+                self.assertEqual(
+                    list(tree), sorted(array),
+                    "Error while removing {} from {}".format(item, array_rep))
+    
+    def test_running_median(self):
+        random.seed(42)
+        operations = 10000
+        int_range = (-10 ** 6, 10 ** 6)
+        
+        # random inserts and removes, checked against quickselect
+        array = []
+        tree = OrderStatisticTree()
+        for _ in range(operations):
+            if array and random.random() < 0.4:
+                item = array.pop(random.randrange(len(array)))
+                tree.remove(item)
+            else:
+                item = random.randint(*int_range)
+                array.append(item)
+                tree.insert(item)
+            
+            self.assertEqual(len(tree), len(array))
+            if array:
+                self.assertEqual(
+                    tree.median(),
+                    quickselect(array.copy(), len(array) // 2 + 1,
+                                three_way=True),
+                    "Wrong median after {}".format(item))
+                k = random.randint(1, len(array))
+                self.assertEqual(
+                    tree.select(k),
+                    quickselect(array.copy(), k, three_way=True),
+                    "Wrong {}-th item after {}".format(k, item))
+        
+        # the expected height is logarithmic even for sorted insertions
+        tree = OrderStatisticTree(range(operations))
+        self.assertLess(height(tree.root), 4 * operations.bit_length())
+
+
+def height(node):
+    if node is None:
+        return 0
+    return 1 + max(height(node.left), height(node.right))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
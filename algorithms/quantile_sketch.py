@@ -0,0 +1,266 @@
+import random
+
+from math import ceil, log, sqrt
+from algorithms import quickselect
+
+
+class QuantileSketch:
+    """Greenwald-Khanna quantile summary.
+    ref: https://en.wikipedia.org/wiki/Quantile#Streaming_approximate_quantiles
+    
+    A mergeable, bounded memory summary of a stream of comparable items, as
+    presented by Michael Greenwald and Sanjeev Khanna in the 2001 paper
+    "Space-efficient online computation of quantile summaries" and extended to
+    merges in the 2004 paper "Power-conserving computation of order-statistics
+    over sensor networks".
+    
+    The summary is a sorted list of [value, rmin, rmax] tuples, where rmin and
+    rmax are a lower and an upper bound on the rank of value among the n items
+    seen so far. The summary is eps-approximate as long as:
+    rmax(i + 1) - rmin(i) <= 2 * eps * n, for each pair of consecutive tuples
+    which guarantees that quantile(q) returns an item whose rank differs from
+    ceil(q * n) by at most eps * n.
+    
+    Updates are buffered and periodically merged into the summary as an exact
+    (0-approximate) summary. Merging an eps1-approximate summary with an
+    eps2-approximate one produces a max(eps1, eps2)-approximate summary, while
+    compressing only removes tuples that do not break the above invariant, so
+    the error bound holds across any sequence of updates and merges.
+    The number of tuples grows as O((1 / eps) * log(eps * n)) in practice.
+    
+    If validation_size is set, a uniform sample (reservoir) of at most that
+    many items is also kept, and every quantile(q) answer is checked against
+    the quantiles of the sample computed by quickselect (see _validate()).
+    Merging a non-empty summary which keeps no sample disables validation, as
+    the merged sample could not be uniform anymore.
+    """
+    
+    def __init__(self, eps=0.01, validation_size=None):
+        assert 0 < eps < 1
+        assert validation_size is None or validation_size > 0
+        
+        self.eps = eps
+        self.n = 0
+        self.tuples = []  # [value, rmin, rmax], sorted by value
+        self.buffer = []  # items not yet merged into tuples
+        self.buffer_size = max(1, int(1 / (2 * eps)))
+        self.validation_size = validation_size
+        self.sample = []  # reservoir sample, only used for validation
+    
+    def __len__(self):
+        return self.n
+    
+    def update(self, item):
+        """Add an item to the summary.
+        
+        Time complexity analysis:
+        Best: O(1)
+        Average: O(log b + s / b) amortized
+        Worst: O(b * log b + s)
+        
+        Space complexity analysis:
+        Best: O(s + b)
+        Average: O(s + b)
+        Worst: O(s + b)
+        
+        where b = 1 / (2 * eps) is the buffer size and s the summary size
+        """
+        
+        self.n += 1
+        self.buffer.append(item)
+        if self.validation_size is not None:
+            self._sample(item)
+        if len(self.buffer) >= self.buffer_size:
+            self._flush()
+    
+    def update_many(self, items):
+        """Add all the items of an iterable to the summary.
+        
+        Time/space complexity analysis: see update().
+        """
+        
+        for item in items:
+            self.update(item)
+    
+    def merge(self, other):
+        """Merge another summary into this one, as if all the items seen by
+        the other summary had been added to this one.
+        The resulting summary is max(self.eps, other.eps)-approximate.
+        
+        Time complexity analysis:
+        Best: O(s1 + s2)
+        Average: O(s1 + s2)
+        Worst: O(s1 + s2 + b * log b)
+        
+        Space complexity analysis:
+        Best: O(s1 + s2)
+        Average: O(s1 + s2)
+        Worst: O(s1 + s2)
+        """
+        
+        self._flush()
+        other._flush()
+        
+        if self.validation_size is not None:
+            if other.validation_size is None and other.n > 0:
+                self.validation_size = None
+                self.sample = []
+            else:
+                self._merge_samples(other)
+        self.eps = max(self.eps, other.eps)
+        self.tuples = self._combine(self.tuples, other.tuples)
+        self.n += other.n
+        self._compress()
+    
+    def quantile(self, q):
+        """Return an item whose rank differs from ceil(q * n) by at most
+        eps * n.
+        
+        Time complexity analysis:
+        Best: O(s)
+        Average: O(s)
+        Worst: O(s + b * log b)
+        
+        Space complexity analysis:
+        Best: O(1)
+        Average: O(1)
+        Worst: O(1)
+        """
+        
+        assert 0 <= q <= 1
+        assert self.n > 0
+        
+        self._flush()
+        
+        rank = max(1, ceil(q * self.n))
+        # pick the tuple whose rank bounds are the closest to the target
+        value, _, _ = min(
+            self.tuples,
+            key=lambda t: max(rank - t[1], t[2] - rank))
+        
+        if self.validation_size is not None:
+            self._validate(q, value)
+        return value
+    
+    def _flush(self):
+        """Merge the buffered items into the summary as an exact summary."""
+        
+        if not self.buffer:
+            return
+        
+        self.buffer.sort()
+        exact = [[v, i, i] for i, v in enumerate(self.buffer, 1)]
+        self.tuples = self._combine(self.tuples, exact)
+        self.buffer = []
+        self._compress()
+    
+    @staticmethod
+    def _combine(tuples_1, tuples_2):
+        """Return the summary of the union of the items of two summaries.
+        
+        For each tuple of a summary, the rank bounds are increased by the rank
+        bounds of its neighbours in the other summary: the rmin of the
+        greatest preceding tuple and the rmax of the smallest following tuple,
+        minus one (that tuple is not smaller than the current one).
+        """
+        
+        n_1 = tuples_1[-1][2] if tuples_1 else 0
+        n_2 = tuples_2[-1][2] if tuples_2 else 0
+        
+        combined = []
+        i, j = 0, 0
+        while i < len(tuples_1) or j < len(tuples_2):
+            # stable merge: on ties, tuples of the first summary come first
+            if j == len(tuples_2) or \
+                    (i < len(tuples_1) and tuples_1[i][0] <= tuples_2[j][0]):
+                value, rmin, rmax = tuples_1[i]
+                others, k, n_others = tuples_2, j, n_2
+                i += 1
+            else:
+                value, rmin, rmax = tuples_2[j]
+                others, k, n_others = tuples_1, i, n_1
+                j += 1
+            
+            # others[k - 1] precedes the current tuple, others[k] follows it
+            rmin += others[k - 1][1] if k > 0 else 0
+            rmax += others[k][2] - 1 if k < len(others) else n_others
+            combined.append([value, rmin, rmax])
+        return combined
+    
+    def _compress(self):
+        """Remove the tuples that are not needed to keep the summary
+        eps-approximate. The first and last tuples (minimum and maximum) are
+        always kept.
+        """
+        
+        if len(self.tuples) <= 2:
+            return
+        
+        max_gap = 2 * self.eps * self.n
+        compressed = [self.tuples[0]]
+        for i in range(1, len(self.tuples) - 1):
+            # drop the i-th tuple if its neighbours are close enough
+            if self.tuples[i + 1][2] - compressed[-1][1] > max_gap:
+                compressed.append(self.tuples[i])
+        compressed.append(self.tuples[-1])
+        self.tuples = compressed
+    
+    def _sample(self, item):
+        """Reservoir sampling algorithm (Algorithm R).
+        ref: https://en.wikipedia.org/wiki/Reservoir_sampling
+        """
+        
+        if len(self.sample) < self.validation_size:
+            self.sample.append(item)
+            return
+        i = random.randrange(self.n)
+        if i < self.validation_size:
+            self.sample[i] = item
+    
+    def _merge_samples(self, other):
+        """Replace the sample with a uniform sample of both summaries items,
+        by drawing from each sample proportionally to the items it stands for.
+        """
+        
+        total = self.n + other.n
+        if total == 0:
+            return
+        size = min(self.validation_size, len(self.sample) + len(other.sample))
+        from_self = min(len(self.sample), round(size * self.n / total))
+        from_other = min(len(other.sample), size - from_self)
+        self.sample = random.sample(self.sample, from_self) + \
+            random.sample(other.sample, from_other)
+    
+    def _validate(self, q, value):
+        """Check a quantile(q) answer against the sample.
+        
+        By the Dvoretzky-Kiefer-Wolfowitz inequality, the empirical quantiles
+        of a uniform sample of s items are within
+        dkw = sqrt(log(2 / 1e-6) / (2 * s))
+        of the true ones with probability at least 1 - 1e-6. Hence, the answer
+        must lie between the sample quantiles q - eps - dkw and
+        q + eps + dkw, which are computed by quickselect.
+        """
+        
+        s = len(self.sample)
+        tolerance = self.eps + sqrt(log(2 / 1e-6) / (2 * s))
+        
+        # bounds beyond the sample extremes cannot be checked
+        if q - tolerance > 0:
+            low = quickselect(self.sample.copy(), ceil((q - tolerance) * s))
+            assert low <= value, \
+                "Quantile {} = {} below the sample bound {}".format(
+                    q, value, low)
+        if q + tolerance < 1:
+            high = quickselect(self.sample.copy(), ceil((q + tolerance) * s))
+            assert value <= high, \
+                "Quantile {} = {} above the sample bound {}".format(
+                    q, value, high)
+    
+    def __str__(self):
+        return "[{}]".format(", ".join(
+            "({}, {}, {})".format(*t) for t in self.tuples))
+    
+    def __repr__(self):
+        return "QuantileSketch - eps: {}, n: {}, tuples: {}, buffer: {}".format(
+            self.eps, self.n, len(self.tuples), len(self.buffer))
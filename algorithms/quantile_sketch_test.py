@@ -0,0 +1,125 @@
+import random
+import unittest
+
+from bisect import bisect_left, bisect_right
+from math import ceil
+from algorithms import quickselect
+from quantile_sketch import QuantileSketch
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def assert_rank_error(self, sketch, array, q):
+        """Check that the rank of sketch.quantile(q) in the array differs from 
+        ceil(q * n) by at most eps * n.
+        """
+        
+        value = sketch.quantile(q)
+        sorted_array = sorted(array)
+        rank = max(1, ceil(q * len(array)))
+        # ranks of all the items equal to value
+        low, high = bisect_left(sorted_array, value) + 1, \
+            bisect_right(sorted_array, value)
+        error = max(0, low - rank, rank - high)
+        self.assertLessEqual(
+            error, sketch.eps * len(array),
+            "Wrong {}-quantile {} (rank error {})".format(q, value, error))
+    
+    def test_quantile_sketch(self):
+        random.seed(42)
+        lengths = [1, 2, 10, 100, 10000]
+        int_ranges = [(0, 3), (-10 ** 6, 10 ** 6)]
+        quantiles = [0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999, 1]
+        
+        with self.assertRaises(AssertionError):
+            QuantileSketch().quantile(0.5)  # test empty sketch
+        
+        with self.assertRaises(AssertionError):
+            QuantileSketch(eps=0)  # test invalid error
+        
+        for length in lengths:
+            for int_range in int_ranges:
+                for eps in [0.1, 0.01]:
+                    array = [random.randint(*int_range) for _ in range(length)]
+                    sketch = QuantileSketch(eps)
+                    sketch.update_many(array)
+                    self.assertEqual(len(sketch), length, "Wrong length")
+                    for q in quantiles:
+                        self.assert_rank_error(sketch, array, q)
+                    
+                    # the true median is found by quickselect with eps = 0
+                    sketch = QuantileSketch(1e-9)
+                    sketch.update_many(array)
+                    self.assertEqual(
+                        sketch.quantile(0.5), 
+                        quickselect(
+                            array.copy(), ceil(length / 2), three_way=True),
+                        "Wrong exact median of {}".format(array))
+        
+        # sorted input, which is adversarial for insertions
+        array = list(range(10000))
+        sketch = QuantileSketch(0.01)
+        sketch.update_many(array)
+        for q in quantiles:
+            self.assert_rank_error(sketch, array, q)
+        self.assertLess(len(sketch.tuples), 1000, "Too many tuples")
+    
+    def test_merge(self):
+        random.seed(42)
+        length = 10000
+        shards_number = 8
+        quantiles = [0, 0.01, 0.1, 0.5, 0.9, 0.99, 1]
+        
+        for eps in [0.05, 0.01]:
+            array = [random.random() for _ in range(length)]
+            shards = [QuantileSketch(eps) for _ in range(shards_number)]
+            for i, item in enumerate(array):
+                shards[i % shards_number].update(item)
+            
+            # merge the shards in a tree, as partial aggregates would be
+            while len(shards) > 1:
+                shards[0].merge(shards.pop())
+                shards.append(shards.pop(0))
+            
+            self.assertEqual(len(shards[0]), length, "Wrong merged length")
+            for q in quantiles:
+                self.assert_rank_error(shards[0], array, q)
+    
+    def test_validation(self):
+        random.seed(42)
+        array = [random.random() for _ in range(10000)]
+        
+        sketch = QuantileSketch(0.01, validation_size=1000)
+        other = QuantileSketch(0.01, validation_size=1000)
+        sketch.update_many(array[:5000])
+        other.update_many(array[5000:])
+        sketch.merge(other)
+        self.assertEqual(len(sketch.sample), 1000, "Wrong sample size")
+        for q in [0, 0.1, 0.5, 0.9, 1]:
+            sketch.quantile(q)  # must pass validation
+        
+        # corrupt the summary: validation must catch wrong answers
+        sketch.tuples = [[t[0] + 0.5, t[1], t[2]] for t in sketch.tuples]
+        with self.assertRaises(AssertionError):
+            sketch.quantile(0.25)
+        
+        # merging empty sketches
+        sketch = QuantileSketch(0.01, validation_size=100)
+        sketch.merge(QuantileSketch(0.01, validation_size=100))
+        sketch.merge(QuantileSketch(0.01))
+        self.assertEqual(sketch.validation_size, 100, "Validation disabled")
+        sketch.update_many(range(1000))
+        sketch.quantile(0.5)
+        
+        # a sketch without sample disables validation, which would be biased
+        sketch = QuantileSketch(0.01, validation_size=1000)
+        other = QuantileSketch(0.01)
+        sketch.update_many(range(1000))
+        other.update_many(range(1000, 100000))
+        sketch.merge(other)
+        self.assertIsNone(sketch.validation_size, "Validation not disabled")
+        self.assert_rank_error(sketch, range(100000), 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
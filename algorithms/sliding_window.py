@@ -0,0 +1,69 @@
+from collections import deque
+from order_statistic_tree import OrderStatisticTree
+
+
+def sliding_quantile(items, window, q):
+    """Sliding window quantile.
+    
+    Lazily consume an iterable and yield the q-quantile (see
+    OrderStatisticTree.quantile()) of each window of consecutive items, as
+    soon as it is complete: the first result is yielded after window items,
+    then one result per further item. Nothing is yielded if the iterable has
+    less than window items.
+    
+    The items of the window are kept in an OrderStatisticTree, so each step
+    adds the new item and evicts the oldest one in O(log w) instead of running
+    quickselect on a copy of the window in O(w).
+    
+    Time complexity analysis:
+    Best: O(n * log w)
+    Average: O(n * log w)
+    Worst: O(n * w) with negligible probability
+    
+    Space complexity analysis:
+    Best: O(w)
+    Average: O(w)
+    Worst: O(w)
+    
+    where w = window
+    """
+    
+    assert window >= 1
+    assert 0 <= q <= 1
+    
+    for tree in _sliding_trees(items, window):
+        yield tree.quantile(q)
+
+
+def sliding_median(items, window):
+    """Sliding window median.
+    
+    Lazily consume an iterable and yield the median (see
+    OrderStatisticTree.median()) of each window of consecutive items.
+    
+    Time/space complexity analysis: see sliding_quantile().
+    """
+    
+    assert window >= 1
+    
+    for tree in _sliding_trees(items, window):
+        yield tree.median()
+
+
+def _sliding_trees(items, window):
+    """Helper function for sliding window algorithms.
+    
+    Lazily consume an iterable and yield an OrderStatisticTree with the items
+    of each complete window of consecutive items. The same tree is updated
+    and yielded at each step.
+    """
+    
+    tree = OrderStatisticTree()
+    queue = deque()  # items of the window, from the oldest to the newest
+    for item in items:
+        queue.append(item)
+        tree.insert(item)
+        if len(queue) > window:
+            tree.remove(queue.popleft())
+        if len(queue) == window:
+            yield tree
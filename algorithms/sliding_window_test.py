@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from math import ceil
+from algorithms import median_of_medians
+from sliding_window import sliding_median, sliding_quantile
+
+
+class TestSlidingWindow(unittest.TestCase):
+
+    def test_sliding_median(self):
+        random.seed(42)
+        lengths = [0, 1, 2, 10, 100, 1000]
+        windows = [1, 2, 5, 64]
+        int_ranges = [(0, 3), (-10 ** 6, 10 ** 6)]
+        
+        with self.assertRaises(AssertionError):
+            next(sliding_median([1], 0))  # test empty window
+        
+        for length in lengths:
+            for window in windows:
+                for int_range in int_ranges:
+                    array = [random.randint(*int_range) for _ in range(length)]
+                    medians = list(sliding_median(iter(array), window))
+                    self.assertEqual(len(medians), max(0, length - window + 1))
+                    for i, median in enumerate(medians):
+                        self.assertEqual(
+                            median,
+                            median_of_medians(
+                                array[i:i + window], window // 2 + 1, True),
+                            "Wrong median of window {} of {}".format(
+                                i, array))
+    
+    def test_sliding_quantile(self):
+        random.seed(42)
+        length = 2000
+        windows = [1, 7, 100]
+        quantiles = [0, 0.01, 0.25, 0.5, 0.9, 1]
+        
+        with self.assertRaises(AssertionError):
+            next(sliding_quantile([1], 1, 2))  # test invalid quantile
+        
+        for window in windows:
+            for q in quantiles:
+                array = [random.random() for _ in range(length)]
+                k = max(1, ceil(q * window))
+                for i, value in enumerate(sliding_quantile(array, window, q)):
+                    self.assertEqual(
+                        value,
+                        median_of_medians(array[i:i + window], k),
+                        "Wrong {}-quantile of window {}".format(q, i))
+    
+    def test_lazy_stream(self):
+        # results are yielded as soon as windows are complete
+        def stream():
+            for i in range(10):
+                yield i
+            raise AssertionError("Stream consumed too far")
+        
+        medians = sliding_median(stream(), 3)
+        self.assertEqual([next(medians) for _ in range(8)], list(range(1, 9)))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
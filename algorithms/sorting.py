@@ -1,18 +1,103 @@
-from collections import defaultdict
+from array import array as typed_array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from heapq import heapify, heappop, heapreplace
+from itertools import islice
 from math import ceil
-from collections import deque
+from multiprocessing import shared_memory
+from operator import index
+from os import PathLike, cpu_count, remove, replace
+from os.path import abspath, dirname, join
+from random import sample
+from tempfile import TemporaryDirectory
 
-def counting_sort(array, key_fn):
+from algorithms import quicksort
+
+try:
+    import algorithms_numpy
+except ImportError:  # NumPy is optional: only the pure-Python path is used
+    algorithms_numpy = None
+
+
+# ranges with less than this number of items are sorted by binary insertion 
+# sort in adaptive merge sort, larger ones are split in runs of at least half 
+# this length (see _min_run_length())
+MIN_MERGE = 64
+
+# number of consecutive items taken from the same run after which merging 
+# switches to galloping mode
+MIN_GALLOP = 7
+
+# blocks of this number of items are sorted by binary insertion sort before 
+# the merge passes of bottom-up merge sort
+BOTTOM_UP_RUN_LENGTH = 32
+
+# buckets with at most this number of items are finished with insertion sort 
+# by MSD radix sort
+MSD_INSERTION_THRESHOLD = 16
+
+# sample sort scatters the items in buckets of this expected number of items, 
+# bounded by splitters picked every SAMPLE_SORT_OVERSAMPLING sampled keys
+SAMPLE_SORT_BUCKET_SIZE = 1024
+SAMPLE_SORT_OVERSAMPLING = 16
+
+# decision thresholds of sort(), measured with 
+# algorithms_benchmark.tune_sort_thresholds() on random lists of 10^5 and 10^6 
+# items, and tunable by updating this dictionary or per call:
+# - sample_size: number of items sampled to estimate the input statistics;
+# - insertion_max_length: lists up to this length go to binary insertion sort;
+# - presorted_max_inversions: maximum fraction of sampled pairs of items out 
+# of order (or in order, for descending inputs) for adaptive merge sort;
+# - duplicates_min_ratio: minimum fraction of duplicates among the sampled 
+# keys for three-way quicksort;
+# - counting_min_length, counting_max_range_ratio: minimum number of items and 
+# maximum ratio of the key range to it for counting sort of integer keys;
+# - radix_min_length: minimum number of items for LSD radix sort of 64-bit 
+# integer keys whose range is too wide for counting sort. On CPython, the 
+# pure-Python passes never beat sample sort, whose buckets are sorted by the 
+# built-in Timsort (3 to 7 times faster for 2^16 to 2^20 keys of 20 to 64 
+# bits), so the route is disabled unless tuned on a faster interpreter.
+SORT_THRESHOLDS = {
+    "sample_size": 1024,
+    "insertion_max_length": 48,
+    "presorted_max_inversions": 0.005,
+    "duplicates_min_ratio": 0.99,
+    "counting_min_length": 2 ** 19,
+    "counting_max_range_ratio": 1 / 16,
+    "radix_min_length": float("inf"),
+}
+
+# external merge sort sorts chunks of at most this number of bytes in memory
+EXTERNAL_MEMORY_BUDGET = 2 ** 28
+
+# maximum number of sorted runs merged at once by external merge sort
+EXTERNAL_FAN_IN = 64
+
+
+def counting_sort(array, key_fn=None, output=None):
     """Counting sort algorithm.
     ref: https://en.wikipedia.org/wiki/Counting_sort
     
     Sort the array according to the values of a key function computed on the 
-    items in a stable way.
+    items in a stable way. If key_fn is None, items are their own keys.
     It is only suitable in situations where the variation in keys is not 
     significantly greater than the number of items.
     Can be used as a subroutine in other sorting algorithm, such as radix sort.
     
-    k := integer such that key_fn(x) <= k, for each x in array
+    Return a sorted copy of the array. If output is given (a sequence as long 
+    as the array, e.g. a buffer reused across calls), the sorted items are 
+    written into it instead, and it is returned.
+    
+    Keys are computed once and cached in an array of 64-bit integers, so they 
+    must fit in it. The histogram is a dense array of 64-bit integers that 
+    spans from the minimum to the maximum key: negative keys are supported, 
+    and only the range of keys actually used takes time and space.
+    NumPy ndarrays whose items are their own keys are sorted by the 
+    vectorized backend (see algorithms_numpy.counting_sort()). As for any 
+    other sequence, key_fn is otherwise called once per item.
+    
+    k := max(key_fn(x)) - min(key_fn(x)) + 1, for each x in array
     
     Time complexity analysis:
     Best: O(n+k)
@@ -25,37 +110,317 @@ def counting_sort(array, key_fn):
     Worst: O(n+k)
     """
     
-    counts = defaultdict(int)  # frequencies histogram
-    k = 0
-    for i in array:
-        key_value = key_fn(i)
-        counts[key_value] += 1
-        k = max(k, key_value)
+    if key_fn is None and _is_ndarray(array):
+        return algorithms_numpy.counting_sort(array, None, output)
+    
+    sorted_array = copy(array) if output is None else output
+    _counting_sort_range(
+        array, sorted_array, 0, len(array) - 1, key_fn or (lambda x: x))
+    return sorted_array
+
+
+def _counting_sort_range(source, destination, start, end, key_fn):
+    """Helper function for counting sort algorithm.
+    
+    Stable sort the items of the source in the range [start, end] into the 
+    same range of the destination.
+    
+    Return the (key, first, last) bounds of the non-empty ranges of items 
+    with the same key in the destination, in ascending key order.
+    """
+    
+    keys = typed_array(
+        "q", (key_fn(source[i]) for i in range(start, end + 1)))
+    if not keys:
+        return []
+    
+    low = min(keys)
+    counts = typed_array("q", [0]) * (max(keys) - low + 1)  # histogram
+    for key_value in keys:
+        counts[key_value - low] += 1
+    
+    bounds = []
+    total = start
+    for offset, count in enumerate(counts):
+        counts[offset] = total
+        if count > 0:
+            bounds.append((low + offset, total, total + count - 1))
+        total += count
+    
+    for i, key_value in enumerate(keys, start):
+        destination[counts[key_value - low]] = source[i]
+        counts[key_value - low] += 1
     
-    total = 0
-    for i in range(k + 1):
-        old_count = counts[i]
-        counts[i] = total
-        total += old_count
+    return bounds
+
+
+def _is_ndarray(array):
+    """Return True if the array is a NumPy ndarray (see algorithms_numpy)."""
+    
+    return algorithms_numpy is not None and \
+        isinstance(array, algorithms_numpy.np.ndarray)
+
+
+def sample_sort(array, key_fn=None, output=None, workers=1, 
+                bucket_size=SAMPLE_SORT_BUCKET_SIZE, 
+                oversampling=SAMPLE_SORT_OVERSAMPLING):
+    """Sample sort algorithm.
+    ref: https://en.wikipedia.org/wiki/Samplesort
+    
+    Sort the array according to the values of a key function computed on the 
+    items in a stable way. If key_fn is None, items are their own keys, which 
+    can be of any comparable type (e.g. floats), unlike counting_sort().
+    
+    Return a sorted copy of the array. If output is given (a sequence as long 
+    as the array, e.g. a buffer reused across calls), the sorted items are 
+    written into it instead, and it is returned.
+    
+    Keys are computed once. About n / bucket_size - 1 splitters are picked 
+    from the sorted keys of a random sample of oversampling times as many 
+    items, so that buckets have about bucket_size items whatever the key 
+    distribution (for uniformly distributed keys, this is bucket sort). 
+    Items are scattered in the buckets in a single pass, by binary search of 
+    their key among the splitters, and the buckets are then sorted 
+    independently (by Timsort, i.e. list.sort()) and concatenated.
+    If workers is greater than 1 (or None, for one per CPU), the buckets are 
+    sorted in a pool of worker processes, which only receive their keys.
+    
+    Time complexity analysis:
+    Best: O(n * log b + n * log(n / b))
+    Average: O(n * log b + n * log(n / b))
+    Worst: O(n * log n) with negligible probability
+    
+    Space complexity analysis:
+    Best: O(n)
+    Average: O(n)
+    Worst: O(n)
+    
+    where b = number of buckets
+    """
+    
+    assert bucket_size >= 1
+    assert oversampling >= 1
+    
+    n = len(array)
+    keys = list(array) if key_fn is None else [key_fn(x) for x in array]
+    sorted_array = copy(array) if output is None else output
+    
+    # splitters, from a sorted random sample of keys
+    bucket_count = max(1, n // bucket_size)
+    sample_keys = sorted(
+        keys[i] for i in sample(range(n), min(n, bucket_count * oversampling)))
+    splitters = sample_keys[oversampling::oversampling][:bucket_count - 1]
+    
+    # scatter the positions of the items, in order, in the buckets
+    buckets = [[] for _ in range(len(splitters) + 1)]
+    for i, key in enumerate(keys):
+        buckets[bisect_right(splitters, key)].append(i)
+    
+    # sort the buckets by key: positions in the same bucket keep their order
+    bucket_keys = ([keys[i] for i in bucket] for bucket in buckets)
+    if workers == 1 or len(buckets) == 1:
+        orders = map(_bucket_order, bucket_keys)
+        _gather_buckets(array, sorted_array, buckets, orders)
+    else:
+        with ProcessPoolExecutor(workers or cpu_count()) as executor:
+            orders = executor.map(_bucket_order, bucket_keys)
+            _gather_buckets(array, sorted_array, buckets, orders)
+    return sorted_array
+
+
+def _bucket_order(keys):
+    """Helper function for sample_sort algorithm.
+    
+    Return the positions of the keys in the order of their stable sort.
+    """
+    
+    return sorted(range(len(keys)), key=keys.__getitem__)
+
+
+def _gather_buckets(array, destination, buckets, orders):
+    """Helper function for sample_sort algorithm.
+    
+    Copy the items of the array into the destination, bucket after bucket, in 
+    the given order of their positions in each bucket.
+    """
+    
+    curr = 0
+    for bucket, order in zip(buckets, orders):
+        for i in order:
+            destination[curr] = array[bucket[i]]
+            curr += 1
+
+
+def radix_sort(array, digit_bits=8, bits=64, key_fn=None):
+    """LSD (least significant digit) radix sort algorithm.
+    ref: https://en.wikipedia.org/wiki/Radix_sort
+    
+    Return a new list with the items of the array sorted in a stable way 
+    according to their integer keys (the items themselves, or the values of 
+    key_fn computed on them), which must fit in bits-bit two's complement.
+    
+    Keys are split in digits of digit_bits bits (e.g. 8 or 16): a counting 
+    sort pass (see counting_sort()) per digit, from the least significant one, 
+    sorts the items, as each pass is stable. Passes alternate between two 
+    lists (ping-pong), so that no other buffer is allocated.
+    Negative keys are supported by flipping the sign bit of their two's 
+    complement representation, which makes their order the same of the 
+    unsigned integers. Keys are then offset by the smallest one, so that 
+    passes stop at the most significant digit of the key range.
+    
+    Time complexity analysis:
+    Best: O(d * (n + b))
+    Average: O(d * (n + b))
+    Worst: O(d * (n + b))
+    
+    Space complexity analysis:
+    Best: O(n + b)
+    Average: O(n + b)
+    Worst: O(n + b)
+    
+    where b = 2^digit_bits is the number of digit values and d <= bits / 
+    digit_bits is the number of passes, i.e. of digits of the key range
+    """
+    
+    assert digit_bits > 0
+    
+    sign_bit, mask = 1 << (bits - 1), (1 << bits) - 1
+    source = []  # (unsigned key, item) pairs
+    for item in array:
+        # as a Python int, as NumPy integers do not mix with 64-bit masks
+        key_value = index(item if key_fn is None else key_fn(item))
+        assert -sign_bit <= key_value < sign_bit, \
+            "Key {} out of {}-bit range".format(key_value, bits)
+        source.append(((key_value & mask) ^ sign_bit, item))
+    if not source:
+        return []
+    
+    # offset the keys by the smallest one, so that passes follow the range
+    min_key = min(key for key, _ in source)
+    source = [(key - min_key, item) for key, item in source]
+    digit_mask = (1 << digit_bits) - 1
+    passes = ceil(max(key for key, _ in source).bit_length() / digit_bits)
+    buffer = source.copy()
+    for shift in range(0, passes * digit_bits, digit_bits):
+        counting_sort(
+            source, lambda pair: (pair[0] >> shift) & digit_mask, buffer)
+        source, buffer = buffer, source
+    
+    return [item for _, item in source]
+
+
+def msd_radix_sort(array, key_fn=None):
+    """MSD (most significant digit) radix sort algorithm.
+    ref: https://en.wikipedia.org/wiki/Radix_sort#Most_significant_digit
+    
+    Return a new list with the items of the array sorted in a stable way 
+    according to their string (or bytes) keys, of any length: the items 
+    themselves, or the values of key_fn computed on them.
+    
+    A counting sort pass (see counting_sort()) groups the items by their 
+    first character, then each group of more than one item is sorted by the 
+    next character, and so on, with an explicit stack of groups. Keys that 
+    end before others come first, and groups with at most 
+    MSD_INSERTION_THRESHOLD items are finished with insertion sort.
+    Each pass moves the items of a group between the same two lists 
+    (ping-pong), so that no other buffer is allocated.
+    
+    Time complexity analysis:
+    Best: O(n + b)
+    Average: O(n * log_b n + b)
+    Worst: O(w * (n + b))
+    
+    Space complexity analysis:
+    Best: O(n + b)
+    Average: O(n + b + log_b n)
+    Worst: O(n + b + w)
+    
+    where b = number of character values (e.g. 256 for bytes) and w = length 
+    of the longest key
+    """
+    
+    source = [(item if key_fn is None else key_fn(item), item) 
+              for item in array]
+    lists = (source, source.copy())  # ping-pong lists
+    
+    # groups of items sharing the first depth characters of their keys, 
+    # stored in the range [start, end] of lists[i]
+    stack = [(0, len(source) - 1, 0, 0)]
+    while stack:
+        start, end, depth, i = stack.pop()
         
-    sorted_array = array.copy()
-    for i in array:
-        key_value = key_fn(i)
-        sorted_array[counts[key_value]] = i
-        counts[key_value] += 1
+        if end - start + 1 <= MSD_INSERTION_THRESHOLD:
+            _insertion_sort_pairs(lists[i], start, end)
+            _copy_range(lists[i], source, start, end)
+            continue
         
-    return sorted_array
+        bounds = _counting_sort_range(
+            lists[i], lists[1 - i], start, end, 
+            lambda pair: _character_code(pair[0], depth))
+        for key_value, first, last in bounds:
+            if key_value == 0 or first == last:
+                # keys ended or group of one item: already sorted
+                _copy_range(lists[1 - i], source, first, last)
+            else:
+                stack.append((first, last, depth + 1, 1 - i))
+    
+    return [item for _, item in source]
+
+
+def _character_code(key, position):
+    """Helper function for msd_radix_sort algorithm.
+    
+    Return 0 if the string (or bytes) key has no character in position, the 
+    code of the character plus one otherwise.
+    """
+    
+    if position >= len(key):
+        return 0
+    character = key[position]
+    return (ord(character) if isinstance(character, str) else character) + 1
+
+
+def _insertion_sort_pairs(pairs, start, end):
+    """Helper function for msd_radix_sort algorithm.
+    
+    In-place stable sort the (key, item) pairs in the range [start, end] by 
+    key with insertion sort.
+    """
+    
+    for i in range(start + 1, end + 1):
+        pair = pairs[i]
+        j = i - 1
+        while j >= start and pair[0] < pairs[j][0]:
+            pairs[j + 1] = pairs[j]
+            j -= 1
+        pairs[j + 1] = pair
 
 
-def merge_sort(array, start=None, end=None):
+def _copy_range(source, destination, start, end):
+    """Copy the items of the source in the range [start, end] into the same 
+    range of the destination, if they are different sequences.
+    """
+    
+    if source is not destination:
+        for i in range(start, end + 1):
+            destination[i] = source[i]
+
+
+def merge_sort(array, start=None, end=None, adaptive=False):
     """Merge sort algorithm.
     ref: https://en.wikipedia.org/wiki/Merge_sort
     
     In-place sort the items of the array in the range [start, end] by 
     recursively partitioning and sorting them in two subgroups of equal size.
+    The sort is stable.
+    
+    If adaptive is True, runs are not split blindly: as Timsort does, the 
+    range is scanned for natural runs that are merged according to a stack 
+    invariant (see _adaptive_merge_sort()). Sorted and nearly sorted ranges 
+    are then sorted in close to linear time.
     
     Time complexity analysis:
-    Best: O(n * log n)
+    Best: O(n * log n), O(n) if adaptive
     Average: O(n * log n)
     Worst: O(n * log n)
     
@@ -68,7 +433,11 @@ def merge_sort(array, start=None, end=None):
     start = 0 if start is None else start
     end = len(array) - 1 if end is None else end
     
-    if start == end:
+    if start >= end:
+        return
+    
+    if adaptive:
+        _adaptive_merge_sort(array, start, end)
         return
     
     half = (start + end) // 2
@@ -77,19 +446,472 @@ def merge_sort(array, start=None, end=None):
     merge_adjacent_runs(array, start, half, end)
 
 
+def bottom_up_merge_sort(array, start=None, end=None):
+    """Bottom-up merge sort algorithm.
+    ref: https://en.wikipedia.org/wiki/Merge_sort#Bottom-up_implementation
+    
+    In-place sort the items of the array in the range [start, end] in a 
+    stable way, without recursion. Blocks of BOTTOM_UP_RUN_LENGTH items are 
+    sorted by binary insertion sort, then passes over the range merge each 
+    pair of adjacent runs into a run of double length, until a single run is 
+    left.
+    A single auxiliary buffer of n items is allocated up front: each pass 
+    merges the runs of a source into a destination, which swap roles at the 
+    next pass (ping-pong), so that merges allocate nothing. If the last pass 
+    ends in the buffer, the items are copied back into the array.
+    
+    Time complexity analysis:
+    Best: O(n * log n)
+    Average: O(n * log n)
+    Worst: O(n * log n)
+    
+    Space complexity analysis:
+    Best: O(n)
+    Average: O(n)
+    Worst: O(n)
+    """
+    
+    start = 0 if start is None else start
+    end = len(array) - 1 if end is None else end
+    
+    if start >= end:
+        return
+    
+    for block_start in range(start, end + 1, BOTTOM_UP_RUN_LENGTH):
+        binary_insertion_sort(
+            array, block_start, 
+            min(block_start + BOTTOM_UP_RUN_LENGTH - 1, end))
+    
+    n = end - start + 1
+    if n <= BOTTOM_UP_RUN_LENGTH:
+        return
+    
+    # positions are relative to the range: i is in position offset + i
+    buffer = array[start:end + 1]  # a copy, except for ndarrays (a view)
+    if _is_ndarray(array):
+        buffer = buffer.copy()
+    source, source_offset = array, start
+    destination, destination_offset = buffer, 0
+    
+    width = BOTTOM_UP_RUN_LENGTH
+    while width < n:
+        for low in range(0, n, 2 * width):
+            _merge_into(
+                source, source_offset, destination, destination_offset, 
+                low, min(low + width, n), min(low + 2 * width, n))
+        source, destination = destination, source
+        source_offset, destination_offset = destination_offset, source_offset
+        width *= 2
+    
+    if source is buffer:
+        array[start:end + 1] = buffer
+
+
+def _merge_into(source, source_offset, destination, destination_offset, 
+                low, half, high):
+    """Helper function for bottom_up_merge_sort algorithm.
+    
+    Stable merge the sorted runs in the ranges [low, half) and [half, high) of 
+    the source into the range [low, high) of the destination, where position 
+    i stands for position offset + i of each sequence.
+    """
+    
+    i, j = source_offset + low, source_offset + half
+    half_end, high_end = source_offset + half, source_offset + high
+    for curr in range(destination_offset + low, destination_offset + high):
+        # on ties, items of the first run come first
+        if j == high_end or (i < half_end and not source[j] < source[i]):
+            destination[curr] = source[i]
+            i += 1
+        else:
+            destination[curr] = source[j]
+            j += 1
+
+
+def parallel_merge_sort(array, typecode=None, workers=None):
+    """Parallel merge sort algorithm.
+    
+    In-place sort the items of the array in a stable way by splitting it in 
+    one chunk per worker, sorting the chunks in a pool of worker processes 
+    and merging the resulting runs.
+    
+    If the array supports the buffer protocol (e.g. array.array or ndarray), 
+    or typecode is given (e.g. "q" for 64-bit integers and "d" for doubles, 
+    as in the array module), items are copied once in a shared memory block 
+    of fixed-width values, so that no item is ever pickled. Pairs of adjacent 
+    runs are then merged level by level into a second block, and the two 
+    blocks swap roles at each level (ping-pong). Each merge is split among 
+    the workers in segments of the same output size, whose bounds in both 
+    runs are found by binary search (merge path, see _co_rank()), so that the 
+    merge step runs on all the workers too.
+    Otherwise, the chunks are pickled to and from the workers, and the sorted 
+    runs are combined by a stable k-way heap merge (see k_way_merge()).
+    
+    Time complexity analysis:
+    Best: O(n * log n / p + n * log p / p)
+    Average: O(n * log n / p + n * log p / p)
+    Worst: O(n * log n / p + n * log p / p)
+    
+    Space complexity analysis:
+    Best: O(n)
+    Average: O(n)
+    Worst: O(n)
+    
+    where p = number of workers
+    """
+    
+    workers = workers or cpu_count() or 1
+    n = len(array)
+    if n < 2:
+        return
+    
+    chunk_size = ceil(n / workers)
+    chunks = [(start, min(start + chunk_size, n) - 1) 
+              for start in range(0, n, chunk_size)]
+    
+    try:
+        source = memoryview(array)
+        is_buffer = True
+    except TypeError:  # e.g. list
+        if typecode is None:
+            _parallel_merge_sort_pickled(array, chunks, workers)
+            return
+        source = memoryview(typed_array(typecode, array))
+        is_buffer = False
+    
+    blocks = [shared_memory.SharedMemory(create=True, size=source.nbytes) 
+              for _ in range(2)]
+    try:
+        blocks[0].buf[:source.nbytes] = source.cast("B")
+        descriptor = (source.format, n)
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _sort_shared_chunk, blocks[0].name, *descriptor, start, 
+                    end) 
+                for start, end in chunks]
+            for future in futures:
+                future.result()  # propagate workers errors, if any
+            
+            runs, current = chunks, 0
+            segment_size = ceil(n / workers)
+            while len(runs) > 1:
+                futures, merged = [], []
+                for i in range(0, len(runs), 2):
+                    if i + 1 == len(runs):
+                        # odd run out: merge it with no other run
+                        (start, end), half = runs[i], runs[i][1]
+                    else:
+                        (start, half), (_, end) = runs[i], runs[i + 1]
+                    merged.append((start, end))
+                    
+                    # one task per segment of output positions (from start)
+                    size = end - start + 1
+                    futures.extend(
+                        executor.submit(
+                            _merge_shared_segment, blocks[current].name, 
+                            blocks[1 - current].name, *descriptor, start, 
+                            half, end, k, min(k + segment_size, size)) 
+                        for k in range(0, size, segment_size))
+                for future in futures:
+                    future.result()
+                runs, current = merged, 1 - current
+        
+        result = blocks[current].buf[:source.nbytes]
+        if is_buffer:
+            source.cast("B")[:] = result
+        else:
+            array[:] = result.cast(source.format).tolist()
+        result.release()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _parallel_merge_sort_pickled(array, chunks, workers):
+    """Helper function for parallel_merge_sort algorithm.
+    
+    Sort the chunks of the array in the range [start, end] of each chunk in a 
+    pool of worker processes, then k-way merge them back into the array.
+    """
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        runs = list(executor.map(
+            _sorted_chunk, [array[start:end + 1] for start, end in chunks]))
+    array[:] = k_way_merge(*runs)
+
+
+def _sorted_chunk(chunk):
+    """Helper function for parallel_merge_sort algorithm.
+    
+    Return the chunk, sorted in place by bottom-up merge sort.
+    """
+    
+    bottom_up_merge_sort(chunk)
+    return chunk
+
+
+def _sort_shared_chunk(block_name, item_format, length, start, end):
+    """Helper function for parallel_merge_sort algorithm.
+    
+    In-place stable sort the items in the range [start, end] of the array of 
+    the given length and item format stored in the named shared memory block.
+    """
+    
+    shared_block = shared_memory.SharedMemory(name=block_name)
+    try:
+        shared = shared_block.buf.cast("B").cast(item_format)[:length]
+        if algorithms_numpy is not None:
+            vector = algorithms_numpy.as_ndarray(shared)
+            vector[start:end + 1].sort(kind="stable")
+            del vector  # release the view of the shared memory
+        else:
+            chunk = typed_array(item_format, shared[start:end + 1])
+            bottom_up_merge_sort(chunk)
+            shared[start:end + 1] = chunk
+        shared.release()
+    finally:
+        shared_block.close()
+
+
+def _merge_shared_segment(source_name, destination_name, item_format, length, 
+                          start, half, end, first, last):
+    """Helper function for parallel_merge_sort algorithm.
+    
+    Write the items in the positions [first, last) of the stable merge of the 
+    sorted runs in the ranges [start, half] and [half + 1, end] of the array 
+    stored in the named source shared memory block into the positions 
+    [start + first, start + last) of the array stored in the named destination 
+    block (both arrays with the given length and item format).
+    """
+    
+    source_block = shared_memory.SharedMemory(name=source_name)
+    destination_block = shared_memory.SharedMemory(name=destination_name)
+    try:
+        source = source_block.buf.cast("B").cast(item_format)[:length]
+        destination = \
+            destination_block.buf.cast("B").cast(item_format)[:length]
+        
+        # bounds of the segment in both runs
+        i, next_i = [_co_rank(source, start, half, end, k) 
+                     for k in [first, last]]
+        j, next_j = half + 1 + first - i, half + 1 + last - next_i
+        i, next_i = start + i, start + next_i
+        
+        if algorithms_numpy is not None:
+            source_vector = algorithms_numpy.as_ndarray(source)
+            segment = algorithms_numpy.as_ndarray(destination)[
+                start + first:start + last]
+            # the stable sort of two consecutive runs merges them
+            segment[:next_i - i] = source_vector[i:next_i]
+            segment[next_i - i:] = source_vector[j:next_j]
+            segment.sort(kind="stable")
+            del source_vector, segment  # release the views of shared memory
+        else:
+            for curr in range(start + first, start + last):
+                # on ties, items of the first run come first
+                if j == next_j or (i < next_i and 
+                                   not source[j] < source[i]):
+                    destination[curr] = source[i]
+                    i += 1
+                else:
+                    destination[curr] = source[j]
+                    j += 1
+        source.release()
+        destination.release()
+    finally:
+        source_block.close()
+        destination_block.close()
+
+
+def _co_rank(array, start, half, end, k):
+    """Merge path algorithm.
+    ref: https://en.wikipedia.org/wiki/Merge_algorithm#Parallel_merge
+    
+    Return how many of the first k items of the stable merge of the sorted 
+    runs in the ranges [start, half] and [half + 1, end] of the array come 
+    from the first run, by binary search.
+    
+    Time complexity analysis:
+    Best: O(1)
+    Average: O(log n)
+    Worst: O(log n)
+    
+    Space complexity analysis:
+    Best: O(1)
+    Average: O(1)
+    Worst: O(1)
+    """
+    
+    first_length, second_length = half - start + 1, end - half
+    low, high = max(0, k - second_length), min(k, first_length)
+    while low < high:
+        i = (low + high) // 2  # i items from the first run, k - i from second
+        if array[start + i] <= array[half + k - i]:
+            # the next item of the first run precedes the last of the second
+            low = i + 1
+        else:
+            high = i
+    return low
+
+
+def _adaptive_merge_sort(array, start, end):
+    """Helper function for merge_sort algorithm in adaptive mode.
+    ref: https://en.wikipedia.org/wiki/Timsort
+    
+    Scan the range [start, end] from left to right for natural runs, either 
+    ascending or strictly descending (which are reversed in place, keeping 
+    the sort stable). Runs shorter than a minimum length are extended with 
+    binary insertion sort, then pushed on a stack of pending runs, which are 
+    merged as soon as the stack invariant (see _merge_collapse()) is broken. 
+    The remaining runs are finally merged from the top of the stack.
+    """
+    
+    min_run = _min_run_length(end - start + 1)
+    runs = []  # stack of pending (start, length) runs
+    
+    i = start
+    while i <= end:
+        run_end = _count_run(array, i, end)
+        forced_end = min(i + min_run - 1, end)
+        if run_end < forced_end:
+            binary_insertion_sort(array, i, forced_end, run_end)
+            run_end = forced_end
+        
+        runs.append((i, run_end - i + 1))
+        _merge_collapse(array, runs)
+        i = run_end + 1
+    
+    while len(runs) > 1:
+        _merge_at(array, runs, len(runs) - 2)
+
+
+def _min_run_length(n):
+    """Return the minimum length of the runs of adaptive merge sort for a 
+    range of n items: n itself if it is less than MIN_MERGE. Otherwise, a 
+    length between MIN_MERGE / 2 and MIN_MERGE such that n / length is a 
+    power of 2 or slightly less than it, so that the final merges are balanced.
+    """
+    
+    remainder = 0  # becomes 1 if any bit is shifted off
+    while n >= MIN_MERGE:
+        remainder |= n & 1
+        n >>= 1
+    return n + remainder
+
+
+def _count_run(array, start, end):
+    """Return the last position of the natural run starting at start, within 
+    the range [start, end]. A strictly descending run is reversed in place.
+    """
+    
+    run_end = start + 1
+    if run_end > end:
+        return start
+    
+    if array[run_end] < array[start]:
+        # strictly descending: reversing it does not break stability
+        while run_end < end and array[run_end + 1] < array[run_end]:
+            run_end += 1
+        array[start:run_end + 1] = array[start:run_end + 1][::-1]
+    else:
+        while run_end < end and array[run_end] <= array[run_end + 1]:
+            run_end += 1
+    return run_end
+
+
+def _merge_collapse(array, runs):
+    """Merge the runs on top of the stack until, for each three consecutive 
+    runs A, B, C from the bottom of the stack: 
+    len(A) > len(B) + len(C) and len(B) > len(C)
+    Run lengths then grow at least as fast as Fibonacci numbers, so the stack 
+    has O(log n) runs and merges are between runs of similar lengths.
+    
+    The invariant is checked on the top four runs, as the original check on 
+    the top three runs does not guarantee it for the whole stack.
+    ref: http://envisage-project.eu/proving-android-java-and-python-sorting-algorithm-is-broken-and-how-to-fix-it/
+    """
+    
+    while len(runs) > 1:
+        n = len(runs) - 2
+        if n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1] or \
+                n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]:
+            if runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+        elif runs[n][1] > runs[n + 1][1]:
+            break
+        _merge_at(array, runs, n)
+
+
+def _merge_at(array, runs, n):
+    """Merge the n-th and (n + 1)-th runs of the stack."""
+    
+    (start, length), (_, next_length) = runs[n], runs[n + 1]
+    merge_adjacent_runs(
+        array, start, start + length - 1, start + length + next_length - 1)
+    runs[n] = (start, length + next_length)
+    del runs[n + 1]
+
+
+def binary_insertion_sort(array, start=None, end=None, sorted_end=None):
+    """Binary insertion sort algorithm.
+    ref: https://en.wikipedia.org/wiki/Insertion_sort#Variants
+    
+    In-place sort the items of the array in the range [start, end], knowing 
+    that the items in the range [start, sorted_end] are already sorted. Each 
+    of the others is inserted after the equal items already sorted (so that 
+    the sort is stable), whose position is found by binary search.
+    
+    Time complexity analysis:
+    Best: O(n)
+    Average: O(n * log n) comparisons, O(n^2) moves
+    Worst: O(n * log n) comparisons, O(n^2) moves
+    
+    Space complexity analysis:
+    Best: O(1)
+    Average: O(n)
+    Worst: O(n)
+    """
+    
+    start = 0 if start is None else start
+    end = len(array) - 1 if end is None else end
+    sorted_end = start if sorted_end is None else sorted_end
+    
+    for i in range(sorted_end + 1, end + 1):
+        item = array[i]
+        position = bisect_right(array, item, start, i)
+        if position < i:
+            # shift the greater items one position right
+            array[position + 1:i + 1] = array[position:i]
+            array[position] = item
+
+
 def merge_adjacent_runs(array, start, half, end):
     """In-place merge two sorted adjacent sub-arrays (runs) in the ranges 
-    [start, half] and [half + 1, end] by using a temporary deque as buffer.
+    [start, half] and [half + 1, end] in a stable way.
+    
+    The items of the first sub-array not greater than the first item of the 
+    second sub-array, and the items of the second sub-array not smaller than 
+    the last item of the first sub-array, are already in their final 
+    positions: they are skipped by galloping (see _gallop()). The rest of the 
+    first sub-array is copied in a temporary list used as buffer and merged 
+    with the rest of the second sub-array.
     
     In the best case (all the items in the first sub-array are smaller than 
-    those in the second one) the auxiliary deque will contain at most 1 item.
+    those in the second one) no item is moved and the buffer is empty.
     
-    In the worst case (all the items in the first sub-array are greater or 
-    equal than those in the second one) the auxiliary deque will contain all 
-    the first sub-array.
+    In the worst case (all the items in the first sub-array are greater than 
+    those in the second one) the buffer will contain all the first sub-array.
+    
+    When MIN_GALLOP consecutive items are taken from the same sub-array, the 
+    merge switches to galloping mode: the number of items to take from each 
+    sub-array is found by galloping and the items are moved in blocks, until 
+    both blocks are shorter than MIN_GALLOP.
     
     Time complexity analysis:
-    Best: O(n)
+    Best: O(log n)
     Average: O(n)
     Worst: O(n)
     
@@ -101,38 +923,659 @@ def merge_adjacent_runs(array, start, half, end):
     where n = end - start, l = half - start 
     """
     
-    # this deque will act as a buffer for the items in the range [start, half]
-    # items will be moved from the first sub-array to the deque only if needed
-    aux = deque()
-    # rather than comparing the first sub-array with the second one, we will 
-    # compare the deque and the second sub-array
-    aux.append(array[start])
+    if half >= end:
+        return
+    
+    # skip the items of both sub-arrays already in their final position
+    start = _gallop(array, array[half + 1], start, half, True)
+    if start > half:
+        return
+    end = _gallop(array, array[half], half + 1, end, False) - 1
     
-    i, j = start, half + 1
+    # buffer for the items in the range [start, half] (a copy, as slices of 
+    # some sequences, e.g. NumPy ndarrays, are views)
+    aux = copy(array[start:half + 1])
+    i, j = 0, half + 1
     curr = start
-    while len(aux) > 0 and j <= end:
-        if aux[0] <= array[j]:
-            # an item from the first sub-array is placed back into the array
-            array[curr] = aux.popleft()
+    while i < len(aux) and j <= end:
+        # one item at a time: on ties, first sub-array items come first
+        left_wins, right_wins = 0, 0
+        while i < len(aux) and j <= end and \
+                left_wins < MIN_GALLOP and right_wins < MIN_GALLOP:
+            if array[j] < aux[i]:
+                array[curr] = array[j]
+                j += 1
+                left_wins, right_wins = 0, right_wins + 1
+            else:
+                array[curr] = aux[i]
+                i += 1
+                left_wins, right_wins = left_wins + 1, 0
+            curr += 1
+        
+        # galloping mode: move blocks of items from the same sub-array
+        while i < len(aux) and j <= end:
+            count = _gallop(aux, array[j], i, len(aux) - 1, True) - i
+            array[curr:curr + count] = aux[i:i + count]
+            i, curr = i + count, curr + count
+            if i == len(aux):
+                break
+            
+            next_count = _gallop(array, aux[i], j, end, False) - j
+            array[curr:curr + next_count] = array[j:j + next_count]
+            j, curr = j + next_count, curr + next_count
+            if count < MIN_GALLOP and next_count < MIN_GALLOP:
+                break
+    
+    # process remaining (first sub-array) items in the buffer, while the 
+    # remaining items of the second sub-array are already in place
+    array[curr:curr + len(aux) - i] = aux[i:]
+
+
+def _gallop(array, value, start, end, right):
+    """Exponential search algorithm.
+    ref: https://en.wikipedia.org/wiki/Exponential_search
+    
+    Return the position where value would be inserted in the sorted range 
+    [start, end] of the array: after the items equal to value if right is 
+    True, before them otherwise (as bisect_right and bisect_left do).
+    Positions start, start + 1, start + 3, start + 7, ... are checked until 
+    one is past value, then binary search is used in the last gap.
+    
+    Time complexity analysis:
+    Best: O(1)
+    Average: O(log d)
+    Worst: O(log d)
+    
+    Space complexity analysis:
+    Best: O(1)
+    Average: O(1)
+    Worst: O(1)
+    
+    where d = distance of the returned position from start
+    """
+    
+    low, offset = start, 1
+    while start + offset - 1 <= end:
+        item = array[start + offset - 1]
+        before = not value < item if right else item < value
+        if not before:
+            break
+        low = start + offset
+        offset *= 2
+    high = min(start + offset - 1, end + 1)
+    
+    bisect_fn = bisect_right if right else bisect_left
+    return bisect_fn(array, value, low, high)
+
+
+def k_way_merge(*iterables, key=None, loser_tree=False):
+    """K-way merge algorithm.
+    ref: https://en.wikipedia.org/wiki/K-way_merge_algorithm
+    
+    Lazily merge sorted iterables (e.g. iterators over the outputs of sorted 
+    shards) into a generator of all their items in sorted order, comparing 
+    the values of key(item) if key is given. The merge is stable: equal items 
+    are yielded in the order of their iterables, and then in their order 
+    inside each iterable, as sorted(itertools.chain(*iterables)) would do.
+    Only the current item of each iterable is kept in memory, so merges can 
+    be chained as stages of a generator pipeline.
+    
+    The current items are kept in a binary heap of (key, iterable index, item) 
+    entries, so items are never compared to each other directly.
+    If loser_tree is True, they are kept in a tournament tree instead (see 
+    _loser_tree_merge()), which takes exactly ceil(log k) comparisons per 
+    item instead of up to 2 * log k, but more bookkeeping: it pays off for 
+    large k and expensive comparisons (e.g. of records by a Python key).
+    
+    Time complexity analysis:
+    Best: O(n * log k)
+    Average: O(n * log k)
+    Worst: O(n * log k)
+    
+    Space complexity analysis:
+    Best: O(k)
+    Average: O(k)
+    Worst: O(k)
+    
+    where k = number of iterables
+    """
+    
+    if loser_tree:
+        yield from _loser_tree_merge(iterables, key)
+        return
+    
+    heap = []
+    for index, iterable in enumerate(iterables):
+        iterator = iter(iterable)
+        for item in iterator:
+            heap.append(
+                [item if key is None else key(item), index, item, iterator])
+            break
+    heapify(heap)
+    
+    while len(heap) > 1:
+        entry = heap[0]
+        _, _, item, iterator = entry
+        yield item
+        for next_item in iterator:
+            entry[0] = next_item if key is None else key(next_item)
+            entry[2] = next_item
+            heapreplace(heap, entry)
+            break
         else:
-            # an item from the second sub-array is placed into the array in a 
-            # smaller position
-            array[curr] = array[j]
-            j += 1
-        # an item from the first sub-array must always be pushed to deque to
-        # make room for the next ordered item
-        if i < half:
-            # items to be pushed must belong to the first sub-array
-            i += 1
-            aux.append(array[i])
-        curr += 1
-    
-    # process remaining (first sub-array) items in the deque
-    while len(aux) > 0:
-        array[curr] = aux.popleft()
-        curr += 1
-    
-    # process remaining items in the second sub-array
-    for j in range(j, end):
-        array[curr] = array[j]
-        curr += 1
+            heappop(heap)  # iterator exhausted
+    
+    if heap:
+        # a single iterable is left: no more comparisons are needed
+        _, _, item, iterator = heap[0]
+        yield item
+        yield from iterator
+
+
+def _loser_tree_merge(iterables, key):
+    """Helper function for k_way_merge algorithm.
+    ref: https://en.wikipedia.org/wiki/K-way_merge_algorithm#Tournament_Tree
+    
+    Merge the iterables with a tournament tree of losers. The number of leaves 
+    is the smallest power of 2 not less than k, so that the leaves of a left 
+    subtree always precede the ones of its sibling: leaf i (stored in position 
+    size + i) stands for the current item of the i-th iterable, each internal 
+    node (in positions from 1 to size - 1, children of node j in positions 2j 
+    and 2j + 1) stores the index of the iterable that lost the match between 
+    the winners of its two subtrees. When the winner moves to its next item, 
+    only the matches on the path from its leaf to the root are replayed, with 
+    one comparison each: ties are won by the iterable from the left subtree.
+    Exhausted iterables (and padding leaves) have key _EXHAUSTED and lose 
+    every match.
+    """
+    
+    iterators = [iter(iterable) for iterable in iterables]
+    if not iterators:
+        return
+    size = 1 << (len(iterators) - 1).bit_length()
+    keys, items = [_EXHAUSTED] * size, [None] * size
+    for i, iterator in enumerate(iterators):
+        for item in iterator:
+            keys[i] = item if key is None else key(item)
+            items[i] = item
+            break
+    
+    # play the matches from the leaves up to the root
+    tree = [0] * size
+    winners = [0] * size + list(range(size))
+    for node in range(size - 1, 0, -1):
+        left, right = winners[2 * node], winners[2 * node + 1]
+        left_key, right_key = keys[left], keys[right]
+        if right_key is not _EXHAUSTED and (
+                left_key is _EXHAUSTED or right_key < left_key):
+            left, right = right, left
+        winners[node], tree[node] = left, right
+    winner = winners[1] if size > 1 else 0
+    
+    while keys[winner] is not _EXHAUSTED:
+        yield items[winner]
+        for item in iterators[winner]:
+            winner_key = keys[winner] = item if key is None else key(item)
+            items[winner] = item
+            break
+        else:
+            winner_key = keys[winner] = _EXHAUSTED
+            items[winner] = None
+        
+        # replay the matches on the path from the leaf of the winner
+        node = size + winner
+        while node > 1:
+            from_right = node & 1
+            node >>= 1
+            loser = tree[node]
+            loser_key = keys[loser]
+            if loser_key is _EXHAUSTED:
+                continue
+            if winner_key is _EXHAUSTED or (
+                    not winner_key < loser_key if from_right
+                    else loser_key < winner_key):
+                tree[node], winner, winner_key = winner, loser, loser_key
+
+
+_EXHAUSTED = object()  # key of the exhausted iterables of a loser tree
+
+
+def external_merge_sort(source, output_path, typecode=None, key=None, 
+                        memory_budget=EXTERNAL_MEMORY_BUDGET, 
+                        fan_in=EXTERNAL_FAN_IN):
+    """External merge sort algorithm.
+    ref: https://en.wikipedia.org/wiki/External_sorting
+    
+    Sort the items of source, which may not fit in memory, in a stable way 
+    according to the values of key(item) (the items themselves if key is 
+    None), and write them to the file at output_path.
+    If typecode is given (e.g. "q" for 64-bit integers and "d" for doubles, 
+    as in the array module), items are numbers stored in binary files of 
+    fixed-width values (see algorithms.mapped_array()). Otherwise, items are 
+    strings without newlines, stored in UTF-8 text files with one item per 
+    line. Source is either the path of such a file or an iterable of items.
+    
+    The input is read in chunks of at most memory_budget bytes, which are 
+    sorted in memory (by Timsort, i.e. list.sort(), or vectorized if NumPy is 
+    available and items are their own keys) and spilled to temporary files as 
+    sorted runs. Groups of at most fan_in runs are then merged into longer 
+    runs (see k_way_merge()) until fan_in runs at most are left, which are 
+    merged into the output file. Each merge streams its runs through buffers 
+    of memory_budget / (fan_in + 1) bytes, so memory use is bounded by 
+    memory_budget (plus the overhead of Python objects for items being 
+    sorted) and the number of passes over the data is 1 + ceil(log r) in 
+    base fan_in, where r = n * item size / memory_budget is the number of 
+    runs. Temporary files are kept in the directory of the output file.
+    
+    Time complexity analysis:
+    Best: O(n * log n)
+    Average: O(n * log n)
+    Worst: O(n * log n)
+    
+    Space complexity analysis (memory):
+    Best: O(m)
+    Average: O(m)
+    Worst: O(m)
+    
+    where m = memory_budget
+    """
+    
+    assert fan_in >= 2
+    
+    item_size = typed_array(typecode).itemsize if typecode is not None else 1
+    buffer_length = max(1, memory_budget // (fan_in + 1) // item_size)
+    with TemporaryDirectory(dir=dirname(abspath(output_path))) as temp_dir:
+        run_paths = []
+        for chunk in _read_chunks(
+                source, typecode, memory_budget, buffer_length):
+            run_paths.append(join(temp_dir, "run{}".format(len(run_paths))))
+            _write_run(run_paths[-1], _sorted_run(chunk, typecode, key), 
+                       typecode, buffer_length)
+        
+        # merge passes, until a single pass to the output file is left
+        run_count = len(run_paths)
+        while len(run_paths) > fan_in:
+            merged_paths = []
+            for i in range(0, len(run_paths), fan_in):
+                group = run_paths[i:i + fan_in]
+                if len(group) == 1:
+                    merged_paths.append(group[0])
+                    continue
+                merged_paths.append(join(temp_dir, "run{}".format(run_count)))
+                run_count += 1
+                _merge_runs(group, merged_paths[-1], typecode, key, 
+                            buffer_length)
+                for run_path in group:
+                    remove(run_path)
+            run_paths = merged_paths
+        
+        if len(run_paths) == 1:  # already sorted: no merge needed
+            replace(run_paths[0], output_path)
+        else:
+            _merge_runs(run_paths, output_path, typecode, key, buffer_length)
+
+
+def _read_chunks(source, typecode, memory_budget, buffer_length):
+    """Helper function for external_merge_sort algorithm.
+    
+    Yield the items of source (a path or an iterable) in consecutive chunks 
+    of at most memory_budget bytes: typed arrays if typecode is given, 
+    otherwise lists of strings.
+    """
+    
+    is_path = isinstance(source, (str, PathLike))
+    if typecode is not None:
+        max_items = max(1, memory_budget // typed_array(typecode).itemsize)
+        if is_path:
+            yield from _read_blocks(source, typecode, max_items)
+            return
+        items = iter(source)
+        while True:
+            chunk = typed_array(typecode, islice(items, max_items))
+            if not chunk:
+                return
+            yield chunk
+    
+    if is_path:
+        source = _read_run(source, typecode, buffer_length)
+    chunk, chunk_size = [], 0
+    for item in source:
+        chunk_size += len(item) + 1
+        if chunk and chunk_size > memory_budget:
+            yield chunk
+            chunk, chunk_size = [], len(item) + 1
+        chunk.append(item)
+    if chunk:
+        yield chunk
+
+
+def _sorted_run(chunk, typecode, key):
+    """Helper function for external_merge_sort algorithm.
+    
+    Return the items of the chunk, sorted in a stable way.
+    """
+    
+    if typecode is not None and key is None and algorithms_numpy is not None:
+        vector = algorithms_numpy.as_ndarray(chunk)
+        vector.sort(kind="stable")
+        del vector  # release the view of the chunk
+        return chunk
+    
+    return sorted(chunk, key=key)
+
+
+def _read_run(path, typecode, buffer_length):
+    """Helper function for external_merge_sort algorithm.
+    
+    Lazily yield the items of a run file, read in blocks of buffer_length 
+    items (binary files) or bytes (text files).
+    """
+    
+    if typecode is not None:
+        for block in _read_blocks(path, typecode, buffer_length):
+            yield from block
+        return
+    
+    with open(path, encoding="utf-8", newline="\n", 
+              buffering=max(2, buffer_length)) as f:
+        for line in f:
+            yield line[:-1] if line.endswith("\n") else line
+
+
+def _read_blocks(path, typecode, buffer_length):
+    """Helper function for external_merge_sort algorithm.
+    
+    Lazily yield the items of a binary file in typed arrays of buffer_length 
+    items (the last one may be shorter).
+    """
+    
+    with open(path, "rb") as f:
+        while True:
+            block = typed_array(typecode)
+            try:
+                block.fromfile(f, buffer_length)
+            except EOFError:  # last block: the read items are kept
+                pass
+            if not block:
+                return
+            yield block
+
+
+def _write_run(path, items, typecode, buffer_length):
+    """Helper function for external_merge_sort algorithm.
+    
+    Write the items to a run file, in blocks of buffer_length items (binary 
+    files) or bytes (text files).
+    """
+    
+    if typecode is not None:
+        items = iter(items)
+        with open(path, "wb") as f:
+            while True:
+                block = typed_array(typecode, islice(items, buffer_length))
+                if not block:
+                    return
+                block.tofile(f)
+    
+    with open(path, "w", encoding="utf-8", newline="\n", 
+              buffering=max(2, buffer_length)) as f:
+        f.writelines(item + "\n" for item in items)
+
+
+def _merge_runs(run_paths, output_path, typecode, key, buffer_length):
+    """Helper function for external_merge_sort algorithm.
+    
+    Stream the stable merge of the run files to the output file.
+    """
+    
+    runs = [_read_run(run_path, typecode, buffer_length) 
+            for run_path in run_paths]
+    _write_run(output_path, k_way_merge(*runs, key=key), typecode, 
+               buffer_length)
+
+
+def sort(array, key=None, thresholds=None):
+    """Adaptive sort.
+    
+    In-place sort the items of the array (a list or a writable buffer, e.g. 
+    array.array or ndarray) according to the values of key(item) (the items 
+    themselves if key is None), with the engine that best suits the input.
+    The sort is stable, except where it cannot be observed: when items are 
+    numbers that are their own keys.
+    
+    Statistics are estimated on a random sample of the items (see 
+    _sample_statistics()): the fractions of sampled pairs of items in and out 
+    of order (run structure), the fraction of duplicate keys and the type of 
+    the keys. Then, according to thresholds (see SORT_THRESHOLDS, which the 
+    given dictionary overrides):
+    - short lists: binary insertion sort (see binary_insertion_sort());
+    - buffers of numbers (integer or floating point ones), if NumPy is 
+    available: vectorized quicksort (see algorithms.quicksort());
+    - nearly sorted (ascending or descending) inputs: adaptive merge sort, 
+    which detects and merges the runs (see merge_sort());
+    - numbers with many duplicates: three-way quicksort;
+    - many integer keys in a narrow range (checked exactly on all the keys): 
+    counting sort (see counting_sort());
+    - many 64-bit integer keys in a wider range: LSD radix sort (see 
+    radix_sort());
+    - otherwise: sample sort (see sample_sort()).
+    Engines without a key parameter sort (key, position) pairs instead.
+    
+    Return a SortDecision with the chosen engine, the reason for the choice 
+    and the estimated statistics, to audit it.
+    
+    Time complexity analysis:
+    Best: O(n)
+    Average: O(n * log n)
+    Worst: O(n * log n)
+    
+    Space complexity analysis:
+    Best: O(s)
+    Average: O(n)
+    Worst: O(n)
+    
+    where s = thresholds["sample_size"]
+    """
+    
+    thresholds = dict(SORT_THRESHOLDS, **(thresholds or {}))
+    n = len(array)
+    statistics = _sample_statistics(array, key, thresholds["sample_size"])
+    own_numbers = key is None and statistics["key_type"] in ("int", "float")
+    
+    if n <= thresholds["insertion_max_length"]:
+        decision = SortDecision(
+            "insertion", "length {} <= insertion_max_length {}".format(
+                n, thresholds["insertion_max_length"]), statistics)
+        _sort_by_key(array, key, binary_insertion_sort)
+        return decision
+    
+    if key is None and algorithms_numpy is not None:
+        vector = algorithms_numpy.as_ndarray(array)
+        numeric = vector is not None and vector.dtype.kind in "iuf"
+        del vector  # release the view of the buffer
+        if numeric:
+            decision = SortDecision(
+                "vectorized_quicksort", "buffer of numbers", statistics)
+            quicksort(array, introsort=True, three_way=True)
+            return decision
+    
+    out_of_order = min(statistics["inversions"], statistics["ascents"])
+    if out_of_order <= thresholds["presorted_max_inversions"]:
+        decision = SortDecision(
+            "adaptive_merge_sort", 
+            "fraction of sampled pairs out of order {:.4f} <= "
+            "presorted_max_inversions {}".format(
+                out_of_order, thresholds["presorted_max_inversions"]), 
+            statistics)
+        _sort_by_key(
+            array, key, lambda items: merge_sort(items, adaptive=True))
+        return decision
+    
+    if own_numbers and \
+            statistics["duplicates"] >= thresholds["duplicates_min_ratio"]:
+        decision = SortDecision(
+            "three_way_quicksort", 
+            "sampled duplicates {:.4f} >= duplicates_min_ratio {}".format(
+                statistics["duplicates"], thresholds["duplicates_min_ratio"]), 
+            statistics)
+        quicksort(array, introsort=True, three_way=True)
+        return decision
+    
+    keys = None  # keys of the items, once computed
+    if statistics["key_type"] == "int" and n >= min(
+            thresholds["counting_min_length"], thresholds["radix_min_length"]):
+        keys = array if key is None else [key(item) for item in array]
+        if all(type(k) is int for k in keys):
+            min_key, max_key = min(keys), max(keys)
+            key_range = max_key - min_key + 1
+            statistics["key_range"] = key_range
+            max_range = n * thresholds["counting_max_range_ratio"]
+            if n >= thresholds["counting_min_length"] and \
+                    key_range <= max_range:
+                decision = SortDecision(
+                    "counting_sort", "key range {} <= {} (length {} * "
+                    "counting_max_range_ratio {})".format(
+                        key_range, max_range, n, 
+                        thresholds["counting_max_range_ratio"]), 
+                    statistics)
+                if key is None:
+                    _copy_into(counting_sort(array, None, [None] * n), array)
+                else:
+                    _sort_by_cached_keys(array, keys, counting_sort)
+                return decision
+            
+            if n >= thresholds["radix_min_length"] and \
+                    -2 ** 63 <= min_key and max_key < 2 ** 63:
+                decision = SortDecision(
+                    "radix_sort", "length {} >= radix_min_length {}, keys "
+                    "in 64 bits".format(n, thresholds["radix_min_length"]), 
+                    statistics)
+                if key is None:
+                    _copy_into(radix_sort(array), array)
+                else:
+                    _sort_by_cached_keys(
+                        array, keys, lambda positions, key_fn, output: 
+                        radix_sort(positions, key_fn=key_fn))
+                return decision
+    
+    decision = SortDecision(
+        "sample_sort", "no specialized engine applies", statistics)
+    if key is None or keys is None:
+        _copy_into(sample_sort(array, key, [None] * n), array)
+    else:
+        _sort_by_cached_keys(array, keys, sample_sort)
+    return decision
+
+
+class SortDecision:
+    """Record of the engine chosen by sort() for an input.
+    
+    - engine: name of the sorting engine that ran;
+    - reason: the threshold that selected it;
+    - statistics: the statistics estimated on the input (see 
+    _sample_statistics()), plus the exact key range, if it was computed.
+    """
+    
+    def __init__(self, engine, reason, statistics):
+        self.engine = engine
+        self.reason = reason
+        self.statistics = statistics
+    
+    def __str__(self):
+        return "{}: {}".format(self.engine, self.reason)
+    
+    def __repr__(self):
+        return "SortDecision - engine: {}, reason: {}, statistics: {}".format(
+            self.engine, self.reason, self.statistics)
+
+
+def _sample_statistics(array, key, sample_size):
+    """Helper function for sort algorithm.
+    
+    Estimate the statistics of the keys of the array on a random sample of at 
+    most sample_size items:
+    - length: number of items;
+    - key_type: "int" or "float" if all the sampled keys are integers (or 
+    floats), "other" otherwise (e.g. strings, tuples);
+    - duplicates: fraction of sampled keys equal to another sampled key;
+    - inversions, ascents: fractions of random pairs of sampled items (in two 
+    different positions) whose keys are in strictly descending (ascending) 
+    order of position. Unlike pairs of adjacent items, they reveal whether 
+    sorted runs overlap (hence, whether merging them is cheap).
+    """
+    
+    n = len(array)
+    positions = sample(range(n), min(n, sample_size))  # in random order
+    keys = [array[i] if key is None else key(array[i]) for i in positions]
+    
+    if all(type(k) is int for k in keys):
+        key_type = "int"
+    elif all(type(k) is float for k in keys):
+        key_type = "float"
+    else:
+        key_type = "other"
+    
+    inversions = ascents = 0
+    for pair in range(0, len(keys) - 1, 2):
+        first, second = keys[pair], keys[pair + 1]
+        if positions[pair + 1] < positions[pair]:
+            first, second = second, first
+        inversions += second < first
+        ascents += first < second
+    pairs = max(1, len(keys) // 2)
+    
+    try:
+        duplicates = 1 - len(set(keys)) / len(keys) if keys else 0
+    except TypeError:  # unhashable keys
+        duplicates = 0
+    
+    return {
+        "length": n,
+        "key_type": key_type,
+        "duplicates": duplicates,
+        "inversions": inversions / pairs,
+        "ascents": ascents / pairs,
+    }
+
+
+def _sort_by_key(array, key, sort_fn):
+    """Helper function for sort algorithm.
+    
+    In-place sort the array with sort_fn, which has no key parameter: if key 
+    is given, sort (key, position) pairs, which keeps the sort stable and 
+    never compares items, then move the items accordingly.
+    """
+    
+    if key is None:
+        sort_fn(array)
+        return
+    
+    pairs = [(key(item), i) for i, item in enumerate(array)]
+    sort_fn(pairs)
+    items = list(array)
+    _copy_into([items[i] for _, i in pairs], array)
+
+
+def _sort_by_cached_keys(array, keys, sort_fn):
+    """Helper function for sort algorithm.
+    
+    In-place sort the array by the already computed keys of its items, with 
+    sort_fn, which has key_fn and output parameters: sort the positions of the 
+    items by their keys, so that keys are only computed once, then move the 
+    items accordingly.
+    """
+    
+    n = len(array)
+    positions = sort_fn(range(n), keys.__getitem__, [None] * n)
+    items = list(array)
+    _copy_into([items[i] for i in positions], array)
+
+
+def _copy_into(items, array):
+    """Helper function for sort algorithm. Copy the items into the array."""
+    
+    if isinstance(array, list):
+        array[:] = items
+    else:
+        for i, item in enumerate(items):
+            array[i] = item
@@ -1,8 +1,17 @@
 import random
 import unittest
 
+import sorting
+
+from unittest import mock
+
+from array import array as typed_array
 from collections import Counter
-from sorting import counting_sort, merge_sort
+from os import listdir, path
+from tempfile import TemporaryDirectory
+from sorting import binary_insertion_sort, bottom_up_merge_sort, \
+    counting_sort, external_merge_sort, k_way_merge, merge_sort, \
+    msd_radix_sort, parallel_merge_sort, radix_sort, sample_sort, sort
 
 
 class TestCountingSort(unittest.TestCase):
@@ -50,6 +59,304 @@ class TestCountingSort(unittest.TestCase):
                         "Error while sorting {}.\nWrong items: {}".format(
                             array, slice_count))
                     start_index = end_index
+        
+        # test sort of negative and large keys, with identity key function
+        for int_range in [(-100, 100), (10 ** 12, 10 ** 12 + 50)]:
+            array = [random.randint(*int_range) for _ in range(1000)]
+            self.assertEqual(
+                counting_sort(array), sorted(array), 
+                "Error while sorting {}".format(array))
+        
+        # test sort into a given output buffer
+        array = [random.randint(*int_range) for _ in range(100)]
+        output = [None] * len(array)
+        self.assertIs(counting_sort(array, id_fn, output), output)
+        self.assertEqual(output, sorted(array))
+        
+        # typed arrays are copied with their own type
+        array = typed_array("q", [3, 1, 2])
+        self.assertEqual(counting_sort(array), typed_array("q", [1, 2, 3]))
+    
+    @unittest.skipIf(sorting.algorithms_numpy is None, "NumPy not available")
+    def test_counting_sort_ndarray(self):
+        np = sorting.algorithms_numpy.np
+        
+        # key_fn is called once per item, as for other sequences
+        array = np.array([3, 1, 2, 1])
+        self.assertEqual(
+            list(counting_sort(array, lambda x: int(x))), [1, 1, 2, 3])
+        self.assertEqual(list(counting_sort(array)), [1, 1, 2, 3])
+        
+        records = np.array([(2, 0.5), (0, 1.5), (2, -1.0)], 
+                           dtype=[("key", "i8"), ("value", "f8")])
+        self.assertEqual(
+            [value for _, value in 
+             counting_sort(records, lambda record: int(record["key"]))], 
+            [1.5, 0.5, -1.0])
+
+
+class TestSampleSort(unittest.TestCase):
+
+    def test_sample_sort(self):
+        random.seed(42)
+        max_length = 100
+        repetitions_per_length = 10
+        
+        # small buckets, so that even short lists have several ones
+        for length in range(max_length + 1):
+            for _ in range(repetitions_per_length):
+                array = [random.random() for _ in range(length)]
+                array_rep = str(array)
+                for bucket_size in [1, 4, 1024]:
+                    self.assertEqual(
+                        sample_sort(array, bucket_size=bucket_size), 
+                        sorted(array), 
+                        "Error while sorting {}".format(array_rep))
+                
+                # items are compared by key only, equal keys keep their order
+                items = [Item(random.randint(0, 3), i) for i in range(length)]
+                key_fn = lambda item: -item.key
+                self.assertEqual(
+                    [item.position 
+                     for item in sample_sort(items, key_fn, bucket_size=4)], 
+                    [item.position for item in sorted(items, key=key_fn)], 
+                    "Error while stable sorting {} items".format(length))
+    
+    def test_sample_sort_distributions(self):
+        random.seed(42)
+        length = 10000
+        generators = {
+            "uniform": random.random,
+            "skewed": lambda: random.expovariate(1) ** 4,
+            "few keys": lambda: float(random.randint(0, 3)),
+            "integers": lambda: random.randint(-2 ** 63, 2 ** 63 - 1),
+        }
+        
+        for name, generator in generators.items():
+            array = [generator() for _ in range(length)]
+            for workers in [1, 2]:
+                self.assertEqual(
+                    sample_sort(array, workers=workers), sorted(array), 
+                    "Error while sorting {} keys".format(name))
+        
+        # buffers are sorted into a copy of the same type
+        array = typed_array("d", [random.random() for _ in range(length)])
+        sample_sorted = sample_sort(array)
+        self.assertIsInstance(sample_sorted, typed_array)
+        self.assertEqual(list(sample_sorted), sorted(array))
+        
+        # test sort into a given output buffer
+        array = [random.random() for _ in range(100)]
+        output = [None] * len(array)
+        self.assertIs(sample_sort(array, output=output), output)
+        self.assertEqual(output, sorted(array))
+
+
+class TestSort(unittest.TestCase):
+
+    def test_sort(self):
+        random.seed(42)
+        length = 5000
+        inputs = {
+            "insertion": [random.random() for _ in range(30)],
+            "adaptive_merge_sort": list(range(length, 0, -1)),
+            "three_way_quicksort": [random.randint(0, 2) 
+                                    for _ in range(length)],
+            "sample_sort": [random.random() for _ in range(length)],
+        }
+        
+        for engine, array in inputs.items():
+            array_copy = sorted(array)
+            decision = sort(array)
+            self.assertEqual(
+                array, array_copy, "Error while sorting for {}".format(engine))
+            self.assertEqual(decision.engine, engine, str(decision))
+            self.assertEqual(decision.statistics["length"], len(array))
+        
+        # thresholds can be tuned per call
+        array = [random.randint(0, 100) for _ in range(length)]
+        array_copy = sorted(array)
+        decision = sort(array, thresholds={"counting_min_length": length})
+        self.assertEqual(array, array_copy, "Error while sorting")
+        self.assertEqual(decision.engine, "counting_sort", str(decision))
+        self.assertEqual(decision.statistics["key_range"], 101)
+        
+        # wide integer keys go to radix sort, if it is enabled
+        array = [random.randint(-2 ** 63, 2 ** 63 - 1) for _ in range(length)]
+        array_copy = sorted(array)
+        decision = sort(array, thresholds={"radix_min_length": length})
+        self.assertEqual(array, array_copy, "Error while sorting")
+        self.assertEqual(decision.engine, "radix_sort", str(decision))
+        array = [random.randint(0, 2 ** 64) for _ in range(length)]
+        decision = sort(array, thresholds={"radix_min_length": length})
+        self.assertEqual(decision.engine, "sample_sort", str(decision))
+        
+        # keys computed for the range check are not computed again
+        calls = Counter()
+        def key_fn(item):
+            calls[item] += 1
+            return item[0]
+        
+        array = [(random.randint(0, 10 ** 9), i) for i in range(length)]
+        array_copy = sorted(array, key=key_fn)
+        calls.clear()
+        decision = sort(array, key_fn, {"counting_min_length": 1000})
+        self.assertEqual(array, array_copy, "Error while sorting")
+        self.assertEqual(decision.engine, "sample_sort", str(decision))
+        self.assertEqual(
+            sum(calls.values()), 
+            length + sorting.SORT_THRESHOLDS["sample_size"])
+        
+        # buffers are sorted in place
+        array = typed_array("d", [random.random() for _ in range(length)])
+        array_copy = sorted(array)
+        decision = sort(array)
+        self.assertEqual(list(array), array_copy, "Error while sorting")
+        if sorting.algorithms_numpy is not None:
+            self.assertEqual(decision.engine, "vectorized_quicksort")
+    
+    @unittest.skipIf(sorting.algorithms_numpy is None, "NumPy not available")
+    def test_sort_ndarray(self):
+        np = sorting.algorithms_numpy.np
+        random.seed(42)
+        length = 5000
+        
+        # keys are computed once per item (plus once per sampled item)
+        calls = Counter()
+        def key_fn(item):
+            calls[int(item)] += 1
+            return int(item) % 100
+        
+        array = np.array(random.sample(range(10 ** 6), length))
+        keys_copy = sorted(int(item) % 100 for item in array)
+        decision = sort(array, key_fn, {"counting_min_length": length})
+        self.assertEqual(decision.engine, "counting_sort", str(decision))
+        self.assertEqual([int(item) % 100 for item in array], keys_copy)
+        self.assertLessEqual(max(calls.values()), 2)
+        self.assertEqual(
+            sum(calls.values()), 
+            length + sorting.SORT_THRESHOLDS["sample_size"])
+        
+        # only buffers of numbers are sorted by the vectorized quicksort
+        array = np.array([random_string("abc", 5) for _ in range(length)])
+        array_copy = sorted(array)
+        decision = sort(array)
+        self.assertNotEqual(decision.engine, "vectorized_quicksort")
+        self.assertEqual(list(array), array_copy)
+    
+    def test_sort_key(self):
+        random.seed(42)
+        lengths = [0, 1, 10, 100, 5000]
+        
+        # every engine is stable when keys are given
+        for length in lengths:
+            for thresholds in [{}, {"counting_min_length": 0}, 
+                               {"duplicates_min_ratio": 0}, 
+                               {"radix_min_length": 0}]:
+                items = [Item(random.randint(0, 3), i) for i in range(length)]
+                for key_fn in [lambda item: item.key, 
+                               lambda item: -item.key, 
+                               lambda item: str(item.key)]:
+                    items_copy = sorted(items, key=key_fn)
+                    decision = sort(items, key_fn, thresholds)
+                    self.assertEqual(
+                        [item.position for item in items], 
+                        [item.position for item in items_copy], 
+                        "Error while stable sorting {} items with {}".format(
+                            length, decision))
+                    items.sort(key=lambda item: item.position)
+        
+        # nearly sorted keys
+        items = [Item(i // 2, i) for i in range(length)]
+        decision = sort(items, lambda item: item.key)
+        self.assertEqual(decision.engine, "adaptive_merge_sort")
+        self.assertEqual(
+            [item.position for item in items], list(range(length)))
+
+
+class TestRadixSort(unittest.TestCase):
+
+    def test_radix_sort(self):
+        random.seed(42)
+        lengths = [0, 1, 2, 10, 100, 1000]
+        int_ranges = [(0, 3), (-100, 100), (-2 ** 63, 2 ** 63 - 1)]
+        
+        with self.assertRaises(AssertionError):
+            radix_sort([2 ** 63])  # test key out of 64-bit range
+        
+        for length in lengths:
+            for int_range in int_ranges:
+                for digit_bits in [1, 8, 16]:
+                    array = [random.randint(*int_range) for _ in range(length)]
+                    array_rep = str(array)
+                    self.assertEqual(
+                        radix_sort(array, digit_bits), sorted(array), 
+                        "Error while sorting {}".format(array_rep))
+                
+                # sort (key, position) pairs by key, in a stable way
+                pairs = [(random.randint(*int_range), i) 
+                         for i in range(length)]
+                self.assertEqual(
+                    radix_sort(pairs, key_fn=lambda pair: pair[0]), 
+                    sorted(pairs), 
+                    "Error while stable sorting {}".format(pairs))
+        
+        array = [random.randint(-128, 127) for _ in range(100)]
+        self.assertEqual(radix_sort(array, 4, bits=8), sorted(array))
+        
+        # NumPy integers are keys too
+        if sorting.algorithms_numpy is not None:
+            np = sorting.algorithms_numpy.np
+            for dtype in ["int64", "int32", "uint8"]:
+                vector = np.array([x + 128 for x in array], dtype=dtype)
+                self.assertEqual(
+                    radix_sort(vector), sorted(vector), 
+                    "Error while sorting {} items".format(dtype))
+            pairs = [(i % 7, i) for i in range(100)]
+            self.assertEqual(
+                radix_sort(pairs, key_fn=lambda pair: np.int64(pair[0])), 
+                sorted(pairs), "Error while sorting by NumPy keys")
+        
+        # one counting sort pass per digit of the key range
+        for int_range, passes in [((0, 255), 1), ((-128, 127), 1), 
+                                  ((10 ** 6, 10 ** 6 + 65535), 2), 
+                                  ((7, 7), 0)]:
+            array = [random.randint(*int_range) for _ in range(1000)]
+            array[0] = int_range[1]  # the whole range is used
+            with mock.patch.object(
+                    sorting, "counting_sort", 
+                    wraps=sorting.counting_sort) as counting_sort_mock:
+                self.assertEqual(radix_sort(array), sorted(array))
+            self.assertEqual(
+                counting_sort_mock.call_count, passes, 
+                "Wrong number of passes for keys in {}".format(int_range))
+    
+    def test_msd_radix_sort(self):
+        random.seed(42)
+        lengths = [0, 1, 2, 10, 100, 1000]
+        alphabets = ["ab", "abcdefghij", "aé€\U0001F600"]
+        max_key_length = 8
+        
+        for length in lengths:
+            for alphabet in alphabets:
+                array = [random_string(alphabet, max_key_length) 
+                         for _ in range(length)]
+                array_rep = str(array)
+                self.assertEqual(
+                    msd_radix_sort(array), sorted(array), 
+                    "Error while sorting {}".format(array_rep))
+                
+                array = [key.encode() for key in array]
+                self.assertEqual(
+                    msd_radix_sort(array), sorted(array), 
+                    "Error while sorting {}".format(array_rep))
+                
+                # sort (key, position) pairs by key, in a stable way
+                pairs = [(key, i) for i, key in enumerate(array)]
+                self.assertEqual(
+                    msd_radix_sort(pairs, key_fn=lambda pair: pair[0]), 
+                    sorted(pairs), 
+                    "Error while stable sorting {}".format(array_rep))
 
 
 class TestMergeSort(unittest.TestCase):
@@ -71,6 +378,316 @@ class TestMergeSort(unittest.TestCase):
                 self.assertEqual(
                     array, array_copy, 
                     "Error while sorting {}".format(array_rep))
+    
+    def test_merge_sort_adaptive(self):
+        random.seed(42)
+        lengths = [0, 1, 2, 10, 63, 64, 65, 100, 1000, 10000]
+        int_ranges = [(0, 3), (-10 ** 6, 10 ** 6)]
+        
+        # inputs with natural runs of any kind
+        shapes = [
+            lambda array: array,
+            lambda array: sorted(array),
+            lambda array: sorted(array, reverse=True),
+            lambda array: sorted(array[:len(array) // 2]) + 
+            sorted(array[len(array) // 2:], reverse=True),
+            lambda array: sorted(array) + array[:10],
+        ]
+        
+        for length in lengths:
+            for int_range in int_ranges:
+                for shape in shapes:
+                    for adaptive in [False, True]:
+                        array = shape([random.randint(*int_range) 
+                                       for _ in range(length)])
+                        # items are (key, position) pairs compared by key
+                        items = [Item(key, i) for i, key in enumerate(array)]
+                        merge_sort(items, adaptive=adaptive)
+                        self.assertEqual(
+                            [(item.key, item.position) for item in items], 
+                            sorted((key, i) for i, key in enumerate(array)), 
+                            "Error while stable sorting {} items".format(
+                                length))
+    
+    def test_merge_sort_adaptive_linear(self):
+        length = 10000
+        
+        # sorted and reversed inputs are single runs
+        for array in [list(range(length)), list(range(length, 0, -1))]:
+            items = [Item(key, i) for i, key in enumerate(array)]
+            Item.comparisons = 0
+            merge_sort(items, adaptive=True)
+            self.assertEqual(Item.comparisons, length - 1)
+        
+        # few items out of place only add a few comparisons
+        array = list(range(length))
+        array[length // 3], array[length // 2] = \
+            array[length // 2], array[length // 3]
+        items = [Item(key, i) for i, key in enumerate(array)]
+        Item.comparisons = 0
+        merge_sort(items, adaptive=True)
+        self.assertEqual([item.key for item in items], sorted(array))
+        self.assertLess(Item.comparisons, 2 * length)
+
+
+class TestBottomUpMergeSort(unittest.TestCase):
+
+    def test_bottom_up_merge_sort(self):
+        random.seed(42)
+        lengths = [0, 1, 2, 10, 31, 32, 33, 64, 100, 1000, 10000]
+        int_ranges = [(0, 3), (-10 ** 6, 10 ** 6)]
+        
+        for length in lengths:
+            for int_range in int_ranges:
+                array = [random.randint(*int_range) for _ in range(length)]
+                # items are (key, position) pairs compared by key
+                items = [Item(key, i) for i, key in enumerate(array)]
+                bottom_up_merge_sort(items)
+                self.assertEqual(
+                    [(item.key, item.position) for item in items], 
+                    sorted((key, i) for i, key in enumerate(array)), 
+                    "Error while stable sorting {} items".format(length))
+        
+        # sort a range only, with an odd number of merge passes
+        array = [random.randint(-50, 50) for _ in range(200)]
+        array_copy = array[:10] + sorted(array[10:150]) + array[150:]
+        
+        # slices of buffers may be views, not copies
+        buffers = [typed_array("q", array)]
+        if sorting.algorithms_numpy is not None:
+            buffers.append(sorting.algorithms_numpy.np.array(array))
+        
+        bottom_up_merge_sort(array, 10, 149)
+        self.assertEqual(array, array_copy, "Error while sorting range")
+        for buffer in buffers:
+            bottom_up_merge_sort(buffer, 10, 149)
+            self.assertEqual(
+                list(buffer), array_copy, 
+                "Error while sorting {}".format(type(buffer).__name__))
+
+
+class TestParallelMergeSort(unittest.TestCase):
+
+    def test_parallel_merge_sort(self):
+        random.seed(42)
+        lengths = [0, 1, 2, 3, 10, 100, 10000]
+        int_ranges = [(0, 3), (-2 ** 63, 2 ** 63 - 1)]
+        
+        for length in lengths:
+            for int_range in int_ranges:
+                for workers in [1, 2, 3]:
+                    # lists of numbers are sorted in shared memory
+                    array = [random.randint(*int_range) for _ in range(length)]
+                    array_copy = sorted(array)
+                    parallel_merge_sort(array, "q", workers)
+                    self.assertEqual(
+                        array, array_copy, 
+                        "Error while sorting {} items".format(length))
+                    
+                    # other lists are pickled, items compared by key only
+                    items = [Item(random.randint(0, 3), i) 
+                             for i in range(length)]
+                    items_copy = sorted(
+                        items, key=lambda item: item.key)
+                    parallel_merge_sort(items, workers=workers)
+                    self.assertEqual(
+                        [item.position for item in items], 
+                        [item.position for item in items_copy], 
+                        "Error while stable sorting {} items".format(length))
+        
+        # buffers are sorted with their own item format
+        array = typed_array("d", [random.random() for _ in range(10000)])
+        array_copy = sorted(array)
+        parallel_merge_sort(array, workers=3)
+        self.assertEqual(list(array), array_copy, "Error while sorting")
+
+
+class TestKWayMerge(unittest.TestCase):
+
+    def test_k_way_merge(self):
+        random.seed(42)
+        max_k = 20
+        repetitions_per_k = 20
+        max_length = 30
+        
+        for k in range(max_k + 1):
+            for _ in range(repetitions_per_k):
+                runs = [sorted(Item(random.randint(0, 5), (i, j)) 
+                               for j in range(random.randint(0, max_length)))
+                        for i in range(k)]
+                runs_rep = str([[item.key for item in run] for run in runs])
+                expected = [item.position for item in sorted(
+                    item for run in runs for item in run)]
+                
+                for loser_tree in [False, True]:
+                    # equal items keep the order of their runs
+                    merged = k_way_merge(
+                        *[iter(run) for run in runs], loser_tree=loser_tree)
+                    self.assertEqual(
+                        [item.position for item in merged], expected, 
+                        "Error while merging {}".format(runs_rep))
+                    
+                    keys = [[-item.key for item in run] for run in runs]
+                    merged = k_way_merge(
+                        *keys, key=lambda key: -key, loser_tree=loser_tree)
+                    self.assertEqual(
+                        list(merged), 
+                        sorted((key for run in keys for key in run), 
+                               reverse=True), 
+                        "Error while merging {} by key".format(runs_rep))
+    
+    def test_k_way_merge_lazy(self):
+        # items are pulled from the runs only when needed
+        def run(start, step):
+            for i in range(start, 10 * step, step):
+                yield i
+            raise AssertionError("Run consumed too far")
+        
+        for loser_tree in [False, True]:
+            merged = k_way_merge(run(0, 3), run(1, 3), run(2, 3),
+                                 loser_tree=loser_tree)
+            self.assertEqual([next(merged) for _ in range(28)], 
+                             list(range(28)))
+            
+            # merges can be chained
+            merged = k_way_merge(
+                k_way_merge(run(0, 4), run(2, 4), loser_tree=loser_tree),
+                k_way_merge(run(1, 4), run(3, 4), loser_tree=loser_tree),
+                loser_tree=loser_tree)
+            self.assertEqual([next(merged) for _ in range(37)], 
+                             list(range(37)))
+
+
+class TestExternalMergeSort(unittest.TestCase):
+
+    def test_external_merge_sort_binary(self):
+        random.seed(42)
+        lengths = [0, 1, 2, 10, 1000]
+        generators = {
+            "q": lambda: random.randint(-2 ** 63, 2 ** 63 - 1),
+            "i": lambda: random.randint(0, 3),
+            "d": random.random,
+        }
+        
+        with TemporaryDirectory() as directory:
+            input_path = path.join(directory, "input")
+            output_path = path.join(directory, "output")
+            for length in lengths:
+                for typecode, generator in generators.items():
+                    # tiny budgets and fan-ins need several merge passes
+                    for memory_budget, fan_in in [(64, 2), (64, 5), 
+                                                  (2 ** 20, 64)]:
+                        array = typed_array(
+                            typecode, [generator() for _ in range(length)])
+                        with open(input_path, "wb") as f:
+                            array.tofile(f)
+                        external_merge_sort(
+                            input_path, output_path, typecode, 
+                            memory_budget=memory_budget, fan_in=fan_in)
+                        output = typed_array(typecode)
+                        with open(output_path, "rb") as f:
+                            output.frombytes(f.read())
+                        self.assertEqual(
+                            list(output), sorted(array), 
+                            "Error while sorting {} items".format(length))
+                        
+                        external_merge_sort(
+                            array, output_path, typecode, key=lambda x: -x, 
+                            memory_budget=memory_budget, fan_in=fan_in)
+                        output = typed_array(typecode)
+                        with open(output_path, "rb") as f:
+                            output.frombytes(f.read())
+                        self.assertEqual(
+                            list(output), sorted(array, key=lambda x: -x), 
+                            "Error while sorting {} items by key".format(
+                                length))
+                        
+                        # temporary runs are removed
+                        self.assertEqual(
+                            sorted(listdir(directory)), ["input", "output"])
+    
+    def test_external_merge_sort_lines(self):
+        random.seed(42)
+        lengths = [0, 1, 2, 10, 1000]
+        alphabet = "ab\u00e8 \t"
+        
+        with TemporaryDirectory() as directory:
+            input_path = path.join(directory, "input")
+            output_path = path.join(directory, "output")
+            for length in lengths:
+                lines = [random_string(alphabet, 5) for _ in range(length)]
+                with open(input_path, "w", encoding="utf-8") as f:
+                    f.writelines(line + "\n" for line in lines)
+                
+                for memory_budget, fan_in in [(16, 2), (16, 3), (2 ** 20, 64)]:
+                    for source, key in [(input_path, None), (lines, len)]:
+                        # equal keys keep the order of the input
+                        external_merge_sort(
+                            source, output_path, key=key, 
+                            memory_budget=memory_budget, fan_in=fan_in)
+                        with open(output_path, encoding="utf-8", 
+                                  newline="\n") as f:
+                            output = [line[:-1] for line in f]
+                        self.assertEqual(
+                            output, sorted(lines, key=key), 
+                            "Error while sorting {}".format(lines))
+            
+            # the last line may have no newline
+            with open(input_path, "w", encoding="utf-8") as f:
+                f.write("b\na")
+            external_merge_sort(input_path, output_path)
+            with open(output_path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "a\nb\n")
+
+
+class TestBinaryInsertionSort(unittest.TestCase):
+
+    def test_binary_insertion_sort(self):
+        random.seed(42)
+        max_length = 10
+        repetitions_per_length = 100
+        int_range = (-50, 50)
+        
+        # generate random lists of integers of variable length
+        for length in range(1, max_length + 1):
+            for _ in range(length * repetitions_per_length):
+                array = [random.randint(*int_range) for _ in range(length)]
+                sorted_end = random.randint(0, length - 1)
+                array[:sorted_end + 1] = sorted(array[:sorted_end + 1])
+                array_rep = str(array)
+                array_copy = array.copy()
+                array.sort()
+                binary_insertion_sort(array_copy, sorted_end=sorted_end)
+                self.assertEqual(
+                    array, array_copy, 
+                    "Error while sorting {}".format(array_rep))
+
+
+def random_string(alphabet, max_length):
+    length = random.randint(0, max_length)
+    return "".join(random.choice(alphabet) for _ in range(length))
+
+
+class Item:
+    """Item compared by key only, counting the comparisons."""
+    
+    comparisons = 0
+    
+    def __init__(self, key, position):
+        self.key = key
+        self.position = position
+    
+    def __lt__(self, other):
+        Item.comparisons += 1
+        return self.key < other.key
+    
+    def __le__(self, other):
+        Item.comparisons += 1
+        return self.key <= other.key
+    
+    def __eq__(self, other):
+        Item.comparisons += 1
+        return self.key == other.key
 
 
 if __name__ == "__main__":